@@ -0,0 +1,141 @@
+"""Alignment of interleaved channel readings onto a common time grid.
+
+Channels in a scan are read one after another, so the readings in a row of derived
+columns were taken at different times, given by each channel's `time{n}` column.
+Aligning interpolates every channel's columns onto one grid of times, either uniform
+or the timestamps of a reference channel, so channels can be combined as if they
+were read simultaneously.
+"""
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from math import ceil, floor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.analysis import CHUNK_ROWS, read_chunks
+from keithley_daq.energy import AVERAGE, ENERGY
+from keithley_daq.pipeline import open_sink, run
+from keithley_daq.schema import COLUMNS
+from keithley_daq.storage import STORAGES, Storage
+from keithley_daq.timing import stage
+from keithley_daq.types import Interpolation
+
+TEMPLATES = (
+    *(column.name for column in COLUMNS.values() if column.kind != "time"),
+    ENERGY,
+    AVERAGE,
+)
+"""Names of columns belonging to the `n`th channel, other than its timestamps."""
+
+
+def channel_columns(frame: pd.DataFrame) -> dict[int, list[str]]:
+    """Group columns by one-based channel position, for channels with timestamps."""
+    groups: dict[int, list[str]] = {}
+    n = 1
+    while COLUMNS["time"].label(n) in frame:
+        names = {template.format(n=n) for template in TEMPLATES}
+        groups[n] = [str(column) for column in frame.columns if column in names]
+        n += 1
+    return groups
+
+
+def interpolate(
+    grid: np.ndarray, times: np.ndarray, values: np.ndarray, method: Interpolation
+) -> np.ndarray:
+    """Interpolate values read at increasing `times` onto `grid`."""
+    if method == "linear":
+        return np.interp(grid, times, values)
+    after = np.clip(np.searchsorted(times, grid), 1, len(times) - 1)
+    before = after - 1
+    nearest = np.where(grid - times[before] <= times[after] - grid, before, after)
+    return values[nearest]
+
+
+@dataclass
+class Aligner:
+    """Align channels onto a common time grid, carrying readings between chunks.
+
+    The grid is uniform if `period` is set, and the timestamps of the `reference`
+    channel otherwise. Grid times are only emitted once every channel has readings
+    on both sides, so readings bracketing a chunk bound are carried to the next chunk
+    and results do not depend on how the run was chunked.
+    """
+
+    period: float | None = None
+    """Seconds between times of a uniform grid."""
+    reference: int = 1
+    """One-based position of the channel whose timestamps are the grid, if not
+    uniform."""
+    method: Interpolation = "linear"
+    """How readings are interpolated."""
+    storage: Storage = STORAGES["double"]
+    """Storage of the frames' columns, for converting timestamps to seconds."""
+    carried: pd.DataFrame | None = None
+    """Rows still needed to interpolate grid times after the last one emitted."""
+    last: float | None = None
+    """Last grid time emitted."""
+
+    def update(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Align the readings of a frame, returning the grid times they complete."""
+        rows = frame if self.carried is None else pd.concat([self.carried, frame])
+        groups = channel_columns(rows)
+        if not groups:
+            raise ValueError("Aligning needs `time{n}` columns.")
+        with stage("align", items=len(rows)):
+            times = {
+                n: self.storage.seconds(
+                    rows[COLUMNS["time"].label(n)].to_numpy()
+                ).astype(float)
+                for n in groups
+            }
+            grid = self.grid(times) if len(rows) else np.empty(0)
+            aligned = {"time": grid}
+            for n, columns in groups.items():
+                for column in columns:
+                    aligned[column] = (
+                        interpolate(
+                            grid, times[n], rows[column].to_numpy(float), self.method
+                        )
+                        if len(grid)
+                        else np.empty(0)
+                    )
+        if len(grid):
+            self.last = float(grid[-1])
+            # ? Keep each channel's last reading at or before the last grid time
+            kept = min(
+                np.searchsorted(channel, self.last, side="right") - 1
+                for channel in times.values()
+            )
+            rows = rows.iloc[max(kept, 0) :]
+        self.carried = rows
+        return pd.DataFrame(aligned)
+
+    def grid(self, times: dict[int, np.ndarray]) -> np.ndarray:
+        """Grid times after the last one emitted that every channel brackets."""
+        start = max(channel[0] for channel in times.values())
+        end = min(channel[-1] for channel in times.values())
+        if self.period is None:
+            if self.reference not in times:
+                raise ValueError(f"There is no reference channel {self.reference}.")
+            grid = times[self.reference]
+            after = grid > self.last if self.last is not None else True
+            return grid[after & (grid >= start) & (grid <= end)]
+        first = ceil(start / self.period)
+        if self.last is not None:
+            first = max(first, round(self.last / self.period) + 1)
+        return np.arange(first, floor(end / self.period) + 1) * self.period
+
+    def stream(self, frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Align frames as they arrive."""
+        for frame in frames:
+            yield self.update(frame)
+
+
+def align(
+    path: Path, destination: Path, aligner: Aligner, rows: int = CHUNK_ROWS
+) -> int:
+    """Align a recording chunk by chunk, returning the number of grid times written."""
+    return run(aligner.stream(read_chunks(path, rows=rows)), [open_sink(destination)])
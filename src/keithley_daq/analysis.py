@@ -0,0 +1,248 @@
+"""Out-of-core analysis of recorded runs.
+
+Recordings are read in chunks of a fixed number of rows, so memory use depends on
+the chunk size rather than the run length. Aggregates are computed per chunk and
+merged, and transforms write each chunk's result as soon as it is computed.
+
+Chunks are processed in order in this process, or spread across the workers of an
+`executor`, typically a `ProcessPoolExecutor`. Functions run by process pools must
+be importable, so lambdas and local functions only work in this process.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor, Future
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self, TypeVar
+from warnings import catch_warnings, simplefilter
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.pipeline import open_sink, run
+from keithley_daq.recording import SUFFIX, load_columns, read_meta
+from keithley_daq.storage import Storage
+from keithley_daq.timing import stage
+
+CHUNK_ROWS = 1 << 18
+"""Rows per chunk unless otherwise requested."""
+AHEAD = 4
+"""Chunks submitted to an executor ahead of the one being consumed."""
+
+T = TypeVar("T")
+
+
+def read_chunks(
+    path: Path,
+    columns: Sequence[str] | None = None,
+    rows: int = CHUNK_ROWS,
+    skip: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """Read a CSV, HDF5 table, or columnar recording in chunks of `rows` rows.
+
+    Chunks are indexed by row number across the run. Recording timestamps stored in
+    nanoseconds are converted to seconds. Reading starts after `skip` rows, which
+    recordings and HDF5 tables skip without reading.
+    """
+    match path.suffix.lower():
+        case ".csv":
+            index = pd.read_csv(path, nrows=0).columns[0]
+            with pd.read_csv(
+                path,
+                index_col=0,
+                usecols=[index, *columns] if columns else None,
+                skiprows=range(1, skip + 1),
+                chunksize=rows,
+            ) as reader:
+                yield from reader
+        case ".h5" | ".hdf5":
+            with closing(
+                pd.read_hdf(path, columns=columns, start=skip, chunksize=rows)  # type: ignore
+            ) as reader:
+                yield from reader
+        case suffix if suffix == SUFFIX:
+            storage = Storage(**read_meta(path)["storage"])
+            mapped = load_columns(path, columns)
+            length = len(next(iter(mapped.values()), ()))
+            for start in range(skip, length, rows):
+                stop = min(start + rows, length)
+                with stage("read", items=stop - start):
+                    yield pd.DataFrame(
+                        {
+                            name: storage.seconds(values[start:stop])
+                            if values.dtype == np.int64
+                            else np.array(values[start:stop])
+                            for name, values in mapped.items()
+                        },
+                        index=pd.RangeIndex(start, stop),
+                    )
+        case suffix:
+            raise ValueError(f"Cannot read `{suffix}` files.")
+
+
+def read_rows(
+    path: Path, start: int, stop: int, columns: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """Read rows `start` up to `stop` of a CSV, HDF5 table, or columnar recording."""
+    with closing(read_chunks(path, columns, max(stop - start, 1), start)) as chunks:
+        rows = next(chunks, None)
+    return pd.DataFrame() if rows is None else rows.loc[start : stop - 1]
+
+
+def map_chunks(
+    function: Callable[[pd.DataFrame], T],
+    chunks: Iterable[pd.DataFrame],
+    executor: Executor | None = None,
+    ahead: int = AHEAD,
+) -> Iterator[T]:
+    """Apply a function to chunks, yielding results in order.
+
+    With an executor, at most `ahead` chunks are in flight, bounding memory use.
+    """
+    if executor is None:
+        yield from map(function, chunks)
+        return
+    pending: deque[Future[T]] = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(function, chunk))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Mergeable count, mean, spread, and extremes of numeric columns."""
+
+    columns: tuple[str, ...]
+    """Columns summarized."""
+    count: np.ndarray
+    """Values that are not missing."""
+    mean: np.ndarray
+    """Mean."""
+    m2: np.ndarray
+    """Sum of squared deviations from the mean."""
+    minimum: np.ndarray
+    """Smallest value."""
+    maximum: np.ndarray
+    """Largest value."""
+
+    @classmethod
+    def of(cls, frame: pd.DataFrame) -> Self:
+        """Summarize the numeric columns of a frame."""
+        numeric = frame.select_dtypes("number")
+        values = numeric.to_numpy(dtype=float)
+        with catch_warnings():
+            # ? Columns missing every value summarize as NaN
+            simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(values, axis=0)
+            return cls(
+                tuple(map(str, numeric.columns)),
+                np.sum(~np.isnan(values), axis=0),
+                mean,
+                np.nansum((values - mean) ** 2, axis=0),
+                np.nanmin(values, axis=0),
+                np.nanmax(values, axis=0),
+            )
+
+    def merge(self, other: Self) -> Self:
+        """Combine with the summary of other rows of the same columns."""
+        if self.columns != other.columns:
+            raise ValueError("Only summaries of the same columns can be merged.")
+        count = self.count + other.count
+        both = (self.count > 0) & (other.count > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = np.where(both, other.mean - self.mean, 0.0)
+            weight = np.where(both, other.count / count, 0.0)
+        return type(self)(
+            self.columns,
+            count,
+            np.where(self.count > 0, self.mean + delta * weight, other.mean),
+            self.m2 + other.m2 + delta**2 * self.count * weight,
+            np.fmin(self.minimum, other.minimum),
+            np.fmax(self.maximum, other.maximum),
+        )
+
+    def frame(self) -> pd.DataFrame:
+        """Tabulate the summary, one row per column."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+        return pd.DataFrame(
+            {
+                "count": self.count,
+                "mean": self.mean,
+                "std": std,
+                "min": self.minimum,
+                "max": self.maximum,
+            },
+            index=pd.Index(self.columns, name="column"),
+        )
+
+
+def summarize(
+    path: Path,
+    columns: Sequence[str] | None = None,
+    rows: int = CHUNK_ROWS,
+    executor: Executor | None = None,
+) -> pd.DataFrame:
+    """Summarize the numeric columns of a recording chunk by chunk."""
+    total: Summary | None = None
+    for summary in map_chunks(Summary.of, read_chunks(path, columns, rows), executor):
+        total = summary if total is None else total.merge(summary)
+    if total is None:
+        raise ValueError(f"{path} has no rows.")
+    return total.frame()
+
+
+def transform(
+    path: Path,
+    destination: Path,
+    function: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    columns: Sequence[str] | None = None,
+    rows: int = CHUNK_ROWS,
+    executor: Executor | None = None,
+) -> int:
+    """Transform a recording chunk by chunk, writing results as they are computed.
+
+    `function` derives columns, filters rows, or both, and may return frames of any
+    length. Without it, the recording is converted to the destination's format,
+    chosen by suffix as by `open_sink`. Returns the number of rows written.
+    """
+    chunks = read_chunks(path, columns, rows)
+    results = map_chunks(function, chunks, executor) if function else chunks
+    return run(results, [open_sink(destination)])
+
+
+def resample(
+    chunks: Iterable[pd.DataFrame], time: str, period: float
+) -> Iterator[pd.DataFrame]:
+    """Average rows into bins of `period` seconds of `time`, across chunk bounds.
+
+    Rows of the last bin of each chunk are carried to the next, since the bin may
+    continue there. Each bin is labeled by its start time, and empty bins are skipped.
+    """
+    carried: pd.DataFrame | None = None
+    for chunk in chunks:
+        rows = chunk if carried is None else pd.concat([carried, chunk])
+        if not len(rows):
+            continue
+        bins = np.floor(rows[time].to_numpy(dtype=float) / period)
+        whole = bins < bins[-1]
+        carried = rows[~whole]
+        if whole.any():
+            yield average(rows[whole], bins[whole], time, period)
+    if carried is not None and len(carried):
+        bins = np.floor(carried[time].to_numpy(dtype=float) / period)
+        yield average(carried, bins, time, period)
+
+
+def average(
+    rows: pd.DataFrame, bins: np.ndarray, time: str, period: float
+) -> pd.DataFrame:
+    """Average rows by bin, labeling each bin by its start time."""
+    averaged = rows.groupby(bins).mean()
+    averaged[time] = averaged.index.to_numpy() * period
+    return averaged.reset_index(drop=True)
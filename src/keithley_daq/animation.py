@@ -0,0 +1,262 @@
+"""Junction matrix animation.
+
+Pygame is only imported to play animations on a display, so headless use never
+needs it.
+"""
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from shutil import which
+from struct import pack
+from subprocess import PIPE, Popen
+from time import monotonic
+from typing import TypeAlias
+from zlib import compress, crc32
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.metrics import Metrics
+from keithley_daq.recording import load_recording
+from keithley_daq.timing import stage
+
+SIZE = 475
+"""Width and height of the window in pixels."""
+SQUARE = 100
+"""Width and height of each junction's square in pixels."""
+PADDING = 100
+"""Distance of squares from the window edges in pixels."""
+POSITIONS = (
+    (PADDING, PADDING),
+    (SIZE - PADDING - SQUARE, PADDING),
+    (PADDING, SIZE - PADDING - SQUARE),
+    (SIZE - PADDING - SQUARE, SIZE - PADDING - SQUARE),
+)
+"""Top-left corner of each junction's square, in reading order."""
+BACKGROUND = (255, 255, 255)
+"""Window color."""
+MINIMUM = 12.0
+"""Junction voltage in millivolts below which junctions are inactive."""
+MAXIMUM = 39.0
+"""Junction voltage in millivolts above which junctions are inactive."""
+INACTIVE = 220.0
+"""Intensity of inactive junctions."""
+BATCH = 256
+"""Frames rendered at once when writing animations."""
+VIDEOS = (".mp4", ".mkv", ".avi", ".mov", ".webm")
+"""Suffixes of video files, encoded by FFmpeg."""
+FPS = 60.0
+"""Frames per second drawn on displays."""
+CAPTION = "PVC Gel Matrix"
+"""Title of display windows."""
+
+
+def intensity(volts: np.ndarray) -> np.ndarray:
+    """Map junction voltages in millivolts to intensities, darker for higher."""
+    volts = np.asarray(volts, dtype=float)
+    active = (volts > MINIMUM) & (volts < MAXIMUM)
+    return np.where(active, 255 - (volts - MINIMUM) * 9.4444, INACTIVE)
+
+
+def colors(volts: np.ndarray) -> np.ndarray:
+    """Map junction voltages in millivolts to RGB colors along a new last axis."""
+    shade = intensity(volts)
+    return np.stack([np.full_like(shade, 255), shade, shade], axis=-1)
+
+
+def frames(volts: np.ndarray) -> np.ndarray:
+    """Render frames of junction voltages, one row per frame and column per junction.
+
+    Returns frames by height by width by RGB.
+    """
+    volts = np.atleast_2d(volts)
+    if volts.shape[1] > len(POSITIONS):
+        raise ValueError(f"At most {len(POSITIONS)} junctions can be drawn.")
+    rendered = np.empty((len(volts), SIZE, SIZE, 3), dtype=np.uint8)
+    rendered[...] = BACKGROUND
+    shades = colors(volts).astype(np.uint8)
+    for junction, (x, y) in enumerate(POSITIONS[: volts.shape[1]]):
+        rendered[:, y : y + SQUARE, x : x + SQUARE] = shades[:, None, None, junction]
+    return rendered
+
+
+Renderer: TypeAlias = Callable[[np.ndarray], np.ndarray]
+"""Render rows of junction voltages as frames by height by width by RGB."""
+
+
+def batches(
+    volts: np.ndarray, batch: int = BATCH, render: Renderer = frames
+) -> Iterator[np.ndarray]:
+    """Render frames in batches, bounding memory use by the batch size."""
+    volts = np.atleast_2d(volts)
+    for start in range(0, len(volts), batch):
+        chunk = volts[start : start + batch]
+        with stage("render", items=len(chunk)):
+            rendered = render(chunk)
+        yield rendered
+
+
+def write_frames(
+    volts: np.ndarray,
+    path: Path,
+    fps: float = 1 / 0.095,
+    batch: int = BATCH,
+    render: Renderer = frames,
+) -> int:
+    """Write rendered frames without a display, returning the number written.
+
+    Writes `.npy` paths as a frames by height by width by RGB array, video paths
+    with FFmpeg, and any other path as a directory of PNG frames. Frames are drawn
+    as squares unless another `render`, such as a `heatmap.Heatmap`, is given.
+    """
+    volts = np.atleast_2d(volts)
+    suffix = path.suffix.lower()
+    if suffix == ".npy":
+        out = np.lib.format.open_memmap(
+            path, mode="w+", dtype=np.uint8, shape=(len(volts), SIZE, SIZE, 3)
+        )
+        for start, rendered in zip(
+            range(0, len(volts), batch), batches(volts, batch, render), strict=True
+        ):
+            out[start : start + len(rendered)] = rendered
+        out.flush()
+    elif suffix in VIDEOS:
+        write_video(batches(volts, batch, render), path, fps)
+    else:
+        path.mkdir(parents=True, exist_ok=True)
+        for start, rendered in zip(
+            range(0, len(volts), batch), batches(volts, batch, render), strict=True
+        ):
+            for index, frame in enumerate(rendered, start=start):
+                (path / f"frame{index:06d}.png").write_bytes(encode_png(frame))
+    return len(volts)
+
+
+def write_video(chunks: Iterator[np.ndarray], path: Path, fps: float):
+    """Encode batches of frames as a video by piping raw frames to FFmpeg."""
+    if not (ffmpeg := which("ffmpeg")):
+        raise RuntimeError("FFmpeg is needed to write videos.")
+    with Popen(  # noqa: S603
+        [
+            *(ffmpeg, "-y", "-loglevel", "error"),
+            *("-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{SIZE}x{SIZE}"),
+            *("-r", f"{fps:g}", "-i", "-"),
+            # ? Common pixel formats need even dimensions
+            *("-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"),
+            str(path),
+        ],
+        stdin=PIPE,
+    ) as process:
+        assert process.stdin  # noqa: S101
+        for rendered in chunks:
+            process.stdin.write(rendered.tobytes())
+        process.stdin.close()
+        if process.wait():
+            raise RuntimeError(f"FFmpeg failed writing {path}.")
+
+
+def encode_png(frame: np.ndarray) -> bytes:
+    """Encode an RGB frame as a PNG."""
+    height, width, _ = frame.shape
+    rows = np.zeros((height, 1 + width * 3), dtype=np.uint8)
+    rows[:, 1:] = frame.reshape(height, -1)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return pack(">I", len(data)) + kind + data + pack(">I", crc32(kind + data))
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        # ? Fast compression suffices for frames of flat squares
+        chunk(b"IDAT", compress(rows.tobytes(), 1)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def show(
+    latest: Callable[[], np.ndarray | None],
+    fps: float = FPS,
+    caption: str = CAPTION,
+    render: Renderer | None = None,
+    running: Callable[[], bool] = lambda: True,
+    metrics: Metrics | None = None,
+) -> int:
+    """Show the latest junction voltages on a display until it is closed.
+
+    Window events are serviced every frame, and frames are paced by `fps` alone, so
+    the window stays responsive and resizable however fast `latest` changes. The
+    display also closes once `running` returns false. Junctions are drawn as squares
+    unless a `render`, such as a `heatmap.Heatmap`, is given. The duration of each
+    frame drawn is recorded in `metrics`. Returns the number of frames rendered.
+    """
+    import pygame  # noqa: PLC0415
+
+    render = render or frames
+    pygame.init()
+    try:
+        pygame.display.set_mode((SIZE, SIZE), pygame.RESIZABLE)
+        pygame.display.set_caption(caption)
+        canvas = pygame.Surface((SIZE, SIZE))
+        clock = pygame.time.Clock()
+        shown: np.ndarray | None = None
+        rendered = 0
+        while running():
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            start = monotonic()
+            volts = latest()
+            if volts is not None and (
+                shown is None or not np.array_equal(volts, shown)
+            ):
+                # ? Surface arrays are indexed by x before y
+                with stage("render", items=1):
+                    pixels = render(volts)[0].swapaxes(0, 1)
+                    pygame.surfarray.blit_array(canvas, pixels)
+                shown = volts
+                rendered += 1
+            screen = pygame.display.get_surface()
+            pygame.transform.scale(canvas, screen.get_size(), screen)
+            pygame.display.flip()
+            if metrics:
+                metrics.observe_frame(monotonic() - start)
+            clock.tick(fps)
+        return rendered
+    finally:
+        pygame.quit()
+
+
+def play(
+    volts: np.ndarray,
+    interval: float = 0.095,
+    caption: str = CAPTION,
+    render: Renderer | None = None,
+    fps: float = FPS,
+):
+    """Play junction voltages on a display, one row every `interval` seconds."""
+    rows = np.atleast_2d(volts)
+    start = monotonic()
+
+    def due() -> int:
+        return int((monotonic() - start) / interval)
+
+    show(
+        lambda: rows[min(due(), len(rows) - 1)],
+        fps,
+        caption,
+        render,
+        lambda: due() < len(rows),
+    )
+
+
+def load_voltages(path: Path, columns: tuple[str, ...], header: int = 0) -> np.ndarray:
+    """Load junction voltages from a CSV, HDF5, or Excel table, or a recording."""
+    match path.suffix.lower():
+        case ".daq":
+            table = load_recording(path, columns)
+        case ".xlsx" | ".xls":
+            table = pd.read_excel(path, header=header, usecols=list(columns))
+        case ".h5" | ".hdf5":
+            table = pd.read_hdf(path)
+        case _:
+            table = pd.read_csv(path, header=header, usecols=list(columns))
+    return table[list(columns)].to_numpy(dtype=float)  # type: ignore
@@ -0,0 +1,386 @@
+"""Instrument reading buffers."""
+
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from time import sleep
+
+import numpy as np
+
+from keithley_daq.instrument import Instrument
+from keithley_daq.metrics import Metrics
+from keithley_daq.scpi import channel_list, parse_values
+from keithley_daq.timing import CURRENT, stage
+from keithley_daq.types import BufferElement, BufferStyle, FillMode
+
+DEFAULT_ELEMENTS: tuple[BufferElement, ...] = ("READ", "EXTR", "REL")
+"""Elements queried for each reading unless otherwise requested."""
+
+
+@dataclass
+class ReadingBuffer:
+    """Reading buffer on the instrument."""
+
+    name: str
+    """Buffer name."""
+    capacity: int
+    """Number of readings the buffer holds."""
+    style: BufferStyle = "FULL"
+    """Buffer style."""
+    fill_mode: FillMode = "CONT"
+    """Fill mode."""
+    transferred: int = 0
+    """Bytes of data responses read from the buffer."""
+    executor: Executor | None = field(default=None, repr=False)
+    """Parses large data responses in parallel."""
+
+    def make(self, inst: Instrument):
+        """Create the buffer, clear it, and set its fill mode."""
+        with stage("setup"):
+            inst.write(f"TRAC:MAKE '{self.name}', {self.capacity}, {self.style}")
+            self.clear(inst)
+            inst.write(f":TRAC:FILL:MODE {self.fill_mode}, '{self.name}'")
+
+    def clear(self, inst: Instrument):
+        """Clear the buffer."""
+        inst.write(f"TRACe:CLEar '{self.name}'")
+
+    def extent(self, inst: Instrument) -> tuple[int, int]:
+        """One-based positions of the oldest and newest readings, zero if empty."""
+        start = int(inst.query(f':TRAC:ACTual:STARt? "{self.name}"'))
+        end = int(inst.query(f':TRAC:ACTual:END? "{self.name}"'))
+        if start > 1:
+            # ? A wrapped buffer may have advanced between the two queries
+            start = end % self.capacity + 1
+        elif end:
+            # ? An empty buffer may have stored its first reading in between
+            start = 1
+        return start, end
+
+    def fetch(
+        self,
+        inst: Instrument,
+        start: int,
+        end: int,
+        elements: Sequence[BufferElement] = DEFAULT_ELEMENTS,
+    ) -> np.ndarray:
+        """Fetch readings at positions `start` through `end`, one row per reading."""
+        with stage("transfer") as transfer:
+            response = inst.query(
+                f'TRAC:DATA? {start}, {end}, "{self.name}", {", ".join(elements)}'
+            )
+            transfer.bytes = len(response)
+        self.transferred += len(response)
+        with stage("parse", bytes=len(response)) as parse:
+            values = parse_values(response, self.executor)
+            parse.items = values.size
+        return values.reshape(-1, len(elements))
+
+    def fetch_range(
+        self,
+        inst: Instrument,
+        start: int,
+        end: int,
+        elements: Sequence[BufferElement] = DEFAULT_ELEMENTS,
+    ) -> np.ndarray:
+        """Fetch readings from `start` through `end`, following a wrap past the end."""
+        return np.concatenate([
+            self.fetch(inst, first, last, elements)
+            for first, last in ranges(start, end, self.capacity)
+        ])
+
+    def dump(
+        self, inst: Instrument, elements: Sequence[BufferElement] = DEFAULT_ELEMENTS
+    ) -> np.ndarray:
+        """Fetch every reading in the buffer, oldest first."""
+        start, end = self.extent(inst)
+        if not end:
+            return np.empty((0, len(elements)))
+        return self.fetch_range(inst, start, end, elements)
+
+
+def ranges(start: int, end: int, capacity: int) -> list[tuple[int, int]]:
+    """Split positions `start` through `end` of a circular buffer into plain ranges."""
+    return [(start, capacity), (1, end)] if start > end else [(start, end)]
+
+
+@dataclass
+class CaptureStats:
+    """Accounting for a double-buffered capture."""
+
+    blocks: int = 0
+    """Blocks drained."""
+    readings: int = 0
+    """Readings drained."""
+    dropped: int = 0
+    """Readings the scan should have stored but did not."""
+    overwritten: int = 0
+    """Readings overwritten before they were drained."""
+    stalls: int = 0
+    """Blocks that finished before the host was ready to switch buffers."""
+    idle: float = 0.0
+    """Seconds the scan sat idle between blocks, beyond one reading interval."""
+    longest_idle: float = 0.0
+    """Longest idle time between two blocks."""
+    last_time: float | None = None
+    """Absolute timestamp of the last reading drained."""
+
+
+@dataclass
+class DoubleBufferedCapture:
+    """Alternate scans between two reading buffers.
+
+    Each block of `scans_per_block` scans fills one buffer in `ONCE` fill mode while
+    the host drains the other, so readings can never be overwritten by a slow host.
+    The host only ever delays the next block, which is counted as a stall, and the
+    scan sits idle until it starts. Idle time is measured from reading timestamps
+    when `SEC` and `FRAC` are among the queried elements.
+    """
+
+    inst: Instrument
+    """Instrument."""
+    channels: Sequence[int]
+    """Channels to scan, in order."""
+    scans_per_block: int
+    """Scans stored in each buffer before switching."""
+    names: tuple[str, str] = ("ScanA", "ScanB")
+    """Names of the two buffers."""
+    elements: Sequence[BufferElement] = DEFAULT_ELEMENTS
+    """Elements queried for each reading."""
+    style: BufferStyle = "FULL"
+    """Style of both buffers."""
+    poll_interval: float = 0.001
+    """Seconds between trigger state polls while waiting for a block."""
+    wait: Callable[[float], None] = sleep
+    """Sleep function used between polls."""
+    executor: Executor | None = field(default=None, repr=False)
+    """Parses large blocks in parallel."""
+    stats: CaptureStats = field(default_factory=CaptureStats)
+    """Accounting for the capture so far."""
+    buffers: tuple[ReadingBuffer, ReadingBuffer] = field(init=False, repr=False)
+    """The two reading buffers."""
+    running: ReadingBuffer | None = field(default=None, init=False, repr=False)
+    """Buffer of the block being scanned, if any."""
+
+    def __post_init__(self):
+        first, second = (
+            ReadingBuffer(
+                name,
+                self.readings_per_block,
+                self.style,
+                "ONCE",
+                executor=self.executor,
+            )
+            for name in self.names
+        )
+        self.buffers = first, second
+
+    @property
+    def readings_per_block(self) -> int:
+        """Readings stored in each buffer per block."""
+        return self.scans_per_block * len(self.channels)
+
+    def configure(self):
+        """Create both buffers and the scan."""
+        for buffer in self.buffers:
+            buffer.make(self.inst)
+        with stage("setup"):
+            self.inst.write(f":ROUT:SCAN:CRE {channel_list(self.channels)}")
+            self.inst.write(f":ROUT:SCAN:COUN:SCAN {self.scans_per_block}")
+
+    def start(self, buffer: ReadingBuffer):
+        """Start the next block of scans into `buffer`."""
+        buffer.clear(self.inst)
+        self.inst.write(f":ROUT:SCAN:BUFF '{buffer.name}'")
+        self.inst.write("INIT")
+        self.running = buffer
+
+    def idle(self) -> bool:
+        """Whether the running block has finished."""
+        return self.inst.query(":TRIG:STAT?").split(";")[0].upper() == "IDLE"
+
+    def drain(self, buffer: ReadingBuffer, complete: bool = True) -> np.ndarray:
+        """Fetch a block and account for missing readings if it should be complete."""
+        start, end = buffer.extent(self.inst)
+        expected = self.readings_per_block if complete else end
+        self.stats.blocks += 1
+        if not end:
+            self.stats.dropped += expected
+            return np.empty((0, len(self.elements)))
+        # ? A wrapped buffer was not left in `ONCE` fill mode, so it lost its oldest
+        wrapped = start > 1
+        values = buffer.fetch_range(self.inst, start, end, self.elements)
+        missing = max(0, expected - len(values))
+        if wrapped:
+            self.stats.overwritten += missing
+        else:
+            self.stats.dropped += missing
+        self.stats.readings += len(values)
+        if {"SEC", "FRAC"} <= set(self.elements) and len(values):
+            self.measure_idle(values)
+        return values
+
+    def measure_idle(self, values: np.ndarray):
+        """Account for the idle time between the last block and this one."""
+        elements = list(self.elements)
+        times = values[:, elements.index("SEC")] + values[:, elements.index("FRAC")]
+        interval = (times[-1] - times[0]) / (len(times) - 1) if len(times) > 1 else 0
+        if self.stats.last_time is not None:
+            idle = max(0.0, float(times[0] - self.stats.last_time - interval))
+            self.stats.idle += idle
+            self.stats.longest_idle = max(self.stats.longest_idle, idle)
+        self.stats.last_time = float(times[-1])
+
+    def blocks(self, count: int | None = None) -> Iterator[np.ndarray]:
+        """Capture `count` blocks, or indefinitely, yielding each as it is drained."""
+        filling, draining = self.buffers
+        self.start(filling)
+        started = 1
+        drained = 0
+        try:
+            while count is None or drained < count:
+                if timings := CURRENT.get():
+                    timings.next_chunk()
+                polls = 0
+                with stage("wait"):
+                    while not self.idle():
+                        polls += 1
+                        self.wait(self.poll_interval)
+                if not polls and drained:
+                    self.stats.stalls += 1
+                self.running = None
+                filling, draining = draining, filling
+                if count is None or started < count:
+                    self.start(filling)
+                    started += 1
+                drained += 1
+                yield self.drain(draining)
+        finally:
+            self.inst.write("ABORT")
+
+    def remainder(self) -> np.ndarray:
+        """Drain the partial block of an aborted capture, which is empty otherwise."""
+        buffer, self.running = self.running, None
+        if buffer is None:
+            return np.empty((0, len(self.elements)))
+        return self.drain(buffer, complete=False)
+
+
+@dataclass
+class ReadStats:
+    """Accounting for incremental reads of a continuously filled buffer."""
+
+    reads: int = 0
+    """Reads that returned new readings."""
+    readings: int = 0
+    """Readings read."""
+    dropped: int = 0
+    """Readings estimated lost to overruns."""
+    overruns: int = 0
+    """Reads that found the buffer had lapped the cursor."""
+    bytes: int = 0
+    """Bytes of data responses read."""
+    first_time: float | None = None
+    """Relative timestamp of the first reading read."""
+    last_time: float | None = None
+    """Relative timestamp of the last reading read."""
+
+    @property
+    def duration(self) -> float:
+        """Seconds of instrument time spanned by the readings read."""
+        if self.first_time is None or self.last_time is None:
+            return 0.0
+        return self.last_time - self.first_time
+
+    @property
+    def effective_rate(self) -> float:
+        """Readings read per second of instrument time."""
+        return (self.readings - 1) / self.duration if self.duration else 0.0
+
+    @property
+    def loss(self) -> float:
+        """Fraction of readings lost to overruns."""
+        total = self.readings + self.dropped
+        return self.dropped / total if total else 0.0
+
+
+@dataclass
+class BufferCursor:
+    """Incrementally read a continuously filled buffer, detecting overruns.
+
+    The cursor remembers the position and relative timestamp of the last reading it
+    read. Each read starts at that position again, so if the reading found there has
+    a different timestamp, the buffer lapped the cursor. The whole buffer is then
+    read, and the readings lost in between are estimated from the timestamp gap.
+    """
+
+    inst: Instrument
+    """Instrument."""
+    buffer: ReadingBuffer
+    """Buffer to read."""
+    elements: Sequence[BufferElement] = DEFAULT_ELEMENTS
+    """Elements returned for each reading."""
+    position: int = 0
+    """Position of the last reading read, or zero before the first read."""
+    stats: ReadStats = field(default_factory=ReadStats)
+    """Accounting for reads so far."""
+    metrics: Metrics | None = None
+    """Live metrics to feed after each read."""
+
+    @property
+    def queried(self) -> tuple[BufferElement, ...]:
+        """Elements queried, including the relative timestamp used for accounting."""
+        return (*self.elements, *(() if "REL" in self.elements else ("REL",)))
+
+    def read(self) -> np.ndarray:
+        """Read readings stored since the last read, one row per reading."""
+        start, end = self.buffer.extent(self.inst)
+        if not end:
+            return np.empty((0, len(self.elements)))
+        time = self.queried.index("REL")
+        transferred, dropped = self.buffer.transferred, self.stats.dropped
+        lag = (end - self.position) % self.buffer.capacity if self.position else end
+        if not self.position:
+            values = self.buffer.fetch_range(self.inst, start, end, self.queried)
+        else:
+            values = self.buffer.fetch_range(
+                self.inst, self.position, end, self.queried
+            )
+            if values[0, time] == self.stats.last_time and increasing(values[:, time]):
+                values = values[1:]
+            else:
+                values = self.buffer.fetch_range(self.inst, start, end, self.queried)
+                # ? Drop readings overwritten during the fetch, the next read gets them
+                values = values[values[:, time] <= values[-1, time]]
+                self.overrun(values[:, time])
+        self.position = end
+        if len(values):
+            self.stats.reads += 1
+            self.stats.readings += len(values)
+            if self.stats.first_time is None:
+                self.stats.first_time = float(values[0, time])
+            self.stats.last_time = float(values[-1, time])
+        self.stats.bytes += self.buffer.transferred - transferred
+        if self.metrics is not None:
+            self.metrics.observe_read(
+                len(values),
+                self.buffer.transferred - transferred,
+                lag,
+                self.stats.dropped - dropped,
+            )
+        return values[:, : len(self.elements)]
+
+    def overrun(self, times: np.ndarray):
+        """Account for readings overwritten before they could be read."""
+        self.stats.overruns += 1
+        if self.stats.last_time is None or len(times) < 2:
+            return
+        interval = float(np.median(np.diff(times)))
+        if interval > 0:
+            gap = float(times[0]) - self.stats.last_time
+            self.stats.dropped += max(0, round(gap / interval) - 1)
+
+
+def increasing(times: np.ndarray) -> bool:
+    """Check that timestamps strictly increase, as they do unless overwritten."""
+    return bool(np.all(np.diff(times) > 0))
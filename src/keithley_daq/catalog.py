@@ -0,0 +1,215 @@
+"""Catalog of recorded runs in SQLite.
+
+The catalog records each run's configuration and location, and the count, minimum,
+maximum, and mean of every column in each chunk of rows. Queries answer from these
+statistics alone, and only the chunks they match are ever read from recordings.
+"""
+
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from json import dumps
+from pathlib import Path
+from sqlite3 import Connection, connect
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.analysis import Summary, read_chunks, read_rows
+from keithley_daq.config import RunConfig
+from keithley_daq.schema import COLUMNS
+from keithley_daq.scpi import parse_channel_list
+
+CHUNK_SIZE = 4096
+"""Rows summarized per chunk, which bounds the rows read per match."""
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    cataloged TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    channels TEXT NOT NULL,
+    function TEXT,
+    buffer TEXT NOT NULL,
+    shunt REAL NOT NULL,
+    reading_rate REAL NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    run INTEGER NOT NULL REFERENCES runs ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    channel INTEGER NOT NULL,
+    label TEXT,
+    PRIMARY KEY (run, position)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    run INTEGER NOT NULL REFERENCES runs ON DELETE CASCADE,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL,
+    column TEXT NOT NULL,
+    quantity TEXT,
+    position INTEGER,
+    count INTEGER NOT NULL,
+    minimum REAL,
+    maximum REAL,
+    mean REAL
+);
+CREATE INDEX IF NOT EXISTS chunks_by_maximum ON chunks (quantity, position, maximum);
+CREATE INDEX IF NOT EXISTS chunks_by_minimum ON chunks (quantity, position, minimum);
+CREATE INDEX IF NOT EXISTS chunks_by_column ON chunks (column, maximum);
+"""
+"""Tables of the catalog."""
+
+
+@dataclass
+class Catalog:
+    """SQLite catalog of recorded runs."""
+
+    path: Path
+    """Database file, created if missing."""
+    chunk_size: int = CHUNK_SIZE
+    """Rows summarized per chunk of newly cataloged runs."""
+    connection: Connection = field(init=False, repr=False)
+    """Connection to the database."""
+
+    def __post_init__(self):
+        self.connection = connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+    def add(self, recording: Path, config: RunConfig) -> int:
+        """Catalog a recording made with `config`, returning its run ID.
+
+        Recordings are read chunk by chunk. A recording already cataloged at the same
+        path, such as a `Data.csv` overwritten by each run, is replaced.
+        """
+        recording = recording.resolve()
+        scan = config.scan
+        channels = parse_channel_list(scan.channels)
+        quantities = {
+            column.label(n): (key, n)
+            for key, column in COLUMNS.items()
+            for n in range(1, len(channels) + 1)
+        }
+        with self.connection as connection:
+            connection.execute("DELETE FROM runs WHERE path = ?", (str(recording),))
+            run = connection.execute(
+                "INSERT INTO runs (path, cataloged, rows, channels, function, buffer,"
+                " shunt, reading_rate, config) VALUES (?, ?, 0, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(recording),
+                    datetime.now(UTC).isoformat(),
+                    scan.channels,
+                    scan.function,
+                    scan.buffer,
+                    scan.shunt,
+                    config.instrument.reading_rate,
+                    dumps(asdict(config), default=str),
+                ),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO channels VALUES (?, ?, ?, ?)",
+                [
+                    (run, n, channel, scan.labels.get(str(channel)))
+                    for n, channel in enumerate(channels, start=1)
+                ],
+            )
+            rows = 0
+            for chunk in read_chunks(recording, rows=self.chunk_size):
+                summary = Summary.of(chunk)
+                connection.executemany(
+                    "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            run,
+                            rows,
+                            rows + len(chunk),
+                            column,
+                            *quantities.get(column, (None, None)),
+                            int(summary.count[i]),
+                            nullable(summary.minimum[i]),
+                            nullable(summary.maximum[i]),
+                            nullable(summary.mean[i]),
+                        )
+                        for i, column in enumerate(summary.columns)
+                    ],
+                )
+                rows += len(chunk)
+            connection.execute("UPDATE runs SET rows = ? WHERE id = ?", (rows, run))
+        return run or 0
+
+    def runs(self) -> pd.DataFrame:
+        """List cataloged runs, with their channel labels."""
+        return pd.read_sql_query(
+            "SELECT runs.id, path, cataloged, rows, runs.channels, function, buffer,"
+            " shunt, reading_rate, group_concat(label, ', ') AS labels"
+            " FROM runs LEFT JOIN channels ON channels.run = runs.id"
+            " GROUP BY runs.id ORDER BY runs.id",
+            self.connection,
+            index_col="id",
+        )
+
+    def find(
+        self,
+        quantity: str | None = None,
+        label: str | None = None,
+        column: str | None = None,
+        above: float | None = None,
+        below: float | None = None,
+    ) -> pd.DataFrame:
+        """Find chunks whose values exceed `above` or fall short of `below`.
+
+        Chunks are selected by a derived `quantity` such as `power` of the channel
+        labeled `label`, or by `column` name. Returns one row per matching chunk, with
+        the recording's path and the chunk's rows and statistics.
+        """
+        conditions, parameters = [], []
+        for condition, value in [
+            ("chunks.quantity = ?", quantity),
+            ("channels.label = ?", label),
+            ("chunks.column = ?", column),
+            ("chunks.maximum > ?", above),
+            ("chunks.minimum < ?", below),
+        ]:
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        # ? Only fixed conditions are joined, values are bound as parameters
+        return pd.read_sql_query(
+            "SELECT chunks.run, runs.path, chunks.column, channels.label, chunks.start,"  # noqa: S608
+            " chunks.stop, chunks.count, chunks.minimum, chunks.maximum, chunks.mean"
+            " FROM chunks JOIN runs ON runs.id = chunks.run"
+            " LEFT JOIN channels"
+            " ON channels.run = chunks.run AND channels.position = chunks.position"
+            f" WHERE {' AND '.join(conditions) or '1'}"
+            " ORDER BY chunks.run, chunks.start",
+            self.connection,
+            params=parameters,
+        )
+
+    def load(
+        self, matches: pd.DataFrame, columns: Sequence[str] | None = None
+    ) -> pd.DataFrame:
+        """Read only the rows of matching chunks, all columns unless `columns`.
+
+        Returns the rows indexed by run and row number.
+        """
+        frames = {
+            (run, start): read_rows(Path(path), start, stop, columns)
+            for run, path, start, stop in matches[["run", "path", "start", "stop"]]
+            .drop_duplicates()
+            .itertuples(index=False)
+        }
+        if not frames:
+            return pd.DataFrame()
+        loaded = pd.concat(frames, names=["run", "chunk", "row"])
+        return loaded.droplevel("chunk")
+
+
+def nullable(value: float) -> float | None:
+    """Store missing statistics as NULL."""
+    return None if np.isnan(value) else float(value)
@@ -0,0 +1,330 @@
+"""Command line interface.
+
+Headless subcommands never import pygame, so they run on display-less machines.
+"""
+
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable, Generator, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import replace
+from pathlib import Path
+from threading import Event
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.alignment import Aligner, align
+from keithley_daq.analysis import summarize, transform
+from keithley_daq.animation import Renderer, frames, load_voltages, play, write_frames
+from keithley_daq.catalog import Catalog
+from keithley_daq.config import InstrumentConfig, RenderConfig, RunConfig
+from keithley_daq.energy import EnergyIntegrator
+from keithley_daq.fanout import Branch, FanOut
+from keithley_daq.filters import Filter
+from keithley_daq.heatmap import CENTERS, Heatmap
+from keithley_daq.instrument import Instrument, get_instrument
+from keithley_daq.live import LatestSink, live
+from keithley_daq.metrics import Metrics, TextfileExporter
+from keithley_daq.pipeline import Sink, open_sink, record
+from keithley_daq.position import PositionEstimator, PositionSink, marked, published
+from keithley_daq.profiler import BusProfiler
+from keithley_daq.profiles import PROFILES, calibrate
+from keithley_daq.replay import Replay, load_run
+from keithley_daq.scpi import parse_channel_list
+from keithley_daq.simulator import Simulator
+from keithley_daq.storage import STORAGES
+from keithley_daq.timing import Timings
+from keithley_daq.tsp import ScriptStandIn, TspInstrument
+from keithley_daq.types import Capture
+
+
+@contextmanager
+def connect(
+    config: InstrumentConfig, capture: Capture = "cursor"
+) -> Generator[Instrument, None, None]:
+    """Connect to the configured instrument, simulator, or replay.
+
+    Simulated TSP captures run against a stand-in for the acquisition script, and
+    replays cannot run TSP scripts.
+    """
+    if not (config.replay or config.simulate):
+        with get_instrument(config.resource, config.timeout, config.reset) as inst:
+            yield inst
+        return
+    inst: Instrument
+    if config.replay:
+        run = load_run(config.replay, config.reading_rate, config.header)
+        inst = Replay(run, config.speed, config.reading_rate)
+    elif capture == "tsp":
+        inst = ScriptStandIn(config.reading_rate)
+    else:
+        inst = Simulator(reading_rate=config.reading_rate)
+    if capture == "tsp" and not isinstance(inst, TspInstrument):
+        raise ValueError(f"{type(inst).__name__} cannot run TSP scripts.")
+    yield inst
+
+
+def acquire(
+    config: RunConfig,
+    extra: Sequence[Sink] = (),
+    stop: Event | None = None,
+    timings: Timings | None = None,
+) -> Path:
+    """Acquire the configured scan and record its derived columns.
+
+    Frames are also written to `extra` sinks, and acquisition ends early once `stop`
+    is set. When stage timings are recorded, into `timings` if given, they are
+    written next to the recording and their summary is printed.
+    """
+    scan, output = config.scan, config.output
+    channels = parse_channel_list(scan.channels)
+    metrics = Metrics()
+    storage = STORAGES[output.precision]
+    sinks: list[Sink] = [open_sink(output.path, storage), *extra]
+    if output.metrics:
+        sinks.append(TextfileExporter(output.metrics, [metrics]))
+    timings = timings or Timings()
+    profiler = None
+    with connect(config.instrument, scan.capture) as inst, timings.record():
+        if config.instrument.profile:
+            inst = profiler = BusProfiler(inst)
+        record(
+            inst,
+            channels,
+            scan.columns,
+            sinks,
+            scan.duration,
+            scan.buffer,
+            scan.shunt,
+            config.instrument.reading_rate,
+            scan.poll_interval,
+            setup=(
+                PROFILES[scan.profile].commands(
+                    channels, scan.function or "VOLT:DC", scan.fixed_range
+                )
+                if scan.profile
+                else []
+            ),
+            metrics=metrics,
+            storage=storage,
+            energy=(
+                EnergyIntegrator(scan.energy_window, storage)
+                if scan.energy_window
+                else None
+            ),
+            stop=stop,
+            capture=scan.capture,
+            function=scan.function,
+            labels={int(channel): label for channel, label in scan.labels.items()},
+        )
+    if profiler:
+        profiler.report(output.path)
+    if output.catalog:
+        index(config)
+    if output.timings:
+        timings.write(output.path)
+        print(timings.summary().to_string())  # noqa: T201
+    return output.path
+
+
+def index(config: RunConfig) -> Path:
+    """Add the recording to the run catalog."""
+    if not config.output.catalog:
+        raise ValueError("The run file sets no `output.catalog`.")
+    with closing(Catalog(config.output.catalog)) as catalog:
+        catalog.add(config.output.path, config)
+    return config.output.catalog
+
+
+def calibration(config: RunConfig) -> Path:
+    """Measure the rate and noise of each speed profile next to the recording."""
+    scan = config.scan
+    with connect(config.instrument) as inst:
+        results = calibrate(
+            inst,
+            parse_channel_list(scan.channels),
+            scan.function or "VOLT:DC",
+            range_=scan.fixed_range,
+        )
+    path = config.output.path.with_name(f"{config.output.path.stem}.calibration.csv")
+    results.to_csv(path)
+    return path
+
+
+def renderer(
+    settings: RenderConfig, positions: PositionSink | None = None
+) -> Renderer | None:
+    """Get the configured renderer, or `None` to draw plain squares.
+
+    Markers are drawn from estimates published to `positions` if given, or else
+    estimated from the voltages drawn.
+    """
+    centers = CENTERS[: len(settings.columns)]
+    render = Heatmap(centers, settings.heatmap) if settings.heatmap else None
+    if settings.marker and positions:
+        render = published(render or frames, positions)
+    elif settings.marker:
+        render = marked(render or frames, PositionEstimator(centers))
+    return render
+
+
+def smoothing(settings: RenderConfig, rate: float) -> Filter | None:
+    """Get the configured filter of junction voltages read `rate` times a second."""
+    if not (settings.cutoff or settings.mains or settings.average > 1):
+        return None
+    return Filter.design(
+        settings.rate or rate, settings.cutoff, settings.mains, settings.average
+    )
+
+
+def voltages(config: RunConfig) -> np.ndarray:
+    """Load junction voltages to animate in millivolts, filtered as configured."""
+    settings = config.render
+    volts = settings.scale * load_voltages(
+        settings.source or config.output.path, settings.columns, settings.header
+    )
+    smoothed = smoothing(settings, 1 / settings.interval)
+    return smoothed.apply(volts) if smoothed else volts
+
+
+def watch(config: RunConfig) -> Path:
+    """Acquire the configured scan while showing its junction matrix on a display.
+
+    Junction voltages are filtered as configured, at the scan rate by default.
+    Contact positions are estimated from every frame off the acquisition thread,
+    and only the latest current one is marked.
+    """
+    settings = config.render
+    scans = config.instrument.reading_rate / len(
+        parse_channel_list(config.scan.channels)
+    )
+    latest = LatestSink(settings.columns, settings.scale, smoothing(settings, scans))
+    sinks: list[Sink] = [latest]
+    positions = None
+    if settings.marker:
+        positions = PositionSink(
+            PositionEstimator(
+                CENTERS[: len(settings.columns)],
+                columns=settings.columns,
+                scale=settings.scale,
+            )
+        )
+        sinks.append(FanOut([Branch(positions, "positions", "keep-latest")]))
+    # ? Share timings with the display, whose frames are timed as rendering
+    timings = Timings()
+    with timings.record():
+        return live(
+            lambda stop: acquire(config, sinks, stop, timings),
+            latest,
+            render=renderer(settings, positions),
+        )
+
+
+def replay(config: RunConfig):
+    """Play the junction matrix animation of a recording on a display."""
+    settings = config.render
+    play(voltages(config), settings.interval, render=renderer(settings))
+
+
+def render(config: RunConfig) -> Path:
+    """Render the junction matrix animation of a recording to frames."""
+    settings = config.render
+    write_frames(
+        voltages(config),
+        settings.output,
+        1 / settings.interval,
+        settings.batch,
+        renderer(settings) or frames,
+    )
+    return settings.output
+
+
+def export(config: RunConfig, destination: Path) -> Path:
+    """Export the recording chunk by chunk to a format chosen by suffix."""
+    transform(config.output.path, destination)
+    return destination
+
+
+def alignment(config: RunConfig, destination: Path, aligner: Aligner) -> Path:
+    """Align the recording's channels onto a common time grid chunk by chunk."""
+    align(config.output.path, destination, aligner)
+    return destination
+
+
+def summary(config: RunConfig) -> pd.DataFrame:
+    """Summarize the recording's columns chunk by chunk."""
+    return summarize(config.output.path)
+
+
+def parser() -> ArgumentParser:
+    """Build the argument parser."""
+    parser = ArgumentParser(
+        prog="keithley-daq", description="Acquire, replay, render, and export runs."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_ in {
+        "acquire": "Acquire a scan and record it.",
+        "watch": "Acquire a scan and record it while showing it on a display.",
+        "calibrate": "Measure the reading rate and noise of each speed profile.",
+        "replay": "Play a recording's animation on a display.",
+        "render": "Render a recording's animation to a video or images without a display.",
+        "export": "Export a recording to another format.",
+        "align": "Align a recording's channels onto a common time grid.",
+        "summarize": "Summarize a recording's columns.",
+        "index": "Add a recording to the run catalog.",
+    }.items():
+        command = commands.add_parser(name, help=help_)
+        command.add_argument("run", type=Path, help="TOML run file.")
+        if name in {"acquire", "watch", "calibrate"}:
+            command.add_argument(
+                "--simulate", action="store_true", help="Use the simulator."
+            )
+        if name in {"replay", "render"}:
+            command.add_argument("--source", type=Path, help="Table of voltages.")
+        if name in {"export", "align"}:
+            command.add_argument("destination", type=Path, help="File to write to.")
+        if name == "align":
+            command.add_argument(
+                "--period", type=float, help="Seconds between uniform grid times."
+            )
+            command.add_argument(
+                "--reference",
+                type=int,
+                default=1,
+                help="Channel position whose timestamps are the grid without a period.",
+            )
+            command.add_argument(
+                "--method", choices=["linear", "nearest"], default="linear"
+            )
+    return parser
+
+
+COMMANDS: dict[str, Callable[[RunConfig, Namespace], object]] = {
+    "acquire": lambda config, _: acquire(config),
+    "watch": lambda config, _: watch(config),
+    "calibrate": lambda config, _: calibration(config),
+    "replay": lambda config, _: replay(config),
+    "render": lambda config, _: render(config),
+    "export": lambda config, parsed: export(config, parsed.destination),
+    "align": lambda config, parsed: alignment(
+        config,
+        parsed.destination,
+        Aligner(parsed.period, parsed.reference, parsed.method),
+    ),
+    "summarize": lambda config, _: summary(config).to_string(),
+    "index": lambda config, _: index(config),
+}
+"""Run each subcommand, returning what to print."""
+
+
+def main(args: Sequence[str] | None = None) -> int:
+    """Run the command line interface."""
+    parsed = parser().parse_args(args)
+    config = RunConfig.load(parsed.run)
+    if getattr(parsed, "simulate", False):
+        config = replace(config, instrument=replace(config.instrument, simulate=True))
+    if getattr(parsed, "source", None):
+        config = replace(config, render=replace(config.render, source=parsed.source))
+    if (result := COMMANDS[parsed.command](config, parsed)) is not None:
+        print(result)  # noqa: T201
+    return 0
@@ -0,0 +1,179 @@
+"""Run configuration loaded from TOML."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from tomllib import load
+from typing import Any, Self
+
+from keithley_daq.profiles import PROFILES, RANGE
+from keithley_daq.recording import SUFFIX
+from keithley_daq.schema import COLUMNS, POWER_COLUMNS
+from keithley_daq.types import Capture, Precision, SpeedProfileName, Weighting
+
+
+@dataclass(frozen=True)
+class InstrumentConfig:
+    """Instrument connection."""
+
+    resource: str | None = None
+    """VISA resource, or `None` for the first one found."""
+    timeout: int = 2000
+    """Timeout in milliseconds."""
+    reset: bool = True
+    """Whether to reset the instrument on connecting."""
+    simulate: bool = False
+    """Whether to run against the simulator instead of an instrument."""
+    reading_rate: float = 1000.0
+    """Expected readings per second across the scan list, used to plan the buffer."""
+    replay: Path | None = None
+    """Recording or Keithley scan export to replay instead of connecting."""
+    speed: float = 1.0
+    """Playback speed of replays relative to real time, `inf` to replay readings as
+    fast as they are read."""
+    header: int = 0
+    """Row of the replayed table holding column names."""
+    profile: bool = False
+    """Whether to profile bus traffic, writing a summary next to the recording."""
+
+
+@dataclass(frozen=True)
+class ScanConfig:
+    """Scan to acquire."""
+
+    channels: str = "(@101:103)"
+    """SCPI channel list."""
+    function: str | None = "VOLT:DC:RAT"
+    """Measurement function of the scanned channels, or `None` to leave it as is."""
+    labels: dict[str, str] = field(default_factory=dict)
+    """Label of each channel, keyed by channel number."""
+    buffer: str = "Power"
+    """Reading buffer name."""
+    duration: float = 18.0
+    """Seconds to acquire for."""
+    poll_interval: float = 0.1
+    """Seconds between reads of the buffer."""
+    columns: tuple[str, ...] = POWER_COLUMNS
+    """Columns to derive for each channel."""
+    shunt: float = 10.3
+    """Shunt resistance in ohms."""
+    profile: SpeedProfileName | None = None
+    """Speed profile, or `None` to keep instrument defaults."""
+    fixed_range: float = RANGE
+    """Range in volts used by profiles that do not autorange."""
+    energy_window: float | None = None
+    """Seconds to average power over while integrating energy, or `None` to not
+    integrate energy."""
+    capture: Capture = "cursor"
+    """Whether to read one wrapping buffer, alternate between two buffers that slow
+    hosts can never overwrite, or stream such buffers from a TSP script, which needs
+    the instrument's TSP command set."""
+
+    def __post_init__(self):
+        if unknown := set(self.columns) - set(COLUMNS):
+            raise ValueError(f"Unknown columns {sorted(unknown)}.")
+        if self.profile is not None and self.profile not in PROFILES:
+            raise ValueError(f"Unknown speed profile {self.profile!r}.")
+
+
+@dataclass(frozen=True)
+class OutputConfig:
+    """Where acquired data goes."""
+
+    path: Path = Path("Data.csv")
+    """Recording of the derived columns, as CSV or a columnar `.daq` directory."""
+    precision: Precision = "double"
+    """Precision of recorded columns, where `compact` stores single precision values
+    and nanosecond timestamps, only in columnar `.daq` recordings."""
+    timings: bool = False
+    """Whether to write stage timings next to the recording."""
+    metrics: Path | None = None
+    """Prometheus text file to export live metrics to, if any."""
+    catalog: Path | None = None
+    """SQLite run catalog to index recordings in, if any."""
+
+    def __post_init__(self):
+        if self.precision != "double" and self.path.suffix.lower() != SUFFIX:
+            raise ValueError(
+                f"{self.precision.capitalize()} precision needs a `{SUFFIX}` recording."
+            )
+
+
+@dataclass(frozen=True)
+class RenderConfig:
+    """Junction matrix animation."""
+
+    source: Path | None = None
+    """Table of junction voltages, defaulting to the recording."""
+    columns: tuple[str, ...] = ("CH111", "CH112", "CH113", "CH114")
+    """Voltage column of each junction."""
+    scale: float = 1.0
+    """Factor converting column values to millivolts, such as 1000 for volts."""
+    header: int = 0
+    """Row of the source table holding column names."""
+    interval: float = 0.095
+    """Seconds between frames when replaying, and the frame period of videos."""
+    output: Path = Path("frames.npy")
+    """Rendered frames, as an `.npy` array, a video, or a directory of PNGs."""
+    batch: int = 256
+    """Frames rendered at once."""
+    heatmap: Weighting | None = None
+    """Weighting of a heatmap interpolated across the window, or `None` to draw
+    junctions as squares."""
+    marker: bool = False
+    """Whether to mark the estimated contact position."""
+    rate: float | None = None
+    """Rows per second of the source for filtering, defaulting to one per `interval`
+    when replaying and to the scan rate when watching live."""
+    cutoff: float | None = None
+    """Frequency in hertz above which junction voltages are filtered out, or `None`
+    to not low-pass filter them."""
+    mains: float | None = None
+    """Mains frequency in hertz rejected from junction voltages, or `None` to not
+    reject it."""
+    average: int = 1
+    """Readings of each junction averaged over in a moving window."""
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Configuration of a run."""
+
+    instrument: InstrumentConfig = field(default_factory=InstrumentConfig)
+    """Instrument connection."""
+    scan: ScanConfig = field(default_factory=ScanConfig)
+    """Scan to acquire."""
+    output: OutputConfig = field(default_factory=OutputConfig)
+    """Where acquired data goes."""
+    render: RenderConfig = field(default_factory=RenderConfig)
+    """Junction matrix animation."""
+
+    @classmethod
+    def load(cls, path: Path) -> Self:
+        """Load a run file, resolving its paths relative to it."""
+        with path.open("rb") as file:
+            data = load(file)
+        return resolve(cls, data, path.parent)
+
+
+def resolve(cls: Any, data: Mapping[str, Any], root: Path) -> Any:
+    """Build a config dataclass from a TOML table, rejecting unknown keys."""
+    known = {f.name: f for f in fields(cls)}
+    if unknown := set(data) - set(known):
+        raise ValueError(f"Unknown {cls.__name__} keys {sorted(unknown)}.")
+    values: dict[str, Any] = {}
+    for name, value in data.items():
+        default = getattr(cls(), name)
+        if hasattr(default, "__dataclass_fields__"):
+            value = resolve(type(default), value, root)
+        elif isinstance(default, Path) or name in {
+            "metrics",
+            "source",
+            "catalog",
+            "replay",
+        }:
+            value = root / value
+        elif isinstance(default, tuple):
+            value = tuple(value)
+        values[name] = value
+    return cls(**values)
@@ -0,0 +1,99 @@
+"""Streaming energy integration of power columns."""
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.schema import COLUMNS
+from keithley_daq.storage import STORAGES, Storage
+from keithley_daq.timing import stage
+
+ENERGY = "Energy {n} [J]"
+"""Cumulative energy column of the `n`th channel."""
+AVERAGE = "Average Power {n} [W]"
+"""Windowed average power column of the `n`th channel."""
+
+
+@dataclass
+class ChannelEnergy:
+    """Integration state carried between chunks for one channel."""
+
+    energy: float = 0.0
+    """Joules integrated so far."""
+    times: np.ndarray = field(default_factory=lambda: np.empty(0))
+    """Timestamps in seconds of readings within the window, the last one included."""
+    energies: np.ndarray = field(default_factory=lambda: np.empty(0))
+    """Cumulative energy at each of `times`."""
+    power: float = 0.0
+    """Power of the last reading."""
+
+
+@dataclass
+class EnergyIntegrator:
+    """Integrate power columns over their timestamps, carrying state between chunks.
+
+    Energy is integrated with the trapezoid rule over the real timestamp of each
+    reading, so irregular intervals and gaps are accounted for. Each update costs time
+    proportional to the chunk and the readings within the averaging window.
+    """
+
+    window: float = 1.0
+    """Seconds of trailing readings averaged over for average power."""
+    storage: Storage = STORAGES["double"]
+    """Storage of the frames' columns, for converting timestamps to seconds."""
+    channels: dict[int, ChannelEnergy] = field(default_factory=dict)
+    """Integration state by one-based channel position."""
+
+    def update(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Add cumulative energy and average power columns to a frame of power."""
+        derived: dict[str, np.ndarray] = {}
+        with stage("integrate", items=len(frame)):
+            n = 1
+            while (power := COLUMNS["power"].label(n)) in frame:
+                if (time := COLUMNS["time"].label(n)) not in frame:
+                    raise ValueError(f"Integrating `{power}` needs `{time}`.")
+                times = self.storage.seconds(frame[time].to_numpy()).astype(float)
+                derived[ENERGY.format(n=n)], derived[AVERAGE.format(n=n)] = (
+                    self.channel(n, times, frame[power].to_numpy(dtype=float))
+                )
+                n += 1
+        return frame.assign(**derived)
+
+    def channel(
+        self, n: int, times: np.ndarray, power: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Integrate a chunk of one channel, returning energy and average power."""
+        state = self.channels.setdefault(n, ChannelEnergy())
+        if not len(times):
+            return np.empty(0), np.empty(0)
+        if len(state.times):
+            previous_time, previous_power = state.times[-1:], [state.power]
+        else:
+            previous_time, previous_power = times[:1], power[:1]
+        edges = np.concatenate([previous_time, times])
+        levels = np.concatenate([previous_power, power])
+        steps = np.diff(edges) * (levels[1:] + levels[:-1]) / 2
+        energy = state.energy + np.cumsum(steps)
+        history = np.concatenate([state.times, times])
+        energies = np.concatenate([state.energies, energy])
+        # ? Average from the earliest reading within the window, exactly integrated
+        first = np.searchsorted(history, times - self.window, side="left")
+        span = times - history[first]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average = np.where(span > 0, (energy - energies[first]) / span, power)
+        kept = np.searchsorted(history, times[-1] - self.window, side="left")
+        state.times, state.energies = history[kept:], energies[kept:]
+        state.energy, state.power = float(energy[-1]), float(power[-1])
+        return energy, average
+
+    def stream(self, frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Add energy and average power columns to frames as they arrive."""
+        for frame in frames:
+            yield self.update(frame)
+
+    @property
+    def totals(self) -> dict[str, float]:
+        """Joules integrated so far, by energy column."""
+        return {ENERGY.format(n=n): state.energy for n, state in self.channels.items()}
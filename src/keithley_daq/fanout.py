@@ -0,0 +1,185 @@
+"""Fan-out of a frame stream to sinks consuming at their own pace."""
+
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from threading import Condition, Thread
+from time import monotonic
+
+import pandas as pd
+
+from keithley_daq.metrics import Metrics
+from keithley_daq.pipeline import Sink
+from keithley_daq.types import Backpressure
+
+
+@dataclass
+class BranchStats:
+    """Accounting for one fan-out branch."""
+
+    frames: int = 0
+    """Frames received."""
+    written: int = 0
+    """Frames written to the sink."""
+    dropped: int = 0
+    """Frames dropped because the sink fell behind."""
+    dropped_rows: int = 0
+    """Rows in dropped frames."""
+    depth: int = 0
+    """Frames waiting in the queue."""
+    max_depth: int = 0
+    """Most frames ever waiting in the queue."""
+    lag: float = 0.0
+    """Seconds the last written frame waited in the queue."""
+    max_lag: float = 0.0
+    """Most seconds any frame waited in the queue."""
+    blocked: float = 0.0
+    """Seconds the producer spent blocked on a full queue."""
+
+
+@dataclass
+class Branch:
+    """A sink fed from a bounded queue by its own thread.
+
+    Sinks share frames, so they must not modify them.
+    """
+
+    sink: Sink
+    """Sink."""
+    name: str
+    """Name used in metrics."""
+    policy: Backpressure = "block"
+    """What to do when the queue is full. `block` stalls the producer and loses
+    nothing, `drop-oldest` discards the oldest queued frame, and `keep-latest` only
+    keeps the newest frame, for live views."""
+    size: int = 8
+    """Most frames queued."""
+    clock: Callable[[], float] = monotonic
+    """Time source in seconds."""
+    stats: BranchStats = field(default_factory=BranchStats)
+    """Accounting so far."""
+    queue: deque[tuple[float, pd.DataFrame]] = field(default_factory=deque, repr=False)
+    """Queued frames and the times they were queued."""
+    condition: Condition = field(default_factory=Condition, repr=False)
+    """Guards the queue."""
+    closed: bool = False
+    """Whether the producer has finished."""
+    error: BaseException | None = None
+    """Error raised by the sink, which stops the branch."""
+    thread: Thread | None = field(default=None, repr=False)
+    """Thread writing to the sink."""
+
+    def start(self):
+        """Start writing queued frames to the sink."""
+        self.thread = Thread(target=self.work, name=f"fanout-{self.name}", daemon=True)
+        self.thread.start()
+
+    def put(self, frame: pd.DataFrame):
+        """Queue a frame, applying the backpressure policy if the queue is full."""
+        with self.condition:
+            self.raise_error()
+            self.stats.frames += 1
+            if self.policy == "keep-latest":
+                self.drop(len(self.queue))
+            elif len(self.queue) >= self.size:
+                if self.policy == "drop-oldest":
+                    self.drop(1)
+                else:
+                    start = self.clock()
+                    self.condition.wait_for(
+                        lambda: len(self.queue) < self.size or self.error is not None
+                    )
+                    self.stats.blocked += self.clock() - start
+                    self.raise_error()
+            self.queue.append((self.clock(), frame))
+            self.stats.depth = len(self.queue)
+            self.stats.max_depth = max(self.stats.max_depth, self.stats.depth)
+            self.condition.notify_all()
+
+    def drop(self, count: int):
+        """Drop the oldest queued frames."""
+        for _ in range(count):
+            _, frame = self.queue.popleft()
+            self.stats.dropped += 1
+            self.stats.dropped_rows += len(frame)
+
+    def work(self):
+        """Write queued frames to the sink until closed and drained."""
+        try:
+            self.drain()
+        except BaseException as err:  # noqa: BLE001
+            with self.condition:
+                self.error = err
+                self.condition.notify_all()
+
+    def drain(self):
+        """Write queued frames as they arrive, closing the sink once closed."""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.queue or self.closed)
+                if not self.queue:
+                    break
+                queued, frame = self.queue.popleft()
+                self.stats.depth = len(self.queue)
+                self.condition.notify_all()
+            self.sink.write(frame)
+            self.stats.lag = self.clock() - queued
+            self.stats.max_lag = max(self.stats.max_lag, self.stats.lag)
+            self.stats.written += 1
+        self.sink.close()
+
+    def close(self):
+        """Finish writing queued frames and close the sink."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join()
+
+    def raise_error(self):
+        """Raise the sink's error, if any."""
+        if self.error is not None:
+            raise RuntimeError(f"Sink `{self.name}` failed.") from self.error
+
+
+@dataclass
+class FanOut:
+    """Sink feeding each of several branches through its own bounded queue.
+
+    A slow sink only holds up the producer if its policy is `block`.
+    """
+
+    branches: Sequence[Branch]
+    """Branches fed."""
+    metrics: Metrics | None = None
+    """Live metrics to report queue depths to."""
+    started: bool = False
+    """Whether branch threads are running."""
+
+    def start(self):
+        """Start branch threads, unless already running."""
+        if not self.started:
+            for branch in self.branches:
+                branch.start()
+            self.started = True
+
+    def write(self, frame: pd.DataFrame):
+        """Queue a frame on every branch."""
+        self.start()
+        for branch in self.branches:
+            branch.put(frame)
+            if self.metrics:
+                self.metrics.observe_queue(branch.name, branch.stats.depth)
+
+    def close(self):
+        """Drain and close every branch, raising the first sink error."""
+        self.start()
+        for branch in self.branches:
+            branch.close()
+        for branch in self.branches:
+            branch.raise_error()
+
+    @property
+    def stats(self) -> dict[str, BranchStats]:
+        """Accounting for each branch, by name."""
+        return {branch.name: branch.stats for branch in self.branches}
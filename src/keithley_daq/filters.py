@@ -0,0 +1,159 @@
+"""Streaming digital filters of channel readings.
+
+Filters run on every channel at once, on rows of readings taken at a fixed rate.
+Each is a cascade of biquad sections, such as low-pass and mains notch sections,
+followed by an optional moving average. Filter state is carried between chunks, so
+filtering a run chunk by chunk gives the same result as filtering it whole.
+"""
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import cache
+from math import cos, pi, sin, sqrt
+from typing import Self
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from keithley_daq.timing import stage
+
+BUTTERWORTH = 1 / sqrt(2)
+"""Quality factor of a maximally flat second-order low-pass section."""
+NOTCH_QUALITY = 30.0
+"""Quality factor of notch sections, the notch frequency over its width."""
+
+
+def lowpass(cutoff: float, rate: float, quality: float = BUTTERWORTH) -> np.ndarray:
+    """Design a second-order low-pass section, as `b0, b1, b2, a1, a2`."""
+    w, alpha = section(cutoff, rate, quality)
+    b = np.array([1 - cos(w), 2 * (1 - cos(w)), 1 - cos(w)]) / 2
+    return normalize(b, alpha, w)
+
+
+def notch(frequency: float, rate: float, quality: float = NOTCH_QUALITY) -> np.ndarray:
+    """Design a notch section rejecting `frequency`, as `b0, b1, b2, a1, a2`."""
+    w, alpha = section(frequency, rate, quality)
+    return normalize(np.array([1, -2 * cos(w), 1]), alpha, w)
+
+
+def section(frequency: float, rate: float, quality: float) -> tuple[float, float]:
+    """Angular frequency per reading and bandwidth term of a biquad section."""
+    if not 0 < frequency < rate / 2:
+        raise ValueError(f"{frequency} Hz is not below the Nyquist frequency.")
+    w = 2 * pi * frequency / rate
+    return w, sin(w) / (2 * quality)
+
+
+def normalize(b: np.ndarray, alpha: float, w: float) -> np.ndarray:
+    """Scale biquad coefficients so that `a0` is one."""
+    a0 = 1 + alpha
+    return np.array([*b / a0, -2 * cos(w) / a0, (1 - alpha) / a0])
+
+
+def cascade(values: np.ndarray, sections: np.ndarray, state: np.ndarray):
+    """Filter rows of readings in place, updating the state of each section.
+
+    Sections are transposed direct form II, with two state values per channel.
+    Compiled by `kernel`.
+    """
+    for row in range(values.shape[0]):
+        for channel in range(values.shape[1]):
+            x = values[row, channel]
+            for s in range(sections.shape[0]):
+                b0, b1, b2, a1, a2 = sections[s]
+                y = b0 * x + state[s, channel, 0]
+                state[s, channel, 0] = b1 * x - a1 * y + state[s, channel, 1]
+                state[s, channel, 1] = b2 * x - a2 * y
+                x = y
+            values[row, channel] = x
+
+
+@cache
+def kernel() -> Callable[[np.ndarray, np.ndarray, np.ndarray], None]:
+    """Compile `cascade`, importing Numba only once a filter runs."""
+    from numba import njit  # noqa: PLC0415
+
+    return njit(cache=True)(cascade)
+
+
+@dataclass
+class Filter:
+    """Filter channel readings, carrying state between chunks.
+
+    State starts as if the first readings had always been read, so outputs settle
+    from the first row instead of rising from zero.
+    """
+
+    sections: np.ndarray = field(default_factory=lambda: np.empty((0, 5)))
+    """Biquad sections applied in order, one `b0, b1, b2, a1, a2` row each."""
+    average: int = 1
+    """Readings averaged by the moving average after the sections."""
+    columns: Sequence[str] = ()
+    """Columns of frames to filter."""
+    state: np.ndarray | None = None
+    """Two state values of each section and channel, sections by channels by two."""
+    history: np.ndarray | None = None
+    """Section outputs of the readings before the chunk, for the moving average."""
+
+    @classmethod
+    def design(
+        cls,
+        rate: float,
+        cutoff: float | None = None,
+        mains: float | None = None,
+        average: int = 1,
+        columns: Sequence[str] = (),
+    ) -> Self:
+        """Design a filter of readings taken `rate` times a second.
+
+        Optionally passes frequencies below `cutoff` and rejects `mains` frequency.
+        """
+        sections = [
+            *([notch(mains, rate)] if mains else []),
+            *([lowpass(cutoff, rate)] if cutoff else []),
+        ]
+        return cls(np.array(sections).reshape(-1, 5), average, columns)
+
+    def __post_init__(self):
+        if self.average < 1:
+            raise ValueError("At least one reading must be averaged.")
+
+    def apply(self, values: np.ndarray) -> np.ndarray:
+        """Filter rows of readings, one column per channel."""
+        values = np.array(values, dtype=float, ndmin=2)
+        if not len(values):
+            return values
+        with stage("filter", items=values.size):
+            if self.state is None:
+                self.state = self.settled(values[0])
+            kernel()(values, self.sections, self.state)
+            if self.average == 1:
+                return values
+            if self.history is None:
+                self.history = np.repeat(values[:1], self.average - 1, axis=0)
+            rows = np.concatenate([self.history, values])
+            self.history = rows[len(rows) - self.average + 1 :]
+            return sliding_window_view(rows, self.average, axis=0).mean(axis=-1)
+
+    def settled(self, first: np.ndarray) -> np.ndarray:
+        """State of each section after reading `first` forever."""
+        state = np.empty((len(self.sections), len(first), 2))
+        x = first
+        for s, (b0, b1, b2, a1, a2) in enumerate(self.sections):
+            y = x * (b0 + b1 + b2) / (1 + a1 + a2)
+            state[s, :, 1] = b2 * x - a2 * y
+            state[s, :, 0] = b1 * x - a1 * y + state[s, :, 1]
+            x = y
+        return state
+
+    def update(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Filter the columns of a frame."""
+        columns = list(self.columns)
+        filtered = self.apply(frame[columns].to_numpy(dtype=float))
+        return frame.assign(**dict(zip(columns, filtered.T, strict=True)))
+
+    def stream(self, frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Filter frames as they arrive."""
+        for frame in frames:
+            yield self.update(frame)
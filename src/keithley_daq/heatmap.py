@@ -0,0 +1,100 @@
+"""Continuous heatmaps of the junction matrix.
+
+Each pixel's intensity is a fixed weighted sum of junction intensities, so weights
+from junctions to pixels are computed once and each frame is one matrix product.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from keithley_daq.animation import POSITIONS, SIZE, SQUARE, intensity
+from keithley_daq.types import Weighting
+
+CENTERS = tuple((x + SQUARE / 2, y + SQUARE / 2) for x, y in POSITIONS)
+"""Center of each junction's square in pixels, in reading order."""
+POWER = 2.0
+"""Power of distance in inverse distance weighting."""
+
+
+def inverse_distance(
+    centers: np.ndarray, pixels: np.ndarray, power: float = POWER
+) -> np.ndarray:
+    """Weight junctions by inverse distance to each pixel, pixels by junctions."""
+    distance = np.linalg.norm(pixels[:, None] - centers[None], axis=-1)
+    with np.errstate(divide="ignore"):
+        weights = distance**-power
+    # ? Pixels on a junction take its value exactly
+    exact = np.isinf(weights)
+    weights[exact.any(axis=1)] = exact[exact.any(axis=1)]
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def bilinear(centers: np.ndarray, pixels: np.ndarray) -> np.ndarray:
+    """Weight the four junctions around each pixel, pixels by junctions.
+
+    Junctions must lie on a rectangular grid, and pixels outside it take the values
+    of the nearest edge.
+    """
+    xs, ys = np.unique(centers[:, 0]), np.unique(centers[:, 1])
+    if len(xs) * len(ys) != len(centers) or min(len(xs), len(ys)) < 2:
+        raise ValueError("Bilinear weights need junctions on a rectangular grid.")
+    grid = np.empty((len(xs), len(ys)), dtype=int)
+    grid[np.searchsorted(xs, centers[:, 0]), np.searchsorted(ys, centers[:, 1])] = (
+        np.arange(len(centers))
+    )
+    weights = np.zeros((len(pixels), len(centers)))
+    rows = np.arange(len(pixels))
+    cells = []
+    for axis, nodes in ((0, xs), (1, ys)):
+        cell = np.clip(np.searchsorted(nodes, pixels[:, axis]) - 1, 0, len(nodes) - 2)
+        low, high = nodes[cell], nodes[cell + 1]
+        cells.append((cell, np.clip((pixels[:, axis] - low) / (high - low), 0, 1)))
+    (column, tx), (row, ty) = cells
+    for dx, wx in ((0, 1 - tx), (1, tx)):
+        for dy, wy in ((0, 1 - ty), (1, ty)):
+            np.add.at(weights, (rows, grid[column + dx, row + dy]), wx * wy)
+    return weights
+
+
+@dataclass
+class Heatmap:
+    """Render junction voltages as a field interpolated across the window."""
+
+    centers: Sequence[tuple[float, float]] = CENTERS
+    """Junction positions in pixels, in reading order."""
+    weighting: Weighting = "idw"
+    """How junctions are weighted at each pixel."""
+    size: int = SIZE
+    """Width and height of frames in pixels."""
+    power: float = POWER
+    """Power of distance for inverse distance weighting."""
+    weights: np.ndarray = field(init=False, repr=False)
+    """Weight of each junction at each pixel, pixels by junctions."""
+
+    def __post_init__(self):
+        y, x = np.mgrid[: self.size, : self.size]
+        pixels = np.column_stack([x.ravel(), y.ravel()]) + 0.5
+        centers = np.asarray(self.centers, dtype=float)
+        weights = (
+            bilinear(centers, pixels)
+            if self.weighting == "bilinear"
+            else inverse_distance(centers, pixels, self.power)
+        )
+        self.weights = weights.astype(np.float32)
+
+    def __call__(self, volts: np.ndarray) -> np.ndarray:
+        """Render frames of junction voltages, one row per frame.
+
+        Returns frames by height by width by RGB, like `animation.frames`.
+        """
+        volts = np.atleast_2d(volts)
+        if volts.shape[1] != len(self.centers):
+            raise ValueError(f"Expected {len(self.centers)} junction voltages.")
+        shades = intensity(volts).astype(np.float32)
+        field = (self.weights @ shades.T).T.reshape(len(volts), self.size, self.size)
+        rendered = np.empty((*field.shape, 3), dtype=np.uint8)
+        rendered[..., 0] = 255
+        rendered[..., 1] = rendered[..., 2] = np.clip(np.rint(field), 0, 255)
+        return rendered
@@ -0,0 +1,49 @@
+"""Instrument connection."""
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, Protocol
+
+import pyvisa
+from pyvisa.resources import MessageBasedResource
+
+
+class Instrument(Protocol):
+    """The subset of `MessageBasedResource` used to drive the DAQ6510."""
+
+    timeout: float | None
+    """Timeout in milliseconds."""
+
+    def write(self, message: str) -> Any:
+        """Write a command."""
+        ...
+
+    def query(self, message: str) -> str:
+        """Write a query and read the response."""
+        ...
+
+    def close(self) -> None:
+        """Close the connection."""
+        ...
+
+
+@contextmanager
+def get_instrument(
+    resource: str | None = None, timeout: int = 2000, reset: bool = True
+) -> Generator[MessageBasedResource, None, None]:
+    """Open the DAQ6510, defaulting to the first VISA resource found."""
+    rm = pyvisa.ResourceManager()
+    if resource is None:
+        if not (resources := rm.list_resources()):
+            raise RuntimeError("No VISA instruments detected.")
+        resource = resources[0]  # "USB0::0x05E6::0x6510::04495786::INSTR"
+    inst: MessageBasedResource = rm.open_resource(  # type: ignore
+        resource, read_termination="\n", write_termination="\n"
+    )
+    try:
+        inst.timeout = timeout
+        if reset:
+            inst.write("*RST")  # Reset the DAQ6510
+        yield inst
+    finally:
+        inst.close()
@@ -0,0 +1,91 @@
+"""Live display of junction voltages while acquiring.
+
+Acquisition runs on a worker thread, so buffer transfers never stall the display,
+which runs on the main thread as display libraries require. The worker publishes the
+latest junction voltages through a `LatestSink`, optionally filtered to steady the
+display, and the display draws whatever is latest at its own frame rate.
+"""
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from threading import Event
+from typing import TypeVar
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.animation import CAPTION, FPS, Renderer, show
+from keithley_daq.filters import Filter
+from keithley_daq.metrics import Metrics
+
+T = TypeVar("T")
+
+
+@dataclass
+class LatestSink:
+    """Keep the latest junction voltages of a frame stream for a display."""
+
+    columns: Sequence[str]
+    """Voltage column of each junction."""
+    scale: float = 1.0
+    """Factor converting column values to millivolts."""
+    filter: Filter | None = None
+    """Filter of junction voltages, run on every row so its state stays current."""
+    latest: np.ndarray | None = None
+    """Latest junction voltages in millivolts, replaced at once so readers on other
+    threads never see a partial row."""
+    rows: int = 0
+    """Rows written."""
+
+    def write(self, frame: pd.DataFrame):
+        """Keep the last row of a frame, filtered if a filter is set."""
+        if len(frame):
+            rows = frame[list(self.columns)].to_numpy(dtype=float)
+            if self.filter:
+                rows = self.filter.apply(rows)
+            self.latest = rows[-1] * self.scale
+        self.rows += len(frame)
+
+    def close(self):
+        """Finish writing."""
+
+    def current(self) -> np.ndarray | None:
+        """Get the latest junction voltages, or `None` before the first row."""
+        return self.latest
+
+
+def live(
+    acquire: Callable[[Event], T],
+    latest: LatestSink,
+    fps: float = FPS,
+    caption: str = CAPTION,
+    render: Renderer | None = None,
+    display: Callable[..., object] = show,
+    metrics: Metrics | None = None,
+) -> T:
+    """Acquire on a worker thread while displaying the latest junction voltages.
+
+    `acquire` writes to `latest` among its sinks and stops early once its event is
+    set, as `pipeline.record` does with `stop`. Closing the display stops
+    acquisition, and the display closes once acquisition ends. Returns the result of
+    `acquire`, raising its errors. Frame durations are recorded in `metrics`, and
+    stages of both threads are timed into the timings being recorded, if any.
+    """
+    stop = Event()
+    with ThreadPoolExecutor(1, thread_name_prefix="acquire") as executor:
+        # ? Acquire in a copy of this context, so stages are timed into its timings
+        acquisition = executor.submit(copy_context().run, acquire, stop)
+        try:
+            display(
+                latest.current,
+                fps,
+                caption,
+                render,
+                lambda: not acquisition.done(),
+                metrics=metrics,
+            )
+        finally:
+            stop.set()
+        return acquisition.result()
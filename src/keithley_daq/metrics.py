@@ -0,0 +1,206 @@
+"""Live performance metrics in Prometheus text-file format."""
+
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+
+PREFIX = "keithley_daq"
+"""Prefix of exported metric names."""
+WINDOW = 5.0
+"""Seconds over which rates are computed."""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Metrics of one instrument at a point in time."""
+
+    instrument: str
+    """Instrument label."""
+    readings: int
+    """Readings acquired."""
+    bytes: int
+    """Bytes transferred."""
+    dropped: int
+    """Readings lost."""
+    readings_per_second: float
+    """Readings acquired per second over the rate window."""
+    bytes_per_second: float
+    """Bytes transferred per second over the rate window."""
+    lag: int
+    """Readings the host was behind `TRAC:ACTual:END?` at the last read."""
+    frame_seconds: float
+    """Duration of the last rendered frame."""
+    queues: dict[str, int]
+    """Depth of each queue."""
+
+
+@dataclass
+class Metrics:
+    """Metrics fed by the acquisition loop and renderer of one instrument.
+
+    Safe to feed from several threads.
+    """
+
+    instrument: str = "daq6510"
+    """Instrument label."""
+    window: float = WINDOW
+    """Seconds over which rates are computed."""
+    clock: Callable[[], float] = monotonic
+    """Time source in seconds."""
+    readings: int = 0
+    """Readings acquired."""
+    bytes: int = 0
+    """Bytes transferred."""
+    dropped: int = 0
+    """Readings lost."""
+    lag: int = 0
+    """Readings the host was behind `TRAC:ACTual:END?` at the last read."""
+    frame_seconds: float = 0.0
+    """Duration of the last rendered frame."""
+    queues: dict[str, int] = field(default_factory=dict)
+    """Depth of each queue."""
+    history: deque[tuple[float, int, int]] = field(default_factory=deque, repr=False)
+    """Times and totals of readings and bytes within the rate window."""
+    lock: Lock = field(default_factory=Lock, repr=False)
+    """Guards updates from several threads."""
+
+    def observe_read(self, readings: int, bytes: int, lag: int = 0, dropped: int = 0):  # noqa: A002
+        """Record a read from the instrument."""
+        with self.lock:
+            self.readings += readings
+            self.bytes += bytes
+            self.dropped += dropped
+            self.lag = lag
+            now = self.clock()
+            self.history.append((now, self.readings, self.bytes))
+            while len(self.history) > 2 and self.history[1][0] <= now - self.window:
+                self.history.popleft()
+
+    def observe_frame(self, seconds: float):
+        """Record the duration of a rendered frame."""
+        with self.lock:
+            self.frame_seconds = seconds
+
+    def observe_queue(self, name: str, depth: int):
+        """Record the depth of a queue."""
+        with self.lock:
+            self.queues[name] = depth
+
+    def snapshot(self) -> Snapshot:
+        """Get the current metrics."""
+        with self.lock:
+            readings_rate = bytes_rate = 0.0
+            if len(self.history) > 1:
+                (start, readings, bytes_), (end, *_) = self.history[0], self.history[-1]
+                if elapsed := end - start:
+                    readings_rate = (self.readings - readings) / elapsed
+                    bytes_rate = (self.bytes - bytes_) / elapsed
+            return Snapshot(
+                instrument=self.instrument,
+                readings=self.readings,
+                bytes=self.bytes,
+                dropped=self.dropped,
+                readings_per_second=readings_rate,
+                bytes_per_second=bytes_rate,
+                lag=self.lag,
+                frame_seconds=self.frame_seconds,
+                queues=dict(self.queues),
+            )
+
+
+METRICS: tuple[tuple[str, str, str, Callable[[Snapshot], float]], ...] = (
+    ("readings_total", "counter", "Readings acquired.", lambda s: s.readings),
+    ("transfer_bytes_total", "counter", "Bytes transferred.", lambda s: s.bytes),
+    ("dropped_readings_total", "counter", "Readings lost.", lambda s: s.dropped),
+    (
+        "readings_per_second",
+        "gauge",
+        "Readings acquired per second.",
+        lambda s: s.readings_per_second,
+    ),
+    (
+        "transfer_bytes_per_second",
+        "gauge",
+        "Bytes transferred per second.",
+        lambda s: s.bytes_per_second,
+    ),
+    (
+        "lag_readings",
+        "gauge",
+        "Readings the host is behind the buffer.",
+        lambda s: s.lag,
+    ),
+    (
+        "frame_seconds",
+        "gauge",
+        "Duration of the last frame.",
+        lambda s: s.frame_seconds,
+    ),
+)
+"""Name, type, help, and value of each exported metric."""
+
+
+def render(snapshots: Iterable[Snapshot]) -> str:
+    """Render snapshots in Prometheus text exposition format."""
+    snapshots = list(snapshots)
+    lines: list[str] = []
+    for name, kind, help_, value in METRICS:
+        lines.extend([
+            f"# HELP {PREFIX}_{name} {help_}",
+            f"# TYPE {PREFIX}_{name} {kind}",
+        ])
+        lines.extend(
+            f'{PREFIX}_{name}{{instrument="{s.instrument}"}} {value(s):g}'
+            for s in snapshots
+        )
+    lines.extend([
+        f"# HELP {PREFIX}_queue_depth Items waiting in a queue.",
+        f"# TYPE {PREFIX}_queue_depth gauge",
+    ])
+    lines.extend(
+        f'{PREFIX}_queue_depth{{instrument="{s.instrument}",queue="{queue}"}} {depth}'
+        for s in snapshots
+        for queue, depth in s.queues.items()
+    )
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class TextfileExporter:
+    """Export metrics to a file scraped by the node exporter's text-file collector."""
+
+    path: Path
+    """File to write, ending in `.prom`."""
+    metrics: list[Metrics]
+    """Metrics to export."""
+    interval: float = 1.0
+    """Minimum seconds between exports."""
+    clock: Callable[[], float] = monotonic
+    """Time source in seconds."""
+    last: float | None = None
+    """Time of the last export."""
+
+    def export(self, force: bool = False) -> bool:
+        """Export metrics if the interval has passed, returning whether it did."""
+        now = self.clock()
+        if not force and self.last is not None and now - self.last < self.interval:
+            return False
+        # ? Write then rename so the collector never reads a partial file
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        temporary.write_text(
+            render(m.snapshot() for m in self.metrics), encoding="utf-8"
+        )
+        temporary.replace(self.path)
+        self.last = now
+        return True
+
+    def write(self, frame: object):  # noqa: ARG002
+        """Export metrics if due, so the exporter can be used as a pipeline sink."""
+        self.export()
+
+    def close(self):
+        """Export final metrics."""
+        self.export(force=True)
@@ -0,0 +1,55 @@
+"""Parsing of ASCII buffer dumps."""
+
+from concurrent.futures import Executor
+from warnings import catch_warnings, simplefilter
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 22
+"""Characters per chunk when parsing in parallel."""
+
+
+def decode(text: str) -> np.ndarray:
+    """Decode comma-separated values with vectorized parsing."""
+    if not text.strip():
+        return np.empty(0)
+    with catch_warnings():
+        # ? NumPy only warns when it stops early on malformed values
+        simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(text, sep=",")
+        except DeprecationWarning as err:
+            raise ValueError(f"Malformed values in response: {err}") from err
+    if len(values) != text.count(",") + 1:
+        raise ValueError("Response has empty values.")
+    return values
+
+
+def split_chunks(text: str, chunk_size: int = CHUNK_SIZE) -> list[str]:
+    """Split text into chunks of about `chunk_size` characters at commas."""
+    chunks: list[str] = []
+    start = 0
+    while start < len(text):
+        end = text.find(",", start + chunk_size)
+        if end < 0:
+            chunks.append(text[start:])
+            break
+        chunks.append(text[start:end])
+        start = end + 1
+    return chunks
+
+
+def parse_ascii(
+    text: str | bytes, executor: Executor | None = None, chunk_size: int = CHUNK_SIZE
+) -> np.ndarray:
+    """Parse an ASCII buffer dump into one contiguous array.
+
+    Dumps spanning several chunks are decoded in parallel by `executor`, typically a
+    `ProcessPoolExecutor` reused across reads, since decoding holds the GIL.
+    """
+    if isinstance(text, bytes):
+        text = text.decode("ascii")
+    text = text.strip()
+    if executor is None or len(text) < 2 * chunk_size:
+        return decode(text)
+    return np.concatenate(list(executor.map(decode, split_chunks(text, chunk_size))))
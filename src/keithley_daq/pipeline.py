@@ -0,0 +1,520 @@
+"""Streaming acquisition pipeline.
+
+Each stage is a generator processing chunks lazily, so memory use depends on the
+chunk size rather than the run length. A source reads and decodes readings from the
+instrument, `scans` regroups them into whole scans, `derive` computes columns, and
+`run` writes the derived frames to sinks.
+"""
+
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack, closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Event
+from time import monotonic, sleep
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.buffers import BufferCursor, DoubleBufferedCapture, ReadingBuffer
+from keithley_daq.energy import EnergyIntegrator
+from keithley_daq.instrument import Instrument
+from keithley_daq.metrics import Metrics
+from keithley_daq.planning import plan_buffer
+from keithley_daq.recording import SUFFIX, RecordingSink
+from keithley_daq.schema import ReadingSchema
+from keithley_daq.scpi import channel_list
+from keithley_daq.storage import STORAGES, Storage
+from keithley_daq.timing import CURRENT, stage
+from keithley_daq.tsp import RATIO, STYLES, TspAcquisition, TspInstrument
+from keithley_daq.types import BufferElement, BufferStyle, Capture
+
+
+class Sink(Protocol):
+    """Destination of derived frames."""
+
+    def write(self, frame: pd.DataFrame) -> None:
+        """Write a frame."""
+        ...
+
+    def close(self) -> None:
+        """Finish writing."""
+        ...
+
+
+@dataclass
+class CsvSink:
+    """Append frames to a CSV file, numbering rows across frames."""
+
+    path: Path
+    """CSV file, overwritten by the first frame."""
+    rows: int = 0
+    """Rows written."""
+    started: bool = False
+    """Whether the header has been written."""
+
+    def write(self, frame: pd.DataFrame):
+        """Append a frame."""
+        frame = frame.set_axis(pd.RangeIndex(self.rows, self.rows + len(frame)))
+        with stage("write", items=len(frame)):
+            frame.to_csv(
+                self.path, mode="a" if self.started else "w", header=not self.started
+            )
+        self.rows += len(frame)
+        self.started = True
+
+    def close(self):
+        """Finish writing."""
+
+
+@dataclass
+class HdfSink:
+    """Append frames to an HDF5 table, numbering rows across frames."""
+
+    path: Path
+    """HDF5 file, overwritten by the first frame."""
+    key: str = "data"
+    """Key of the table in the file."""
+    rows: int = 0
+    """Rows written."""
+    started: bool = False
+    """Whether the table has been created."""
+
+    def write(self, frame: pd.DataFrame):
+        """Append a frame."""
+        frame = frame.set_axis(pd.RangeIndex(self.rows, self.rows + len(frame)))
+        with stage("write", items=len(frame)):
+            frame.to_hdf(
+                self.path,
+                key=self.key,
+                mode="a" if self.started else "w",
+                format="table",
+                append=self.started,
+            )
+        self.rows += len(frame)
+        self.started = True
+
+    def close(self):
+        """Finish writing."""
+
+
+def open_sink(path: Path, storage: Storage = STORAGES["double"]) -> Sink:
+    """Open a sink writing CSV, HDF5, or a columnar recording, chosen by suffix.
+
+    Only columnar recordings keep nanosecond timestamps, which CSV and HDF5 readers
+    would take for seconds.
+    """
+    match path.suffix.lower():
+        case ".csv" | ".h5" | ".hdf5" if storage.times != "s":
+            raise ValueError(f"Nanosecond timestamps need a `{SUFFIX}` recording.")
+        case ".csv":
+            return CsvSink(path)
+        case ".h5" | ".hdf5":
+            return HdfSink(path)
+        case suffix if suffix == SUFFIX:
+            return RecordingSink(path, storage)
+        case suffix:
+            raise ValueError(f"Cannot write `{suffix}` files.")
+
+
+@dataclass
+class FrameSink:
+    """Collect frames in memory."""
+
+    frames: list[pd.DataFrame] = field(default_factory=list)
+    """Frames written."""
+
+    def write(self, frame: pd.DataFrame):
+        """Collect a frame."""
+        self.frames.append(frame)
+
+    def close(self):
+        """Finish writing."""
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Frames written, concatenated."""
+        return (
+            pd.concat(self.frames, ignore_index=True) if self.frames else pd.DataFrame()
+        )
+
+
+@dataclass
+class RingSink:
+    """Keep the latest rows of frames in preallocated columns, such as for live views.
+
+    Columns keep the data types frames were derived with, so compact storage shrinks
+    the ring too.
+    """
+
+    capacity: int
+    """Most rows kept."""
+    columns: dict[str, np.ndarray] = field(default_factory=dict)
+    """Ring of each column, allocated by the first frame."""
+    rows: int = 0
+    """Rows written."""
+
+    def write(self, frame: pd.DataFrame):
+        """Overwrite the oldest rows with a frame."""
+        if not self.columns:
+            self.columns = {
+                str(name): np.empty(self.capacity, frame[name].dtype)
+                for name in frame.columns
+            }
+        kept = frame.iloc[-self.capacity :]
+        # ? Rows of frames longer than the ring would be overwritten anyway
+        start = self.rows + len(frame) - len(kept)
+        positions = (start + np.arange(len(kept))) % self.capacity
+        for name, ring in self.columns.items():
+            ring[positions] = kept[name].to_numpy()
+        self.rows += len(frame)
+
+    def close(self):
+        """Finish writing."""
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Rows kept, oldest first."""
+        if self.rows <= self.capacity:
+            return pd.DataFrame({
+                name: ring[: self.rows] for name, ring in self.columns.items()
+            })
+        oldest = self.rows % self.capacity
+        return pd.DataFrame({
+            name: np.roll(ring, -oldest) for name, ring in self.columns.items()
+        })
+
+
+def setup_commands(
+    channels: Sequence[int],
+    labels: Mapping[int, str] | None = None,
+    function: str | None = None,
+    graph: bool = True,
+) -> list[str]:
+    """Commands labeling channels, setting their function, and graphing them."""
+    scan = channel_list(channels)
+    commands = (
+        [":DISP:SCR HOME", f":DISP:WATC:CHAN {scan}", ":DISP:SCR GRAP"] if graph else []
+    )
+    commands.extend(
+        f"ROUT:CHAN:LAB '{label}', (@{channel})"
+        for channel, label in (labels or {}).items()
+    )
+    if function:
+        commands.append(f"SENS:FUNC '{function}', {scan}")
+    return commands
+
+
+def poll(
+    inst: Instrument,
+    buffer: ReadingBuffer,
+    channels: Sequence[int],
+    elements: Sequence[BufferElement],
+    duration: float,
+    poll_interval: float = 0.1,
+    count: int = 0,
+    setup: Iterable[str] = (),
+    clock: Callable[[], float] = monotonic,
+    wait: Callable[[float], None] = sleep,
+    metrics: Metrics | None = None,
+    stop: Event | None = None,
+) -> Iterator[np.ndarray]:
+    """Scan for `duration` seconds, yielding readings as they are stored.
+
+    Yields one row of `elements` per reading. The scan is aborted when the duration
+    elapses, `stop` is set, or the consumer stops early, and readings stored until
+    then are yielded.
+
+    Parameters
+    ----------
+    inst
+        Instrument.
+    buffer
+        Buffer to scan into, created by this source.
+    channels
+        Scan list.
+    elements
+        Elements queried for each reading.
+    duration
+        Seconds to scan for.
+    poll_interval
+        Seconds between reads of the buffer.
+    count
+        Scans to take, or zero to scan until aborted.
+    setup
+        Commands configuring channels before scanning, such as from `setup_commands`.
+    clock
+        Time source in seconds.
+    wait
+        Waits for a number of seconds.
+    metrics
+        Live metrics to feed after each read.
+    stop
+        Stops the scan early once set, such as from another thread.
+    """
+    buffer.make(inst)
+    with stage("setup"):
+        inst.write(f":ROUT:SCAN:CRE {channel_list(channels)}")
+        inst.write(f":ROUT:SCAN:COUN:SCAN {count}")
+        inst.write(f":ROUT:SCAN:BUFF '{buffer.name}'")
+        for command in setup:
+            inst.write(command)
+        inst.write("INIT")
+    cursor = BufferCursor(inst, buffer, elements, metrics=metrics)
+    deadline = clock() + duration
+    try:
+        while clock() < deadline and not (stop and stop.is_set()):
+            if timings := CURRENT.get():
+                timings.next_chunk()
+            yield cursor.read()
+            with stage("wait"):
+                wait(poll_interval)
+    finally:
+        inst.write("ABORT")
+    if timings := CURRENT.get():
+        timings.next_chunk()
+    yield cursor.read()
+
+
+def alternate(
+    inst: Instrument,
+    channels: Sequence[int],
+    elements: Sequence[BufferElement],
+    duration: float,
+    scans_per_block: int,
+    count: int = 0,
+    setup: Iterable[str] = (),
+    style: BufferStyle = "FULL",
+    clock: Callable[[], float] = monotonic,
+    stop: Event | None = None,
+    executor: Executor | None = None,
+) -> Iterator[np.ndarray]:
+    """Scan for `duration` seconds through two alternating buffers.
+
+    Yields one row of `elements` per reading, a block of `scans_per_block` scans at a
+    time, like `poll`, and the readings of the block cut short by aborting. Buffers
+    restart relative timestamps with every block, so they are derived from the
+    absolute timestamps of readings instead, which also measure the scan's idle time
+    between blocks.
+    """
+    timed = "REL" in elements
+    queried = (*elements, "SEC", "FRAC")
+    double = DoubleBufferedCapture(
+        inst,
+        channels,
+        scans_per_block,
+        elements=queried,
+        style=style,
+        executor=executor,
+    )
+    double.configure()
+    with stage("setup"):
+        for command in setup:
+            inst.write(command)
+    deadline = clock() + duration
+    origin: tuple[float, float] | None = None
+
+    def requested(values: np.ndarray) -> np.ndarray:
+        nonlocal origin
+        if timed and len(values):
+            seconds, fractions = values[:, -2], values[:, -1]
+            if origin is None:
+                origin = seconds[0], fractions[0]
+            relative = list(elements).index("REL")
+            values[:, relative] = (seconds - origin[0]) + (fractions - origin[1])
+        return values[:, : len(elements)]
+
+    blocks = double.blocks(-(-count // scans_per_block) if count else None)
+    with closing(blocks):
+        for values in blocks:
+            yield requested(values)
+            if clock() >= deadline or (stop and stop.is_set()):
+                break
+    # ? Closing the blocks aborted the scan, keeping what it stored, as `poll` does
+    if timings := CURRENT.get():
+        timings.next_chunk()
+    yield requested(double.remainder())
+
+
+def scripted(
+    inst: TspInstrument,
+    schema: ReadingSchema,
+    duration: float,
+    scans_per_block: int,
+    count: int = 0,
+    style: BufferStyle = "FULL",
+    function: str | None = None,
+    labels: Mapping[int, str] | None = None,
+    clock: Callable[[], float] = monotonic,
+    stop: Event | None = None,
+) -> Iterator[np.ndarray]:
+    """Scan for `duration` seconds with the on-instrument TSP acquisition script.
+
+    Yields one row of the schema's elements per reading, a block of `scans_per_block`
+    scans at a time, like `poll`. The instrument must use the TSP command set, and
+    the script sets channels to measure `function` and labels them.
+    """
+    acquisition = TspAcquisition(
+        inst,
+        schema,
+        scans_per_block,
+        -(-count // scans_per_block) if count else 0,
+        style if style in STYLES else "FULL",
+        function=function,
+        labels=labels,
+    )
+    acquisition.upload()
+    deadline = clock() + duration
+    with closing(acquisition.stream()) as blocks:
+        for values in blocks:
+            yield values.reshape(-1, len(schema.elements))
+            if clock() >= deadline or (stop and stop.is_set()):
+                break
+
+
+def scans(chunks: Iterable[np.ndarray], channels: int) -> Iterator[np.ndarray]:
+    """Regroup readings into whole scans, carrying partial scans to the next chunk.
+
+    Readings left over at the end, such as from aborting mid-scan, are dropped.
+    """
+    carried: np.ndarray | None = None
+    for chunk in chunks:
+        readings = chunk if carried is None else np.concatenate([carried, chunk])
+        whole = len(readings) - len(readings) % channels
+        carried = readings[whole:]
+        if whole:
+            yield readings[:whole]
+
+
+def derive(
+    chunks: Iterable[np.ndarray],
+    schema: ReadingSchema,
+    columns: Sequence[str],
+    shunt: float = 1.0,
+    storage: Storage = STORAGES["double"],
+) -> Iterator[pd.DataFrame]:
+    """Derive `columns` from chunks of whole scans, stored as `storage`."""
+    for chunk in chunks:
+        yield schema.frame(chunk, columns, shunt, storage)
+
+
+def run(frames: Iterable[pd.DataFrame], sinks: Sequence[Sink]) -> int:
+    """Write frames to every sink, returning the number of rows written."""
+    rows = 0
+    try:
+        for frame in frames:
+            for sink in sinks:
+                sink.write(frame)
+            rows += len(frame)
+    finally:
+        for sink in sinks:
+            sink.close()
+    return rows
+
+
+def record(
+    inst: Instrument,
+    channels: Sequence[int],
+    columns: Sequence[str],
+    sinks: Sequence[Sink],
+    duration: float,
+    buffer: str = "Voltage",
+    shunt: float = 1.0,
+    reading_rate: float = 1000.0,
+    poll_interval: float = 0.1,
+    count: int = 0,
+    setup: Iterable[str] = (),
+    metrics: Metrics | None = None,
+    storage: Storage = STORAGES["double"],
+    energy: EnergyIntegrator | None = None,
+    stop: Event | None = None,
+    capture: Capture = "cursor",
+    executor: Executor | None = None,
+    function: str | None = None,
+    labels: Mapping[int, str] | None = None,
+) -> int:
+    """Scan channels, derive `columns`, and write them to sinks as they arrive.
+
+    Returns the number of rows written. See `poll` for the scan parameters, and
+    `storage` for the precision of written columns. With `energy`, cumulative energy
+    and average power columns are added to frames of power and time columns. Setting
+    `stop` ends the scan early. `capture` chooses between reading one wrapping
+    buffer with a cursor, alternating two buffers a poll interval of scans each, and
+    streaming such blocks from an on-instrument TSP script. Channels measure
+    `function` and are labeled with `labels`, before any SCPI `setup` commands,
+    which TSP scripts cannot run. Large buffer dumps are parsed in parallel by
+    `executor`, a process pool by default.
+    """
+    setup = list(setup)
+    if capture == "tsp" and not isinstance(inst, TspInstrument):
+        raise ValueError(f"{type(inst).__name__} cannot run TSP scripts.")
+    if capture == "tsp" and setup:
+        raise ValueError("TSP captures cannot run SCPI setup commands.")
+    if capture == "tsp" and "ratio" in columns and function != RATIO:
+        raise ValueError(f"Ratio columns need the `{RATIO}` function.")
+    setup = [*setup_commands(channels, labels, function, graph=False), *setup]
+    with ExitStack() as stack:
+        # ? Pools only start workers once a response is large enough to split
+        executor = executor or stack.enter_context(ProcessPoolExecutor())
+        schema = ReadingSchema.for_columns(channels, columns)
+        if capture == "cursor":
+            plan = plan_buffer(channels, reading_rate, duration, schema.elements)
+            # ? Fill continuously so an underestimated reading rate wraps instead of stopping
+            source = poll(
+                inst,
+                ReadingBuffer(
+                    buffer, plan.capacity, plan.style, "CONT", executor=executor
+                ),
+                channels,
+                schema.elements,
+                duration,
+                poll_interval,
+                count,
+                setup,
+                metrics=metrics,
+                stop=stop,
+            )
+        else:
+            # ? Double buffers also query absolute timestamps of each reading
+            timed = capture == "double"
+            elements = (*schema.elements, *(("SEC", "FRAC") if timed else ()))
+            plan = plan_buffer(channels, reading_rate, None, elements, buffers=2)
+            # ? Blocks of a poll interval of scans, as long as they fit a buffer
+            scans_per_block = min(
+                max(1, round(reading_rate * poll_interval / len(channels))),
+                plan.capacity // len(channels),
+            )
+            source = (
+                scripted(
+                    inst,
+                    schema,
+                    duration,
+                    scans_per_block,
+                    count,
+                    plan.style,
+                    function,
+                    labels,
+                    stop=stop,
+                )
+                if isinstance(inst, TspInstrument) and capture == "tsp"
+                else alternate(
+                    inst,
+                    channels,
+                    schema.elements,
+                    duration,
+                    scans_per_block,
+                    count,
+                    setup,
+                    plan.style,
+                    stop=stop,
+                    executor=executor,
+                )
+            )
+        # ? Closing the source aborts the scan if a stage or sink fails
+        with closing(source) as readings:
+            frames = derive(
+                scans(readings, len(channels)), schema, columns, shunt, storage
+            )
+            return run(energy.stream(frames) if energy else frames, sinks)
@@ -0,0 +1,176 @@
+"""Reading buffer capacity planning."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from math import ceil
+
+from keithley_daq.buffers import ReadingBuffer
+from keithley_daq.types import BufferElement, BufferStyle, FillMode
+
+MEMORY = 7_000_000 * 32
+"""Approximate bytes of reading buffer memory, enough for 7M standard readings."""
+STORAGE_BYTES: dict[BufferStyle, int] = {
+    "COMP": 16,
+    "STAN": 32,
+    "FULL": 64,
+    "WRIT": 32,
+    "FULLWRIT": 64,
+}
+"""Approximate bytes of instrument memory used per reading in each buffer style."""
+STYLE_ELEMENTS: dict[BufferStyle, frozenset[BufferElement]] = {
+    "COMP": frozenset({"READ", "REL", "CHAN", "SEC", "FRAC", "STAT", "TST", "UNIT"}),
+    "STAN": frozenset({"READ", "REL", "CHAN", "SEC", "FRAC", "STAT", "TST", "UNIT"}),
+    "FULL": frozenset({
+        "READ",
+        "REL",
+        "EXTR",
+        "CHAN",
+        "SEC",
+        "FRAC",
+        "STAT",
+        "TST",
+        "UNIT",
+    }),
+    "WRIT": frozenset({"READ", "REL", "SEC", "FRAC", "STAT", "TST", "UNIT"}),
+    "FULLWRIT": frozenset({
+        "READ",
+        "REL",
+        "EXTR",
+        "SEC",
+        "FRAC",
+        "STAT",
+        "TST",
+        "UNIT",
+    }),
+}
+"""Elements each buffer style can return."""
+SCANNABLE: tuple[BufferStyle, ...] = ("COMP", "STAN", "FULL")
+"""Styles a scan can store readings in, cheapest first. Writable styles hold only
+readings written by the host."""
+TRANSFER_BYTES: dict[BufferElement, int] = {
+    "READ": 15,
+    "REL": 15,
+    "EXTR": 15,
+    "CHAN": 4,
+    "SEC": 11,
+    "FRAC": 12,
+    "STAT": 3,
+    "TST": 32,
+    "UNIT": 8,
+}
+"""Approximate ASCII bytes per element per reading returned by `TRAC:DATA?`,
+including the separator."""
+HEADROOM = 1.1
+"""Margin on the expected number of readings when sizing a buffer for a whole run."""
+
+
+@dataclass(frozen=True)
+class BufferPlan:
+    """Buffer style and size chosen for a run."""
+
+    style: BufferStyle
+    """Buffer style."""
+    capacity: int
+    """Readings per buffer."""
+    fill_mode: FillMode
+    """Fill mode."""
+    readings: int
+    """Readings expected over the run."""
+    reading_rate: float
+    """Readings per second."""
+    elements: tuple[BufferElement, ...]
+    """Elements queried for each reading."""
+
+    @property
+    def fits_run(self) -> bool:
+        """Whether the whole run fits without draining during acquisition."""
+        return self.fill_mode == "ONCE"
+
+    @property
+    def storage_bytes(self) -> int:
+        """Instrument memory used by one buffer."""
+        return self.capacity * STORAGE_BYTES[self.style]
+
+    @property
+    def transfer_bytes(self) -> int:
+        """Bytes transferred per reading."""
+        return transfer_bytes(self.elements)
+
+    @property
+    def drain_rate(self) -> float:
+        """Bytes per second the host must read to keep up with acquisition."""
+        return self.reading_rate * self.transfer_bytes
+
+    @property
+    def slack(self) -> float:
+        """Seconds the host may fall behind before readings are overwritten."""
+        return self.capacity / self.reading_rate
+
+    def buffer(self, name: str) -> ReadingBuffer:
+        """Get a reading buffer following this plan."""
+        return ReadingBuffer(name, self.capacity, self.style, self.fill_mode)
+
+
+def transfer_bytes(elements: Sequence[BufferElement]) -> int:
+    """Estimate ASCII bytes transferred per reading for the given elements."""
+    return sum(TRANSFER_BYTES[element] for element in elements)
+
+
+def choose_style(
+    elements: Sequence[BufferElement], precise: bool = False
+) -> BufferStyle:
+    """Choose the most compact scannable style that stores the given elements.
+
+    Compact buffers store readings to 6.5 digits and timestamps to 1 us, so `precise`
+    skips them.
+    """
+    for style in SCANNABLE:
+        if precise and style == "COMP":
+            continue
+        if set(elements) <= STYLE_ELEMENTS[style]:
+            return style
+    raise ValueError(f"No buffer style stores all of {sorted(elements)}.")
+
+
+def plan_buffer(
+    channels: Sequence[int],
+    reading_rate: float,
+    duration: float | None,
+    elements: Sequence[BufferElement],
+    precise: bool = False,
+    buffers: int = 1,
+    memory: int = MEMORY,
+) -> BufferPlan:
+    """Plan the buffer style and size for a run.
+
+    Parameters
+    ----------
+    channels
+        Scan list.
+    reading_rate
+        Readings per second across the whole scan list.
+    duration
+        Run duration in seconds, or `None` to run until stopped.
+    elements
+        Elements queried for each reading.
+    precise
+        Whether readings need more than 6.5 digits.
+    buffers
+        Buffers sharing instrument memory, such as two for double-buffered capture.
+    memory
+        Bytes of instrument memory available to the buffers.
+    """
+    if not channels:
+        raise ValueError("Scan list is empty.")
+    style = choose_style(elements, precise)
+    most = memory // (STORAGE_BYTES[style] * buffers)
+    # ? Keep whole scans in each buffer so scans never straddle a wrap
+    most -= most % len(channels)
+    readings = ceil(reading_rate * duration) if duration is not None else 0
+    needed = ceil(readings * HEADROOM / buffers)
+    needed += -needed % len(channels)
+    if duration is not None and needed <= most:
+        return BufferPlan(
+            style, needed, "ONCE", readings, reading_rate, tuple(elements)
+        )
+    return BufferPlan(style, most, "CONT", readings, reading_rate, tuple(elements))
@@ -0,0 +1,208 @@
+"""Contact position estimation from junction voltages.
+
+Pressing the gel raises the voltage of nearby junctions, so contact is located from
+how strongly each junction is activated. Estimates are vectorized over rows of
+junction voltages in millivolts, one row per scan.
+"""
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Self
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.animation import MAXIMUM, MINIMUM, Renderer
+from keithley_daq.heatmap import CENTERS
+from keithley_daq.timing import stage
+
+ESTIMATE = ("x", "y", "confidence")
+"""Columns of estimates."""
+BUDGET = 0.05
+"""Seconds an estimate stays current after its frame arrived."""
+MARKER = (0, 0, 160)
+"""Color of the contact marker."""
+RADIUS = 8
+"""Radius of the contact marker in pixels at full confidence."""
+
+
+def activation(volts: np.ndarray) -> np.ndarray:
+    """Activation of junctions from 0 to 1, zero outside the active voltage range."""
+    volts = np.asarray(volts, dtype=float)
+    active = (volts > MINIMUM) & (volts < MAXIMUM)
+    return np.where(active, (volts - MINIMUM) / (MAXIMUM - MINIMUM), 0.0)
+
+
+@dataclass(frozen=True)
+class LeastSquares:
+    """Affine map from junction activations to positions, fit to calibration touches."""
+
+    coefficients: np.ndarray
+    """Coefficients mapping activations and a constant to x and y."""
+    error: float
+    """Root mean square distance in pixels between fit and calibration positions."""
+
+    @classmethod
+    def fit(cls, volts: np.ndarray, positions: np.ndarray) -> Self:
+        """Fit to junction voltages measured while touching known positions."""
+        design = cls.design(volts)
+        if len(design) < design.shape[1]:
+            raise ValueError(f"At least {design.shape[1]} calibration touches needed.")
+        coefficients, *_ = np.linalg.lstsq(design, positions, rcond=None)
+        residuals = design @ coefficients - positions
+        return cls(coefficients, float(np.sqrt(np.mean(np.sum(residuals**2, axis=1)))))
+
+    @staticmethod
+    def design(volts: np.ndarray) -> np.ndarray:
+        """Activations with a constant column, one row per scan."""
+        weights = activation(np.atleast_2d(volts))
+        return np.column_stack([weights, np.ones(len(weights))])
+
+    def __call__(self, volts: np.ndarray) -> np.ndarray:
+        """Map junction voltages to positions, one row per scan."""
+        return self.design(volts) @ self.coefficients
+
+
+@dataclass
+class PositionEstimator:
+    """Estimate contact positions from junction voltages.
+
+    Positions are the activation-weighted centroid of junction centers, or come from
+    a calibrated `model`. Confidence is the total activation capped at 1, so it is
+    zero without contact, when positions are NaN.
+    """
+
+    centers: Sequence[tuple[float, float]] = CENTERS
+    """Junction positions in pixels, in reading order."""
+    model: LeastSquares | None = None
+    """Calibrated model used instead of the centroid."""
+    columns: Sequence[str] = ()
+    """Junction voltage columns of frames, in reading order."""
+    scale: float = 1000.0
+    """Factor converting frame voltages to millivolts."""
+
+    def estimate(self, volts: np.ndarray) -> np.ndarray:
+        """Estimate x, y, and confidence from junction voltages in millivolts."""
+        volts = np.atleast_2d(volts)
+        if volts.shape[1] != len(self.centers):
+            raise ValueError(f"Expected {len(self.centers)} junction voltages.")
+        weights = activation(volts)
+        total = weights.sum(axis=1)
+        if self.model:
+            positions = self.model(volts)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                positions = weights @ np.asarray(self.centers) / total[:, None]
+        positions[total == 0] = np.nan
+        return np.column_stack([positions, np.minimum(total, 1)])
+
+    def update(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Estimate positions from the junction voltage columns of a frame."""
+        with stage("locate", items=len(frame)):
+            volts = frame[list(self.columns)].to_numpy(dtype=float) * self.scale
+            return pd.DataFrame(
+                self.estimate(volts) if len(frame) else np.empty((0, 3)),
+                columns=list(ESTIMATE),
+                index=frame.index,
+            )
+
+    def stream(self, frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Add position estimates to frames as they arrive."""
+        for frame in frames:
+            yield frame.join(self.update(frame))
+
+
+@dataclass
+class PositionStats:
+    """Accounting for published position estimates."""
+
+    published: int = 0
+    """Frames estimated."""
+    late: int = 0
+    """Frames whose estimate took longer than the budget."""
+    stale: int = 0
+    """Reads finding the latest estimate older than the budget."""
+    latency: float = 0.0
+    """Seconds the last estimate took."""
+
+
+@dataclass
+class PositionSink:
+    """Publish the latest position estimate to a display, within a latency budget.
+
+    Readers only get estimates younger than `budget`, so a stalled acquisition hides
+    the marker instead of freezing it at an old position. Feed it through a fan-out
+    branch with the `keep-latest` policy so slow displays never hold up recording.
+    """
+
+    estimator: PositionEstimator
+    """Estimator applied to each frame."""
+    budget: float = BUDGET
+    """Seconds an estimate stays current after its frame arrived."""
+    clock: Callable[[], float] = monotonic
+    """Time source in seconds."""
+    latest: tuple[float, np.ndarray] | None = None
+    """Arrival time of the latest frame and its last estimate of x, y, and
+    confidence, replaced at once so readers on other threads see a matching pair."""
+    stats: PositionStats = field(default_factory=PositionStats)
+    """Accounting so far."""
+
+    def write(self, frame: pd.DataFrame):
+        """Estimate positions of a frame, keeping the last one."""
+        arrived = self.clock()
+        estimates = self.estimator.update(frame).to_numpy()
+        self.stats.latency = self.clock() - arrived
+        self.stats.late += self.stats.latency > self.budget
+        self.stats.published += 1
+        if len(estimates):
+            self.latest = arrived, estimates[-1]
+
+    def close(self):
+        """Finish writing."""
+
+    def current(self) -> np.ndarray | None:
+        """Get the latest estimate if still within the budget."""
+        if (latest := self.latest) is None:
+            return None
+        arrived, estimate = latest
+        if self.clock() - arrived > self.budget:
+            self.stats.stale += 1
+            return None
+        return estimate
+
+
+def draw_markers(frames: np.ndarray, estimates: np.ndarray) -> np.ndarray:
+    """Draw a disc at each frame's estimated position, sized by confidence."""
+    _, height, width, _ = frames.shape
+    y, x = np.ogrid[:height, :width]
+    for frame, (px, py, confidence) in zip(frames, estimates, strict=True):
+        if confidence > 0 and np.isfinite(px) and np.isfinite(py):
+            radius = max(2.0, RADIUS * confidence)
+            frame[(x + 0.5 - px) ** 2 + (y + 0.5 - py) ** 2 <= radius**2] = MARKER
+    return frames
+
+
+def marked(render: Renderer, estimator: PositionEstimator) -> Renderer:
+    """Wrap a renderer to draw the estimated contact position on each frame."""
+
+    def render_marked(volts: np.ndarray) -> np.ndarray:
+        volts = np.atleast_2d(volts)
+        return draw_markers(render(volts), estimator.estimate(volts))
+
+    return render_marked
+
+
+def published(render: Renderer, positions: PositionSink) -> Renderer:
+    """Wrap a renderer to draw the latest published contact position on each frame.
+
+    Frames are left unmarked while no estimate is current.
+    """
+
+    def render_published(volts: np.ndarray) -> np.ndarray:
+        rendered = render(np.atleast_2d(volts))
+        if (estimate := positions.current()) is None:
+            return rendered
+        return draw_markers(rendered, np.tile(estimate, (len(rendered), 1)))
+
+    return render_published
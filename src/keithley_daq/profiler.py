@@ -0,0 +1,168 @@
+"""SCPI bus traffic profiling."""
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Literal, TypeAlias
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.instrument import Instrument
+from keithley_daq.simulator import normalize
+
+Operation: TypeAlias = Literal["write", "query", "read", "read_bytes"]
+"""Bus operation."""
+
+READ = "<read>"
+"""Mnemonic recorded for reads not tied to a query."""
+BINS = np.geomspace(1e-5, 10.0, 19)
+"""Latency histogram bin edges in seconds, three per decade from 10 us to 10 s."""
+
+
+@dataclass
+class Call:
+    """One bus operation."""
+
+    operation: Operation
+    """Operation."""
+    mnemonic: str
+    """Short-form command header, such as `TRAC:DATA?`."""
+    seconds: float
+    """Latency."""
+    sent: int
+    """Bytes written."""
+    received: int
+    """Bytes read."""
+
+
+@dataclass
+class BusProfiler:
+    """Transparent wrapper recording every write, query, and read of an instrument.
+
+    Attributes not profiled are passed through to the wrapped instrument.
+    """
+
+    inst: Instrument
+    """Wrapped instrument."""
+    clock: Callable[[], float] = perf_counter
+    """Time source in seconds."""
+    calls: list[Call] = field(default_factory=list)
+    """Operations, in the order they finished."""
+
+    @property
+    def timeout(self) -> float | None:
+        """Timeout in milliseconds."""
+        return self.inst.timeout
+
+    @timeout.setter
+    def timeout(self, timeout: float | None):
+        self.inst.timeout = timeout
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inst, name)
+
+    def write(self, message: str) -> Any:
+        """Write a command."""
+        start = self.clock()
+        result = self.inst.write(message)
+        self.record("write", mnemonic(message), start, len(message) + 1, 0)
+        return result
+
+    def query(self, message: str) -> str:
+        """Write a query and read the response."""
+        start = self.clock()
+        response = self.inst.query(message)
+        self.record(
+            "query", mnemonic(message), start, len(message) + 1, len(response) + 1
+        )
+        return response
+
+    def read(self) -> str:
+        """Read a line."""
+        start = self.clock()
+        response = self.inst.read()  # type: ignore
+        self.record("read", READ, start, 0, len(response) + 1)
+        return response
+
+    def read_bytes(self, count: int) -> bytes:
+        """Read exactly `count` bytes."""
+        start = self.clock()
+        data = self.inst.read_bytes(count)  # type: ignore
+        self.record("read_bytes", READ, start, 0, len(data))
+        return data
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.inst.close()
+
+    def record(
+        self,
+        operation: Operation,
+        mnemonic: str,
+        start: float,
+        sent: int,
+        received: int,
+    ):
+        """Record an operation started at `start`."""
+        self.calls.append(
+            Call(operation, mnemonic, self.clock() - start, sent, received)
+        )
+
+    @property
+    def round_trips(self) -> int:
+        """Operations waiting on a response from the instrument."""
+        return sum(call.operation != "write" for call in self.calls)
+
+    def frame(self) -> pd.DataFrame:
+        """Get operations as a data frame."""
+        return pd.DataFrame(
+            [asdict(call) for call in self.calls],
+            columns=["operation", "mnemonic", "seconds", "sent", "received"],
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """Summarize calls, bus time, latency, and bytes per mnemonic."""
+        summary = (
+            self.frame()
+            .groupby("mnemonic")
+            .agg(
+                calls=("seconds", "size"),
+                seconds=("seconds", "sum"),
+                median=("seconds", "median"),
+                p99=("seconds", lambda s: s.quantile(0.99)),
+                max=("seconds", "max"),
+                sent=("sent", "sum"),
+                received=("received", "sum"),
+            )
+            .sort_values("seconds", ascending=False)
+        )
+        return summary.assign(share=lambda df: df.seconds / df.seconds.sum())
+
+    def report(self, recording: Path) -> Path:
+        """Write the summary of bus traffic next to a recording."""
+        path = recording.with_name(f"{recording.stem}.bus.csv")
+        self.summary().to_csv(path)
+        return path
+
+    def histograms(self, bins: np.ndarray = BINS) -> pd.DataFrame:
+        """Count latencies per mnemonic in bins, labeled by their upper edges."""
+        frame = self.frame()
+        return pd.DataFrame(
+            {
+                name: np.histogram(group.seconds.clip(bins[0], bins[-1]), bins)[0]
+                for name, group in frame.groupby("mnemonic")
+            },
+            index=pd.Index(bins[1:], name="le"),
+        ).T
+
+    def reset(self):
+        """Forget recorded operations."""
+        self.calls.clear()
+
+
+def mnemonic(message: str) -> str:
+    """Short-form header of the first command in a message."""
+    header = message.split(";", 1)[0].split(maxsplit=1)
+    return normalize(header[0]) if header else ""
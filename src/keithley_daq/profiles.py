@@ -0,0 +1,119 @@
+"""Scan speed profiles trading reading rate against noise."""
+
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+from time import monotonic, sleep
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.buffers import ReadingBuffer
+from keithley_daq.instrument import Instrument
+from keithley_daq.pipeline import poll
+from keithley_daq.scpi import channel_list
+from keithley_daq.types import SpeedProfileName
+
+RANGE = 10.0
+"""Fixed range in volts used unless autoranging."""
+CALIBRATION_CAPACITY = 100_000
+"""Readings held by the calibration buffer."""
+
+
+@dataclass(frozen=True)
+class SpeedProfile:
+    """Measurement settings applied to each scanned channel."""
+
+    nplc: float
+    """Integration time in power line cycles, from 0.0005 to 15."""
+    autozero: bool
+    """Whether to remeasure the internal reference for every reading."""
+    autorange: bool
+    """Whether to autorange, rather than use a fixed range."""
+    delay: float
+    """Channel delay in seconds after closing each channel."""
+
+    def commands(
+        self, channels: Sequence[int], function: str = "VOLT:DC", range_: float = RANGE
+    ) -> list[str]:
+        """Commands applying the profile to channels measuring `function`."""
+        scan = channel_list(channels)
+        sense = f"SENS:{function}"
+        return [
+            f"{sense}:NPLC {self.nplc:g}, {scan}",
+            f"{sense}:AZER {'ON' if self.autozero else 'OFF'}, {scan}",
+            f"{sense}:RANG:AUTO ON, {scan}"
+            if self.autorange
+            else f"{sense}:RANG {range_:g}, {scan}",
+            f"ROUT:CHAN:DEL {self.delay:g}, {scan}",
+        ]
+
+
+PROFILES: dict[SpeedProfileName, SpeedProfile] = {
+    "fast": SpeedProfile(nplc=0.0005, autozero=False, autorange=False, delay=0.0),
+    "balanced": SpeedProfile(nplc=0.1, autozero=False, autorange=False, delay=0.0),
+    "precise": SpeedProfile(nplc=1.0, autozero=True, autorange=True, delay=0.0),
+}
+"""Speed profiles by name, fastest first."""
+
+
+def noise(readings: np.ndarray) -> float:
+    """Estimate noise from successive differences, ignoring slow signal changes."""
+    if len(readings) < 2:
+        return float("nan")
+    return float(np.sqrt(np.mean(np.diff(readings) ** 2) / 2))
+
+
+def calibrate(
+    inst: Instrument,
+    channels: Sequence[int],
+    function: str = "VOLT:DC",
+    profiles: Iterable[SpeedProfileName] = PROFILES,
+    duration: float = 1.0,
+    range_: float = RANGE,
+    poll_interval: float = 0.05,
+    clock: Callable[[], float] = monotonic,
+    wait: Callable[[float], None] = sleep,
+) -> pd.DataFrame:
+    """Measure the reading rate and noise each profile achieves.
+
+    Each profile scans for `duration` seconds, ideally of a steady input such as a
+    shorted channel. The rate is taken from reading timestamps, and the noise is the
+    median over channels of `noise`.
+    """
+    results: list[dict[str, object]] = []
+    for name in profiles:
+        profile = PROFILES[name]
+        buffer = ReadingBuffer("Calibration", CALIBRATION_CAPACITY, "STAN")
+        setup = [
+            f"SENS:FUNC '{function}', {channel_list(channels)}",
+            *profile.commands(channels, function, range_),
+        ]
+        readings = np.concatenate(
+            list(
+                poll(
+                    inst,
+                    buffer,
+                    channels,
+                    ("READ", "REL"),
+                    duration,
+                    poll_interval,
+                    setup=setup,
+                    clock=clock,
+                    wait=wait,
+                )
+            )
+        )
+        scans = len(readings) // len(channels)
+        by_channel = readings[: scans * len(channels)].reshape(scans, len(channels), 2)
+        times = readings[:, 1]
+        elapsed = float(times[-1] - times[0]) if len(times) > 1 else 0.0
+        results.append({
+            "profile": name,
+            **asdict(profile),
+            "readings": len(readings),
+            "rate": (len(readings) - 1) / elapsed if elapsed else float("nan"),
+            "noise": float(
+                np.median([noise(by_channel[:, c, 0]) for c in range(len(channels))])
+            ),
+        })
+    return pd.DataFrame(results).set_index("profile")
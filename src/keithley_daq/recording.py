@@ -0,0 +1,138 @@
+"""Columnar recordings.
+
+A recording is a directory holding `meta.json`, which describes its columns, and
+one raw little-endian file per column, appended frame by frame. Columns load as
+memory maps, so reading a few columns of a long run only touches their files, and
+values take exactly the bytes of their stored data type.
+"""
+
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from json import dumps, loads
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.storage import STORAGES, Storage
+from keithley_daq.timing import stage
+
+SUFFIX = ".daq"
+"""Suffix of recording directories."""
+META = "meta.json"
+"""Name of the file describing a recording."""
+VERSION = 1
+"""Version of the recording format."""
+
+
+@dataclass
+class RecordingSink:
+    """Append frames to a columnar recording."""
+
+    path: Path
+    """Recording directory, whose columns are overwritten by the first frame."""
+    storage: Storage = STORAGES["double"]
+    """Storage the frames were derived with, recorded in the metadata."""
+    rows: int = 0
+    """Rows written."""
+    dtypes: dict[str, np.dtype] = field(default_factory=dict)
+    """Data type of each column, fixed by the first frame."""
+
+    def write(self, frame: pd.DataFrame):
+        """Append a frame."""
+        if not self.dtypes:
+            self.start(frame)
+        elif missing := set(self.dtypes) ^ set(frame.columns):
+            raise ValueError(f"Frame columns {sorted(missing)} do not match.")
+        with stage("write", items=len(frame)) as write:
+            for index, (name, dtype) in enumerate(self.dtypes.items()):
+                values = np.ascontiguousarray(frame[name], dtype=dtype)
+                with (self.path / column_file(index)).open("ab") as file:
+                    values.tofile(file)
+                write.bytes += values.nbytes
+        self.rows += len(frame)
+
+    def start(self, frame: pd.DataFrame):
+        """Create the recording with the columns of its first frame."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        for stale in self.path.glob("col*.bin"):
+            stale.unlink()
+        self.dtypes = {
+            str(name): frame[name].dtype.newbyteorder("<") for name in frame.columns
+        }
+        for index in range(len(self.dtypes)):
+            (self.path / column_file(index)).touch()
+        self.write_meta()
+
+    def close(self):
+        """Finish writing, recording the number of rows."""
+        if self.dtypes:
+            self.write_meta()
+
+    def write_meta(self):
+        """Describe the recording."""
+        meta = {
+            "version": VERSION,
+            "rows": self.rows,
+            "storage": asdict(self.storage),
+            "columns": [
+                {"name": name, "file": column_file(index), "dtype": dtype.str}
+                for index, (name, dtype) in enumerate(self.dtypes.items())
+            ],
+        }
+        (self.path / META).write_text(dumps(meta, indent=2), encoding="utf-8")
+
+
+def column_file(index: int) -> str:
+    """Name the file holding a column."""
+    return f"col{index:04d}.bin"
+
+
+def read_meta(path: Path) -> dict:
+    """Read the description of a recording."""
+    meta = loads((path / META).read_text(encoding="utf-8"))
+    if meta["version"] > VERSION:
+        raise ValueError(f"Recording format {meta['version']} is newer than {VERSION}.")
+    return meta
+
+
+def load_columns(
+    path: Path, columns: Sequence[str] | None = None
+) -> dict[str, np.ndarray]:
+    """Map columns of a recording into memory as stored, all by default.
+
+    Rows are counted from the column files, so recordings cut short by a crash load
+    every whole row written.
+    """
+    meta = read_meta(path)
+    described = {column["name"]: column for column in meta["columns"]}
+    if missing := set(columns or ()) - set(described):
+        raise ValueError(f"Recording has no columns {sorted(missing)}.")
+    loaded: dict[str, np.ndarray] = {}
+    for name in columns or described:
+        file, dtype = path / described[name]["file"], np.dtype(described[name]["dtype"])
+        rows = file.stat().st_size // dtype.itemsize
+        loaded[name] = (
+            np.memmap(file, dtype, mode="r", shape=(rows,))
+            if rows
+            else np.empty(0, dtype)
+        )
+    rows = min((len(values) for values in loaded.values()), default=0)
+    return {name: values[:rows] for name, values in loaded.items()}
+
+
+def load_recording(
+    path: Path, columns: Sequence[str] | None = None, seconds: bool = True
+) -> pd.DataFrame:
+    """Load columns of a recording, all by default.
+
+    With `seconds`, timestamps stored in nanoseconds are converted to seconds.
+    """
+    storage = Storage(**read_meta(path)["storage"])
+    loaded = load_columns(path, columns)
+    if seconds:
+        loaded = {
+            name: storage.seconds(values) if values.dtype == np.int64 else values
+            for name, values in loaded.items()
+        }
+    return pd.DataFrame(loaded)
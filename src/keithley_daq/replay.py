@@ -0,0 +1,157 @@
+"""Replay of recorded runs as a simulated instrument.
+
+A replay answers the same SCPI subset as the simulator, including `TRAC:ACT:END?`
+and `TRAC:DATA?`, but with the readings of a recording, so the live pipeline and
+renderer can be exercised with real signals away from the bench.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import count
+from math import isinf
+from pathlib import Path
+from re import compile as regex
+from time import monotonic
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.analysis import read_chunks
+from keithley_daq.schema import COLUMNS
+from keithley_daq.scpi import split_args
+from keithley_daq.simulator import Simulator, normalize
+
+EXPORTED = regex(r"CH\d+")
+"""Channel columns of Keithley scan exports."""
+READINGS = ("reading", "ratio")
+"""Keys of columns holding readings, in order of preference."""
+
+
+@dataclass(frozen=True)
+class RecordedRun:
+    """Readings of a recorded run, in the order they were read."""
+
+    channels: int
+    """Channels in the scan list."""
+    times: np.ndarray
+    """Seconds since the first reading."""
+    readings: np.ndarray
+    """Readings."""
+    extra: np.ndarray
+    """Extra values."""
+
+
+def load_run(path: Path, reading_rate: float = 1000.0, header: int = 0) -> RecordedRun:
+    """Load the readings of a recording or a Keithley scan export.
+
+    Recordings give readings of `reading{n}` or `ratio{n}`, extra values of
+    `vsense{n}`, and times of `time{n}` columns. Exports give readings of `CH...`
+    columns, from the table row `header`. Missing extra values are one, and runs
+    without strictly increasing times are retimed at `reading_rate`.
+    """
+    match path.suffix.lower():
+        case ".csv":
+            table = pd.read_csv(path, header=header)
+        case ".xlsx" | ".xls":
+            table = pd.read_excel(path, header=header)
+        case _:
+            table = pd.concat(list(read_chunks(path)))
+    if labels := [column for column in table if EXPORTED.fullmatch(str(column))]:
+        extra = times = None
+    else:
+        for n in count(1):
+            found = [
+                label for key in READINGS if (label := COLUMNS[key].label(n)) in table
+            ]
+            if not found:
+                break
+            labels.append(found[0])
+        if not labels:
+            raise ValueError(f"{path} has no reading columns.")
+        channels = range(1, len(labels) + 1)
+        extra = table.get([COLUMNS["vsense"].label(n) for n in channels])
+        times = table.get([COLUMNS["time"].label(n) for n in channels])
+    readings = table[labels].to_numpy(dtype=float).ravel()
+    extra = np.ones_like(readings) if extra is None else extra.to_numpy(float).ravel()
+    times = None if times is None else times.to_numpy(float).ravel()
+    if times is None or not np.all(np.diff(times) > 0):
+        times = np.arange(len(readings)) / reading_rate
+    return RecordedRun(
+        len(labels), times - times[0] if len(times) else times, readings, extra
+    )
+
+
+class Replay(Simulator):
+    """Simulated DAQ6510 replaying a recorded run.
+
+    Readings become available as they were recorded, sped up `speed` times. At
+    infinite speed, readings are released as fast as they are read, a buffer at a
+    time, so the pipeline's throughput ceiling can be measured offline. Replays
+    keep the recorded timing regardless of measurement settings, and end with the
+    recording.
+    """
+
+    def __init__(
+        self,
+        run: RecordedRun,
+        speed: float = 1.0,
+        reading_rate: float = 1000.0,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.run = run
+        """Recorded run."""
+        self.speed = speed
+        """Playback speed relative to real time."""
+        self.fetched = 0
+        """Readings of the running scan read so far."""
+        super().__init__(reading_rate, clock)
+
+    def reset(self):
+        """Reset the instrument."""
+        super().reset()
+        self.fetched = 0
+
+    def retime(self):
+        """Keep the recorded timing."""
+
+    @property
+    def total(self) -> int:
+        """Readings in the running scan, at most those recorded."""
+        recorded = len(self.run.readings)
+        return min(super().total or recorded, recorded)
+
+    def due(self, elapsed: float) -> int:
+        """Count the readings due `elapsed` seconds into the running scan."""
+        if isinf(self.speed):
+            # ? Keep the last reading read, which cursors check for overruns
+            return self.fetched + self.buffers[self.scan_buffer].capacity - 1
+        times = self.run.times
+        return int(np.searchsorted(times, elapsed * self.speed, side="right"))
+
+    def generate(
+        self,
+        index: np.ndarray,
+        channel: np.ndarray,  # noqa: ARG002
+        start: float,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Take the recorded readings at positions `index`."""
+        run = self.run
+        return start + run.times[index], run.readings[index], run.extra[index]
+
+    def dispatch(self, message: str) -> str:
+        """Interpret a SCPI message."""
+        header, _, rest = message.strip().partition(" ")
+        command = normalize(header)
+        if command == "INIT" and len(self.scan_list) != self.run.channels:
+            raise ValueError(f"The recording scanned {self.run.channels} channels.")
+        response = super().dispatch(message)
+        if command == "INIT":
+            self.fetched = 0
+        elif command == "TRAC:DATA?":
+            _, end, *name = split_args(rest)
+            if self.buffer_name(name[:1]) == self.scan_buffer:
+                buffer = self.buffers[self.scan_buffer]
+                # ? Count up to the newest reading stored at the last position read
+                behind = (buffer.written - int(end)) % buffer.capacity
+                self.fetched = max(self.fetched, buffer.written - behind)
+        return response
@@ -0,0 +1,159 @@
+"""Reading schema and derived columns."""
+
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import TypeAlias
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.storage import STORAGES, Storage
+from keithley_daq.timing import stage
+from keithley_daq.types import BufferElement, ColumnKind
+
+ELEMENT_ORDER: tuple[BufferElement, ...] = (
+    "READ",
+    "EXTR",
+    "REL",
+    "CHAN",
+    "SEC",
+    "FRAC",
+    "STAT",
+)
+"""Numeric elements in the order they are queried."""
+
+Derive: TypeAlias = Callable[[Mapping[BufferElement, np.ndarray], float], np.ndarray]
+"""Derive a column from one channel's elements and the shunt resistance."""
+
+
+@dataclass(frozen=True)
+class Column:
+    """Column derived from the elements of one channel's readings."""
+
+    name: str
+    """Column name, formatted with the one-based channel position `n`."""
+    elements: tuple[BufferElement, ...]
+    """Elements the column is derived from."""
+    derive: Derive
+    """Derive the column."""
+    kind: ColumnKind = "value"
+    """What the column holds."""
+
+    def label(self, n: int) -> str:
+        """Name the column for the `n`th channel in the scan list."""
+        return self.name.format(n=n)
+
+
+COLUMNS: dict[str, Column] = {
+    "reading": Column("reading{n}", ("READ",), lambda e, shunt: e["READ"]),
+    "ratio": Column("ratio{n}", ("READ",), lambda e, shunt: e["READ"]),
+    "vsense": Column("vsense{n}", ("EXTR",), lambda e, shunt: e["EXTR"]),
+    "time": Column("time{n}", ("REL",), lambda e, shunt: e["REL"], "time"),
+    "channel": Column("channel{n}", ("CHAN",), lambda e, shunt: e["CHAN"], "channel"),
+    "current": Column("Current {n} [A]", ("EXTR",), lambda e, shunt: e["EXTR"] / shunt),
+    "voltage": Column(
+        "Voltage {n} [V]", ("READ", "EXTR"), lambda e, shunt: e["READ"] * e["EXTR"]
+    ),
+    "power": Column(
+        "Power {n} [W]",
+        ("READ", "EXTR"),
+        lambda e, shunt: e["EXTR"] / shunt * e["READ"] * e["EXTR"],
+    ),
+}
+"""Columns by key."""
+POWER_COLUMNS = ("ratio", "vsense", "time", "current", "voltage", "power")
+"""Columns recorded by power measurements."""
+
+
+def project(columns: Sequence[str]) -> tuple[BufferElement, ...]:
+    """Get the elements needed to derive `columns`, in query order."""
+    needed = {element for key in columns for element in COLUMNS[key].elements}
+    return tuple(element for element in ELEMENT_ORDER if element in needed)
+
+
+@dataclass(frozen=True)
+class ReadingSchema:
+    """Layout of readings returned by `TRAC:DATA?` for a scan.
+
+    Readings arrive scan by scan, channel by channel, element by element. Demuxing
+    uses the same elements that were queried, so columns cannot shift. Each scan is
+    one record of a structured dtype with a field per channel, itself with a field
+    per element, so columns are zero-copy views of the values as they arrived.
+    """
+
+    channels: tuple[int, ...]
+    """Channels in the scan list, in order."""
+    elements: tuple[BufferElement, ...]
+    """Elements queried for each reading."""
+
+    @classmethod
+    def for_columns(cls, channels: Sequence[int], columns: Sequence[str]):
+        """Get the schema querying only the elements `columns` need."""
+        return cls(tuple(channels), project(columns))
+
+    @property
+    def width(self) -> int:
+        """Values per scan."""
+        return len(self.channels) * len(self.elements)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Record field for each channel."""
+        return tuple(f"ch{channel}" for channel in self.channels)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Record of one scan."""
+        reading = np.dtype([(element, np.float64) for element in self.elements])
+        return np.dtype([(field, reading) for field in self.fields])
+
+    def records(self, values: np.ndarray) -> np.ndarray:
+        """View whole scans of values as records, without copying if contiguous."""
+        values = np.ascontiguousarray(self.demux(values), dtype=np.float64)
+        return values.reshape(-1).view(self.dtype)
+
+    def column(self, records: np.ndarray, channel: int, element: BufferElement):
+        """View one element of one channel across records."""
+        return records[f"ch{channel}"][element]
+
+    def demux(self, values: np.ndarray) -> np.ndarray:
+        """View whole scans of values as scans by channels by elements."""
+        values = np.asarray(values)
+        if values.size % self.width:
+            raise ValueError(
+                f"{values.size} values are not whole scans of {self.width} values."
+            )
+        return values.reshape(-1, len(self.channels), len(self.elements))
+
+    def derive(
+        self,
+        values: np.ndarray,
+        columns: Sequence[str],
+        shunt: float = 1.0,
+        storage: Storage = STORAGES["double"],
+    ) -> dict[str, np.ndarray]:
+        """Derive `columns` for every channel, grouped by channel, as stored."""
+        if missing := set(project(columns)) - set(self.elements):
+            raise ValueError(f"Elements {sorted(missing)} were not queried.")
+        with stage("derive") as derive:
+            records = self.records(values)
+            derived: dict[str, np.ndarray] = {}
+            for n, field in enumerate(self.fields, start=1):
+                elements = {e: records[field][e] for e in self.elements}
+                for key in columns:
+                    column = COLUMNS[key]
+                    derived[column.label(n)] = storage.cast(
+                        column.derive(elements, shunt), column.kind
+                    )
+            derive.items = len(records) * len(derived)
+        return derived
+
+    def frame(
+        self,
+        values: np.ndarray,
+        columns: Sequence[str],
+        shunt: float = 1.0,
+        storage: Storage = STORAGES["double"],
+    ) -> pd.DataFrame:
+        """Derive `columns` for every channel as a data frame."""
+        return pd.DataFrame(self.derive(values, columns, shunt, storage))
@@ -0,0 +1,73 @@
+"""SCPI formatting and parsing helpers."""
+
+from collections.abc import Iterable
+from concurrent.futures import Executor
+
+import numpy as np
+
+from keithley_daq.parsing import parse_ascii
+
+
+def channel_list(channels: Iterable[int]) -> str:
+    """Format channels as a SCPI channel list, collapsing consecutive runs."""
+    channels = list(channels)
+    if not channels:
+        raise ValueError("Channel list is empty.")
+    runs: list[tuple[int, int]] = []
+    for channel in channels:
+        if runs and channel == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], channel)
+        else:
+            runs.append((channel, channel))
+    return f"(@{','.join(str(a) if a == b else f'{a}:{b}' for a, b in runs)})"
+
+
+def parse_channel_list(channels: str) -> list[int]:
+    """Parse a SCPI channel list such as `(@101:103,105)` into channel numbers."""
+    body = channels.strip().removeprefix("(").removesuffix(")").strip()
+    body = body.removeprefix("@")
+    parsed: list[int] = []
+    for part in filter(None, (p.strip() for p in body.split(","))):
+        first, _, last = part.partition(":")
+        start, stop = int(first), int(last or first)
+        step = 1 if stop >= start else -1
+        parsed.extend(range(start, stop + step, step))
+    return parsed
+
+
+def split_args(args: str) -> list[str]:
+    """Split SCPI arguments on commas outside of quotes and parentheses."""
+    parts: list[str] = []
+    depth = 0
+    quote = ""
+    current = ""
+    for char in args:
+        if quote:
+            quote = "" if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and not depth:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def unquote(arg: str) -> str:
+    """Strip SCPI string quotes."""
+    return arg.strip().strip("'\"")
+
+
+def parse_values(response: str, executor: Executor | None = None) -> np.ndarray:
+    """Parse a comma-separated ASCII response into a float array.
+
+    Large responses are parsed in parallel by `executor`, as by `parse_ascii`.
+    """
+    return parse_ascii(response, executor)
@@ -0,0 +1,425 @@
+"""Simulated DAQ6510 speaking the SCPI subset used by this package."""
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from math import floor, sqrt
+from time import monotonic
+
+import numpy as np
+
+from keithley_daq.scpi import parse_channel_list, split_args, unquote
+from keithley_daq.types import BufferElement, BufferStyle, FillMode
+
+Signal = Callable[[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]
+"""Map channel numbers and reading times to readings and extra values."""
+
+EPOCH = 1_700_000_000.0
+"""Absolute time of the simulator's time origin, reported by `SEC` and `FRAC`."""
+MNEMONICS = (
+    "ABOR",
+    "ACT",
+    "AUTO",
+    "AZER",
+    "BUFF",
+    "CHAN",
+    "CLE",
+    "COUN",
+    "CRE",
+    "DATA",
+    "DEL",
+    "END",
+    "FILL",
+    "FUNC",
+    "INIT",
+    "MAKE",
+    "MODE",
+    "NPLC",
+    "POIN",
+    "RANG",
+    "RAT",
+    "ROUT",
+    "SCAN",
+    "SENS",
+    "STAR",
+    "STAT",
+    "SYST",
+    "TRAC",
+    "TRIG",
+    "VERS",
+    "VOLT",
+)
+"""Short forms of the mnemonics the simulator interprets."""
+STYLES: tuple[BufferStyle, ...] = ("FULLWRIT", "COMP", "STAN", "FULL", "WRIT")
+"""Buffer styles, ordered so that prefix matching is unambiguous."""
+LINE_FREQUENCY = 60.0
+"""Power line frequency in hertz, setting the aperture of one NPLC."""
+OVERHEAD = 1e-4
+"""Seconds of switching and conversion per reading, besides the aperture."""
+AUTORANGE = 5e-4
+"""Seconds autoranging adds to each reading."""
+NOISE = 2e-6
+"""Reading noise in volts at one NPLC with autozero."""
+
+
+def default_signal(
+    channels: np.ndarray, times: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Slow sinusoid per channel around 25 mV, with a constant 1 V extra value."""
+    phase = (channels % 100) * np.pi / 4
+    readings = 0.025 + 0.0125 * np.sin(2 * np.pi * 0.5 * times + phase)
+    return readings, np.ones_like(readings)
+
+
+@dataclass
+class SimulatedBuffer:
+    """Circular reading buffer."""
+
+    capacity: int
+    """Number of readings the buffer holds."""
+    style: BufferStyle = "STAN"
+    """Buffer style."""
+    fill_mode: FillMode = "CONT"
+    """Fill mode."""
+    written: int = 0
+    """Readings stored since the buffer was last cleared."""
+    origin: float | None = None
+    """Time of the first reading since the buffer was last cleared."""
+    reading: np.ndarray = field(init=False, repr=False)
+    """Readings."""
+    extra: np.ndarray = field(init=False, repr=False)
+    """Extra values."""
+    time: np.ndarray = field(init=False, repr=False)
+    """Reading times relative to the simulator's time origin."""
+    channel: np.ndarray = field(init=False, repr=False)
+    """Channel numbers."""
+
+    def __post_init__(self):
+        self.clear()
+
+    def clear(self):
+        """Clear the buffer."""
+        self.written = 0
+        self.origin = None
+        self.reading = np.zeros(self.capacity)
+        self.extra = np.zeros(self.capacity)
+        self.time = np.zeros(self.capacity)
+        self.channel = np.zeros(self.capacity, dtype=np.int64)
+
+    @property
+    def count(self) -> int:
+        """Readings currently held."""
+        return min(self.written, self.capacity)
+
+    @property
+    def end(self) -> int:
+        """One-based position of the newest reading, or zero if empty."""
+        return (self.written - 1) % self.capacity + 1 if self.written else 0
+
+    @property
+    def start(self) -> int:
+        """One-based position of the oldest reading, or zero if empty."""
+        if not self.written:
+            return 0
+        return 1 if self.written <= self.capacity else self.end % self.capacity + 1
+
+    def accepts(self, n: int) -> int:
+        """Count how many of `n` new readings the buffer will store."""
+        if self.fill_mode == "ONCE":
+            return max(0, min(n, self.capacity - self.written))
+        return n
+
+    def append(
+        self,
+        reading: np.ndarray,
+        extra: np.ndarray,
+        time: np.ndarray,
+        channel: np.ndarray,
+    ):
+        """Append readings, overwriting the oldest in continuous fill mode."""
+        n = self.accepts(len(reading))
+        if not n:
+            return
+        if self.origin is None:
+            self.origin = float(time[0])
+        keep = slice(max(0, n - self.capacity), n)
+        positions = (self.written + np.arange(n)[keep]) % self.capacity
+        self.reading[positions] = reading[:n][keep]
+        self.extra[positions] = extra[:n][keep]
+        self.time[positions] = time[:n][keep]
+        self.channel[positions] = channel[:n][keep]
+        self.written += n
+
+    def elements(
+        self, start: int, end: int, elements: list[BufferElement]
+    ) -> np.ndarray:
+        """Get readings at one-based positions `start` through `end`, one per row."""
+        if not self.count or not (1 <= start <= end <= self.capacity):
+            raise ValueError(f"Invalid buffer range {start}, {end}.")
+        positions = np.arange(start - 1, end)
+        time = self.time[positions]
+        columns: dict[BufferElement, np.ndarray] = {
+            "READ": self.reading[positions],
+            "EXTR": self.extra[positions],
+            "REL": time - (self.origin or 0.0),
+            "CHAN": self.channel[positions],
+            "SEC": np.floor(EPOCH + time),
+            "FRAC": (EPOCH + time) % 1,
+            "STAT": np.zeros(len(positions)),
+        }
+        if unknown := set(elements) - set(columns):
+            raise ValueError(f"Unsupported buffer elements {sorted(unknown)}.")
+        return np.column_stack([columns[element] for element in elements])
+
+
+class Simulator:
+    """Simulated DAQ6510 scanning at a fixed reading rate.
+
+    Quacks like the `MessageBasedResource` returned by `get_instrument`. Readings are
+    generated lazily from `clock` whenever the instrument is queried, so tests can
+    drive the simulation deterministically by passing a fake clock.
+    """
+
+    def __init__(
+        self,
+        reading_rate: float = 1000.0,
+        clock: Callable[[], float] = monotonic,
+        signal: Signal = default_signal,
+    ):
+        self.timeout: float | None = 2000
+        self.base_rate = reading_rate
+        """Reading rate until measurement settings are changed."""
+        self.reading_rate = reading_rate
+        """Readings per second across the whole scan list."""
+        self.noise = 0.0
+        """Standard deviation of noise added to readings."""
+        self.rng = np.random.default_rng(0)
+        """Noise generator."""
+        self.nplc = 1.0
+        """Integration time in power line cycles."""
+        self.autozero = True
+        """Whether autozero is on."""
+        self.autorange = True
+        """Whether autorange is on."""
+        self.delay = 0.0
+        """Channel delay in seconds."""
+        self.clock = clock
+        """Time source in seconds."""
+        self.signal = signal
+        """Signal generator."""
+        self.epoch = clock()
+        """Clock time of the simulator's time origin."""
+        self.buffers: dict[str, SimulatedBuffer] = {}
+        """Reading buffers by name."""
+        self.scan_list: list[int] = []
+        """Channels scanned, in order."""
+        self.scan_count = 1
+        """Number of scans, or zero for infinite."""
+        self.scan_buffer = "defbuffer1"
+        """Buffer that scans store readings in."""
+        self.started: float | None = None
+        """Clock time of the running scan's start."""
+        self.generated = 0
+        """Readings generated by the running scan."""
+        self.reset()
+
+    def reset(self):
+        """Reset the instrument."""
+        self.buffers = {
+            "defbuffer1": SimulatedBuffer(100_000),
+            "defbuffer2": SimulatedBuffer(100_000),
+        }
+        self.scan_list = []
+        self.scan_count = 1
+        self.scan_buffer = "defbuffer1"
+        self.started = None
+        self.generated = 0
+        self.reading_rate = self.base_rate
+        self.noise = 0.0
+        self.nplc, self.autozero, self.autorange, self.delay = 1.0, True, True, 0.0
+
+    def retime(self):
+        """Derive the reading rate and noise from measurement settings."""
+        aperture = self.nplc / LINE_FREQUENCY * (2 if self.autozero else 1)
+        autorange = AUTORANGE if self.autorange else 0.0
+        self.reading_rate = 1 / (aperture + autorange + self.delay + OVERHEAD)
+        self.noise = NOISE / sqrt(self.nplc) * (1 if self.autozero else 1.5)
+
+    @property
+    def running(self) -> bool:
+        """Whether a scan is in progress."""
+        self.advance()
+        return self.started is not None
+
+    @property
+    def total(self) -> int | None:
+        """Readings in the running scan, or `None` if it scans indefinitely."""
+        return self.scan_count * len(self.scan_list) if self.scan_count else None
+
+    def advance(self):
+        """Generate the readings due since the last call."""
+        if self.started is None:
+            return
+        due = self.due(self.clock() - self.started)
+        if (total := self.total) is not None:
+            due = min(due, total)
+        if (n := due - self.generated) > 0:
+            buffer = self.buffers[self.scan_buffer]
+            stored = buffer.accepts(n)
+            first = self.generated + max(0, stored - buffer.capacity)
+            index = np.arange(first, self.generated + stored)
+            channel = np.asarray(self.scan_list)[index % len(self.scan_list)]
+            time, reading, extra = self.generate(
+                index, channel, self.started - self.epoch
+            )
+            if skipped := first - self.generated:
+                # ? Readings that would be overwritten within this call are not made
+                buffer.written += skipped
+            buffer.append(reading, extra, time, channel)
+            self.generated = due
+        if (total := self.total) is not None and self.generated >= total:
+            self.started = None
+
+    def due(self, elapsed: float) -> int:
+        """Count the readings due `elapsed` seconds into the running scan."""
+        return floor(elapsed * self.reading_rate)
+
+    def generate(
+        self, index: np.ndarray, channel: np.ndarray, start: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Make the readings at positions `index` in a scan begun at time `start`.
+
+        Returns reading times relative to the time origin, readings, and extra values.
+        """
+        time = start + index / self.reading_rate
+        reading, extra = self.signal(channel, time)
+        if self.noise:
+            reading += self.rng.normal(0, self.noise, len(reading))
+        return time, reading, extra
+
+    def write(self, message: str) -> int:
+        """Write a command."""
+        self.dispatch(message)
+        return len(message)
+
+    def query(self, message: str) -> str:
+        """Write a query and read the response."""
+        return self.dispatch(message)
+
+    def close(self):
+        """Close the connection."""
+
+    def dispatch(self, message: str) -> str:  # noqa: C901, PLR0911, PLR0912, PLR0915
+        """Interpret a SCPI message."""
+        self.advance()
+        header, _, rest = message.strip().partition(" ")
+        command = normalize(header)
+        args = split_args(rest)
+        match command:
+            case "*RST":
+                self.reset()
+            case "*IDN?":
+                return "KEITHLEY INSTRUMENTS,MODEL DAQ6510,SIMULATED,1.7.12b"
+            case "*OPC?":
+                return "1"
+            case "SYST:VERS?":
+                return "1999.0"
+            case "TRAC:MAKE":
+                name, size, *style = args
+                self.buffers[unquote(name)] = SimulatedBuffer(
+                    int(size), style=buffer_style(style[0] if style else "STAN")
+                )
+            case "TRAC:CLE":
+                self.buffer(args).clear()
+            case "TRAC:FILL:MODE":
+                mode, *name = args
+                self.buffer(name).fill_mode = (
+                    "ONCE" if mode.upper() == "ONCE" else "CONT"
+                )
+            case "TRAC:POIN":
+                size, *name = args
+                buffer = self.buffer(name)
+                self.buffers[self.buffer_name(name)] = SimulatedBuffer(
+                    int(size), style=buffer.style, fill_mode=buffer.fill_mode
+                )
+            case "TRAC:POIN?":
+                return str(self.buffer(args).capacity)
+            case "TRAC:ACT?":
+                return str(self.buffer(args).count)
+            case "TRAC:ACT:STAR?":
+                return str(self.buffer(args).start)
+            case "TRAC:ACT:END?":
+                return str(self.buffer(args).end)
+            case "TRAC:DATA?":
+                start, end, *rest = args
+                name = rest[:1]
+                elements: list[BufferElement] = [e.upper() for e in rest[1:]] or [
+                    "READ"
+                ]  # type: ignore
+                values = self.buffer(name).elements(int(start), int(end), elements)
+                return ",".join(f"{value:.12g}" for value in values.ravel().tolist())
+            case "ROUT:SCAN:CRE":
+                self.scan_list = parse_channel_list(args[0])
+            case "ROUT:SCAN:COUN:SCAN" | "ROUT:SCAN:COUN":
+                self.scan_count = int(args[0])
+            case "ROUT:SCAN:COUN:SCAN?" | "ROUT:SCAN:COUN?":
+                return str(self.scan_count)
+            case "ROUT:SCAN:BUFF":
+                self.scan_buffer = self.buffer_name(args)
+            case "INIT":
+                if not self.scan_list:
+                    raise ValueError("No scan list defined.")
+                self.started = self.clock()
+                self.generated = 0
+            case "ABOR":
+                self.started = None
+            case "TRIG:STAT?":
+                state = "RUNNING" if self.running else "IDLE"
+                return f"{state};{state};0"
+            case _ if command.startswith("SENS:") and command.endswith(":NPLC"):
+                self.nplc = float(args[0])
+                self.retime()
+            case _ if command.startswith("SENS:") and command.endswith(":AZER"):
+                self.autozero = args[0].upper() in {"ON", "1"}
+                self.retime()
+            case _ if command.startswith("SENS:") and command.endswith(":RANG:AUTO"):
+                self.autorange = args[0].upper() in {"ON", "1"}
+                self.retime()
+            case _ if command.startswith("SENS:") and command.endswith(":RANG"):
+                self.autorange = False
+                self.retime()
+            case "ROUT:CHAN:DEL" | "ROUT:DEL":
+                self.delay = float(args[0])
+                self.retime()
+            case _ if command.endswith("?"):
+                raise ValueError(f"Unsupported query {message!r}.")
+            case _:
+                pass  # ? Display, labels, and sense settings don't affect readings
+        return ""
+
+    def buffer_name(self, args: list[str]) -> str:
+        """Buffer named by the first argument, defaulting to `defbuffer1`."""
+        name = unquote(args[0]) if args else "defbuffer1"
+        if name not in self.buffers:
+            raise ValueError(f"Unknown buffer {name!r}.")
+        return name
+
+    def buffer(self, args: list[str]) -> SimulatedBuffer:
+        """Buffer named by the first argument, defaulting to `defbuffer1`."""
+        return self.buffers[self.buffer_name(args)]
+
+
+def normalize(header: str) -> str:
+    """Reduce a SCPI header to the short form of each of its mnemonics."""
+    header = header.strip().upper().lstrip(":")
+    query = header.endswith("?")
+    parts: list[str] = []
+    for part in header.rstrip("?").split(":"):
+        short = next((m for m in MNEMONICS if part.startswith(m)), part)
+        parts.append(short)
+    return ":".join(parts) + ("?" if query else "")
+
+
+def buffer_style(style: str) -> BufferStyle:
+    """Buffer style named by a possibly long-form argument."""
+    style = unquote(style).upper()
+    return next((s for s in STYLES if style.startswith(s)), "STAN")
@@ -0,0 +1,60 @@
+"""Storage precision of derived columns.
+
+Readings are derived in double precision and cast once when stored, so compact
+storage rounds each value at most once. Single precision keeps 24 significant bits,
+a relative error of at most `RELATIVE_ERROR`, under a microvolt on the 10 V range
+and below the 6½-digit resolution of the DAQ6510. Relative timestamps keep double
+precision or are stored as integer nanoseconds, since single precision would lose
+milliseconds within hours.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from keithley_daq.types import ColumnKind, Precision, TimeUnit
+
+RELATIVE_ERROR = float(np.finfo(np.float32).eps) / 2
+"""Largest relative error of values stored in single precision."""
+NANOSECONDS = 1_000_000_000
+"""Nanoseconds per second."""
+
+
+@dataclass(frozen=True)
+class Storage:
+    """How derived columns are stored in memory and on disk."""
+
+    values: str = "float64"
+    """Data type of measured and derived values."""
+    times: TimeUnit = "s"
+    """Unit of relative timestamps, stored as `float64` seconds or `int64` ns."""
+    channels: str = "float64"
+    """Data type of channel numbers."""
+
+    def dtype(self, kind: ColumnKind) -> np.dtype:
+        """Get the data type of columns of a kind."""
+        match kind:
+            case "time":
+                return np.dtype(np.int64 if self.times == "ns" else np.float64)
+            case "channel":
+                return np.dtype(self.channels)
+            case _:
+                return np.dtype(self.values)
+
+    def cast(self, column: np.ndarray, kind: ColumnKind) -> np.ndarray:
+        """Cast a column derived in double precision, copying only if needed."""
+        if kind == "time" and self.times == "ns":
+            return np.rint(column * NANOSECONDS).astype(np.int64)
+        return column.astype(self.dtype(kind), copy=False)
+
+    def seconds(self, column: np.ndarray) -> np.ndarray:
+        """Convert stored relative timestamps back to seconds."""
+        return column / NANOSECONDS if self.times == "ns" else column
+
+
+STORAGES: dict[Precision, Storage] = {
+    "double": Storage(),
+    "compact": Storage("float32", "ns", "uint16"),
+}
+"""Storage of each precision. Compact storage halves values and channel numbers
+fit in two bytes, since DAQ6510 channels are numbered up to 999."""
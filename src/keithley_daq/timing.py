@@ -0,0 +1,101 @@
+"""Per-stage timing instrumentation."""
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+
+import pandas as pd
+
+CURRENT: ContextVar["Timings | None"] = ContextVar("timings", default=None)
+"""Timings recorded by `stage`, if any."""
+
+
+@dataclass
+class Stage:
+    """Timing of one pass through a pipeline stage."""
+
+    name: str
+    """Stage name, such as `transfer` or `parse`."""
+    chunk: int | None = None
+    """Chunk being processed, or `None` for whole-run stages such as setup."""
+    seconds: float = 0.0
+    """Wall time."""
+    bytes: int = 0
+    """Bytes processed."""
+    items: int = 0
+    """Items processed, such as values parsed or rows written."""
+
+
+@dataclass
+class Timings:
+    """Stage timings recorded over a run."""
+
+    stages: list[Stage] = field(default_factory=list)
+    """Stage timings, in the order they finished."""
+    chunk: int | None = None
+    """Chunk currently being processed."""
+
+    @contextmanager
+    def record(self) -> Generator["Timings", None, None]:
+        """Record stages timed within this context."""
+        token = CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            CURRENT.reset(token)
+
+    def next_chunk(self) -> int:
+        """Start timing the next chunk."""
+        self.chunk = 0 if self.chunk is None else self.chunk + 1
+        return self.chunk
+
+    def frame(self) -> pd.DataFrame:
+        """Get stage timings as a data frame."""
+        return pd.DataFrame(
+            [asdict(stage) for stage in self.stages],
+            columns=["name", "chunk", "seconds", "bytes", "items"],
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """Summarize total time, bytes, and items per stage."""
+        summary = (
+            self.frame()
+            .groupby("name", sort=False)
+            .agg(
+                calls=("seconds", "size"),
+                seconds=("seconds", "sum"),
+                bytes=("bytes", "sum"),
+                items=("items", "sum"),
+            )
+        )
+        return summary.assign(**{
+            "share": lambda df: df.seconds / df.seconds.sum(),
+            "MB/s": lambda df: df.bytes / df.seconds / 1e6,
+            "items/s": lambda df: df["items"] / df.seconds,
+        })
+
+    def write(self, recording: Path) -> Path:
+        """Write stage timings next to a recording."""
+        path = recording.with_name(f"{recording.stem}.timings.csv")
+        self.frame().to_csv(path, index=False)
+        return path
+
+
+@contextmanager
+def stage(name: str, bytes: int = 0, items: int = 0) -> Generator[Stage, None, None]:  # noqa: A002
+    """Time a stage, recording it if timings are being recorded.
+
+    Set `bytes` and `items` on the yielded stage when they are only known afterwards.
+    """
+    timings = CURRENT.get()
+    timed = Stage(name, timings.chunk if timings else None, bytes=bytes, items=items)
+    start = perf_counter()
+    try:
+        yield timed
+    finally:
+        timed.seconds = perf_counter() - start
+        if timings is not None:
+            timings.stages.append(timed)
@@ -0,0 +1,387 @@
+"""On-instrument TSP acquisition streaming packed binary blocks."""
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from re import findall, search
+from typing import Any, Literal, Protocol, TypeAlias, runtime_checkable
+
+import numpy as np
+
+from keithley_daq.schema import ReadingSchema
+from keithley_daq.simulator import EPOCH, Signal, default_signal
+from keithley_daq.timing import CURRENT, stage
+from keithley_daq.types import BufferElement, BufferStyle
+
+DataFormat: TypeAlias = Literal["REAL32", "REAL64"]
+"""Packed binary format of `printbuffer` output."""
+
+SCRIPT = "KeithleyDaqAcquire"
+"""Name of the uploaded script."""
+ATTRIBUTES: dict[BufferElement, str] = {
+    "READ": "readings",
+    "EXTR": "extravalues",
+    "REL": "relativetimestamps",
+    "SEC": "seconds",
+    "FRAC": "fractionalseconds",
+    "STAT": "statuses",
+}
+"""Buffer attributes printed for each element."""
+DTYPES: dict[DataFormat, str] = {"REAL32": "<f4", "REAL64": "<f8"}
+"""NumPy dtypes of each data format."""
+STYLES: dict[BufferStyle, str] = {
+    "COMP": "STYLE_COMPACT",
+    "STAN": "STYLE_STANDARD",
+    "FULL": "STYLE_FULL",
+}
+"""TSP buffer styles."""
+FUNCTIONS: dict[str, str] = {
+    "VOLT:DC": "dmm.FUNC_DC_VOLTAGE",
+    "VOLT:DC:RAT": "dmm.FUNC_DCV_RATIO",
+    "VOLT:AC": "dmm.FUNC_AC_VOLTAGE",
+    "CURR:DC": "dmm.FUNC_DC_CURRENT",
+    "CURR:AC": "dmm.FUNC_AC_CURRENT",
+    "RES": "dmm.FUNC_RESISTANCE",
+    "FRES": "dmm.FUNC_4W_RESISTANCE",
+    "TEMP": "dmm.FUNC_TEMPERATURE",
+}
+"""TSP measurement functions of SCPI function names."""
+RATIO = "VOLT:DC:RAT"
+"""Function measuring the sense voltage as an extra value."""
+
+
+@runtime_checkable
+class TspInstrument(Protocol):
+    """The subset of `MessageBasedResource` used to stream from a TSP script."""
+
+    def write(self, message: str) -> Any:
+        """Write a command."""
+        ...
+
+    def read(self) -> str:
+        """Read a line."""
+        ...
+
+    def read_bytes(self, count: int) -> bytes:
+        """Read exactly `count` bytes."""
+        ...
+
+    def clear(self) -> Any:
+        """Clear the device, aborting a running script."""
+        ...
+
+
+def acquisition_script(
+    schema: ReadingSchema,
+    scans_per_block: int,
+    blocks: int = 0,
+    style: BufferStyle = "FULL",
+    data_format: DataFormat = "REAL64",
+    function: str | None = None,
+    labels: Mapping[int, str] | None = None,
+) -> str:
+    """Generate the TSP acquisition script.
+
+    After resetting the instrument, channels are set to measure `function`, a SCPI
+    function name such as `VOLT:DC:RAT`, and are labeled with `labels`. Extra values
+    are only measured by the ratio function.
+
+    Scans alternate between two buffers. While one fills, the other is printed as a
+    `BLK,<block>,<readings>,<start>` line followed by its readings packed in
+    `data_format`. Relative timestamps restart with each buffer, so `start` gives the
+    seconds from the first reading of the run to the first reading of the block. The
+    script prints `END` after `blocks` blocks, or runs until aborted if zero.
+    """
+    if unsupported := set(schema.elements) - set(ATTRIBUTES):
+        raise ValueError(f"Elements {sorted(unsupported)} cannot be packed.")
+    if function is not None and function not in FUNCTIONS:
+        raise ValueError(f"Unknown TSP function {function!r}.")
+    if "EXTR" in schema.elements and function != RATIO:
+        raise ValueError(f"Extra values need the `{RATIO}` function.")
+    channels = ",".join(map(str, schema.channels))
+    settings = [
+        *(
+            [f"channel.setdmm(CHANNELS, dmm.ATTR_MEAS_FUNCTION, {FUNCTIONS[function]})"]
+            if function
+            else []
+        ),
+        *(
+            f'channel.setlabel("{channel}", "{lua(label)}")'
+            for channel, label in (labels or {}).items()
+        ),
+    ]
+    capacity = scans_per_block * len(schema.channels)
+    printed = ", ".join(f"filled.{ATTRIBUTES[e]}" for e in schema.elements)
+    configure = "".join(f"{line}\n" for line in settings)
+    return f"""\
+loadscript {SCRIPT}
+local CHANNELS = "{channels}"
+local SCANS = {scans_per_block}
+local BLOCKS = {blocks}
+reset()
+{configure}local bufs = {{buffer.make({capacity}, buffer.{STYLES[style]}), buffer.make({capacity}, buffer.{STYLES[style]})}}
+bufs[1].fillmode = buffer.FILL_ONCE
+bufs[2].fillmode = buffer.FILL_ONCE
+scan.create(CHANNELS)
+scan.scancount = SCANS
+format.data = format.{data_format}
+format.byteorder = format.LITTLEENDIAN
+local block = 0
+local current = 1
+local origin = nil
+local fraction = 0
+buffer.clearbuffer(bufs[current])
+scan.buffer = bufs[current]
+trigger.model.initiate()
+while BLOCKS == 0 or block < BLOCKS do
+  waitcomplete()
+  local filled = bufs[current]
+  block = block + 1
+  current = 3 - current
+  if BLOCKS == 0 or block < BLOCKS then
+    buffer.clearbuffer(bufs[current])
+    scan.buffer = bufs[current]
+    trigger.model.initiate()
+  end
+  local start = 0
+  if filled.n > 0 then
+    if origin == nil then
+      origin = filled.seconds[1]
+      fraction = filled.fractionalseconds[1]
+    end
+    start = (filled.seconds[1] - origin) + (filled.fractionalseconds[1] - fraction)
+  end
+  print(string.format("BLK,%d,%d,%.9f", block, filled.n, start))
+  if filled.n > 0 then
+    printbuffer(1, filled.n, {printed})
+  end
+end
+print("END")
+endscript
+"""
+
+
+def decode_block(payload: bytes, data_format: DataFormat = "REAL64") -> np.ndarray:
+    """Decode a packed `printbuffer` payload into values."""
+    payload = payload.removesuffix(b"\n")
+    if not payload.startswith(b"#0"):
+        raise ValueError("Packed block does not start with `#0`.")
+    return np.frombuffer(payload[2:], dtype=DTYPES[data_format]).astype(float)
+
+
+@dataclass
+class StreamStats:
+    """Accounting for a TSP stream."""
+
+    blocks: int = 0
+    """Blocks decoded."""
+    readings: int = 0
+    """Readings decoded."""
+    dropped: int = 0
+    """Readings missing from short blocks."""
+    reads: int = 0
+    """Reads from the instrument."""
+    bytes: int = 0
+    """Bytes read."""
+
+
+@dataclass
+class TspAcquisition:
+    """Run the TSP acquisition script and decode its packed blocks."""
+
+    inst: TspInstrument
+    """Instrument."""
+    schema: ReadingSchema
+    """Layout of each reading."""
+    scans_per_block: int
+    """Scans per block."""
+    blocks: int = 0
+    """Blocks to acquire, or zero to run until aborted."""
+    style: BufferStyle = "FULL"
+    """Buffer style."""
+    data_format: DataFormat = "REAL64"
+    """Packed binary format."""
+    function: str | None = None
+    """SCPI name of the function channels measure, or `None` for the default."""
+    labels: Mapping[int, str] | None = None
+    """Label of each channel."""
+    stats: StreamStats = field(default_factory=StreamStats)
+    """Accounting for the stream so far."""
+
+    @property
+    def script(self) -> str:
+        """Acquisition script."""
+        return acquisition_script(
+            self.schema,
+            self.scans_per_block,
+            self.blocks,
+            self.style,
+            self.data_format,
+            self.function,
+            self.labels,
+        )
+
+    def upload(self):
+        """Upload the acquisition script."""
+        for line in self.script.splitlines():
+            self.inst.write(line)
+
+    def stream(self) -> Iterator[np.ndarray]:
+        """Run the script, yielding each block's values as it arrives.
+
+        Relative timestamps are offset by the start of their block, so they count
+        from the first reading of the run. The script is aborted if the consumer
+        stops before it ends.
+        """
+        self.inst.write(f"{SCRIPT}()")
+        itemsize = np.dtype(DTYPES[self.data_format]).itemsize
+        elements = list(self.schema.elements)
+        expected = self.scans_per_block * len(self.schema.channels)
+        ended = False
+        try:
+            while True:
+                if timings := CURRENT.get():
+                    timings.next_chunk()
+                # ? Block headers arrive once the block is filled
+                with stage("wait"):
+                    line = self.read_line()
+                if line == "END":
+                    break
+                _, _, readings, start = line.split(",")
+                readings = int(readings)
+                values = np.empty(0)
+                if readings:
+                    count = 2 + readings * len(elements) * itemsize + 1
+                    with stage("transfer", bytes=count):
+                        payload = self.inst.read_bytes(count)
+                    self.stats.reads += 1
+                    self.stats.bytes += len(payload)
+                    with stage("decode", bytes=count, items=readings * len(elements)):
+                        values = decode_block(payload, self.data_format)
+                    if "REL" in elements:
+                        values.reshape(-1, len(elements))[:, elements.index("REL")] += (
+                            float(start)
+                        )
+                self.stats.blocks += 1
+                self.stats.readings += readings
+                self.stats.dropped += expected - readings
+                yield values
+            ended = True
+        finally:
+            if not ended:
+                self.abort()
+
+    def abort(self):
+        """Abort the running script and its scan."""
+        self.inst.clear()
+        self.inst.write("trigger.model.abort()")
+
+    def read_line(self) -> str:
+        """Read a line of the script's text output."""
+        line = self.inst.read().strip()
+        self.stats.reads += 1
+        self.stats.bytes += len(line) + 1
+        return line
+
+
+class ScriptStandIn:
+    """Local stand-in emulating the output stream of the acquisition script.
+
+    Parameters are read back from the uploaded script itself, and readings are drawn
+    from a simulator signal at a fixed reading rate.
+    """
+
+    def __init__(self, reading_rate: float = 1000.0, signal: Signal = default_signal):
+        self.reading_rate = reading_rate
+        """Readings per second across the whole scan list."""
+        self.signal = signal
+        """Signal generator."""
+        self.script: list[str] = []
+        """Lines of the uploaded script."""
+        self.blocks: Iterator[bytes] | None = None
+        """Remaining output of the running script."""
+        self.timeout: float | None = None
+        """Timeout in milliseconds, unused."""
+
+    def write(self, message: str) -> int:
+        """Write a command or a line of the script being uploaded."""
+        if message == f"{SCRIPT}()":
+            self.blocks = self.run("\n".join(self.script))
+        elif message.startswith("loadscript"):
+            self.script = [message]
+        elif self.script and self.script[-1] != "endscript":
+            self.script.append(message)
+        return len(message)
+
+    def query(self, message: str) -> str:
+        """Write a command and read a line."""
+        self.write(message)
+        return self.read()
+
+    def read(self) -> str:
+        """Read a line."""
+        return self.next().decode().removesuffix("\n")
+
+    def read_bytes(self, count: int) -> bytes:
+        """Read exactly `count` bytes."""
+        data = self.next()
+        if len(data) != count:
+            raise ValueError(f"Expected {count} bytes, next output has {len(data)}.")
+        return data
+
+    def clear(self):
+        """Abort the running script."""
+        self.blocks = None
+
+    def close(self):
+        """Close the connection."""
+        self.clear()
+
+    def next(self) -> bytes:
+        """Get the next output of the running script."""
+        if self.blocks is None:
+            raise ValueError(f"{SCRIPT} is not running.")
+        return next(self.blocks)
+
+    def run(self, script: str) -> Iterator[bytes]:
+        """Emulate the script's output."""
+        channels = np.array([int(c) for c in local(script, "CHANNELS").split(",")])
+        scans, blocks = int(local(script, "SCANS")), int(local(script, "BLOCKS"))
+        data_format: DataFormat = search(r"format\.data = format\.(\w+)", script)[1]  # type: ignore
+        printed = findall(
+            r"filled\.(\w+)", script.split("printbuffer(1, filled.n", 1)[1]
+        )
+        elements = [next(e for e, a in ATTRIBUTES.items() if a == p) for p in printed]
+        if "EXTR" in elements and FUNCTIONS[RATIO] not in script:
+            raise ValueError("Extra values are only measured as ratios.")
+        per_block = scans * len(channels)
+        block = 0
+        while not blocks or block < blocks:
+            index = np.arange(block * per_block, (block + 1) * per_block)
+            channel = channels[index % len(channels)]
+            time = index / self.reading_rate
+            reading, extra = self.signal(channel, time)
+            columns: dict[str, np.ndarray] = {
+                "READ": reading,
+                "EXTR": extra,
+                "REL": time - time[0],
+                "SEC": np.floor(EPOCH + time),
+                "FRAC": (EPOCH + time) % 1,
+                "STAT": np.zeros(per_block),
+            }
+            values = np.column_stack([columns[e] for e in elements]).ravel()
+            block += 1
+            yield f"BLK,{block},{per_block},{time[0]:.9f}\n".encode()
+            yield b"#0" + values.astype(DTYPES[data_format]).tobytes() + b"\n"
+        yield b"END\n"
+
+
+def lua(text: str) -> str:
+    """Escape text for a double-quoted Lua string."""
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def local(script: str, name: str) -> str:
+    """Get the value assigned to a `local` in the script."""
+    if match := search(rf'local {name} = "?([^"\n]*)"?', script):
+        return match[1]
+    raise ValueError(f"Script does not define {name}.")
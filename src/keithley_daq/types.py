@@ -0,0 +1,31 @@
+"""Types."""
+
+from typing import Literal, TypeAlias
+
+BufferStyle: TypeAlias = Literal["COMP", "STAN", "FULL", "WRIT", "FULLWRIT"]
+"""Reading buffer style, as accepted by `TRAC:MAKE`."""
+FillMode: TypeAlias = Literal["ONCE", "CONT"]
+"""Reading buffer fill mode, as accepted by `TRAC:FILL:MODE`."""
+BufferElement: TypeAlias = Literal[
+    "READ", "REL", "EXTR", "CHAN", "SEC", "FRAC", "STAT", "TST", "UNIT"
+]
+"""Reading buffer element, as accepted by `TRAC:DATA?`."""
+TriggerState: TypeAlias = Literal["IDLE", "RUNNING", "WAITING", "EMPTY", "BUILDING"]
+"""State of the trigger model, as reported by `TRIG:STAT?`."""
+Backpressure: TypeAlias = Literal["block", "drop-oldest", "keep-latest"]
+"""What a fan-out branch does when its sink falls behind."""
+SpeedProfileName: TypeAlias = Literal["fast", "balanced", "precise"]
+"""Named tradeoff between scan rate and reading noise."""
+Precision: TypeAlias = Literal["double", "compact"]
+"""How precisely readings are stored in memory and on disk."""
+TimeUnit: TypeAlias = Literal["s", "ns"]
+"""Unit of stored relative timestamps."""
+ColumnKind: TypeAlias = Literal["value", "time", "channel"]
+"""What a derived column holds, which determines how it is stored."""
+Interpolation: TypeAlias = Literal["linear", "nearest"]
+"""How readings are interpolated onto a time grid."""
+Weighting: TypeAlias = Literal["idw", "bilinear"]
+"""How junction values are interpolated across heatmap pixels."""
+Capture: TypeAlias = Literal["cursor", "double", "tsp"]
+"""How readings are captured, from one wrapping buffer, two alternating ones, or an
+on-instrument TSP script alternating two buffers."""
@@ -0,0 +1,25 @@
+"""Test configuration."""
+
+from itertools import count
+
+import pytest
+
+from keithley_daq.simulator import Simulator
+
+
+class Clock:
+    """Fake clock advancing by a fixed step whenever it is read."""
+
+    def __init__(self, step: float = 0.001):
+        self.step = step
+        self.ticks = count()
+
+    def __call__(self) -> float:
+        """Advance the clock."""
+        return next(self.ticks) * self.step
+
+
+@pytest.fixture
+def sim() -> Simulator:
+    """Get a simulator taking 1000 readings per second of a ticking clock."""
+    return Simulator(reading_rate=1000.0, clock=Clock())
@@ -0,0 +1,60 @@
+"""Channel alignment tests."""
+
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq.alignment import Aligner, align
+from keithley_daq.pipeline import open_sink, run
+from keithley_daq.storage import STORAGES
+
+
+@pytest.fixture
+def scans() -> pd.DataFrame:
+    """Get scans of three channels read 3 ms apart, each a ramp in time."""
+    start = np.arange(200) * 0.01
+    frame = pd.DataFrame()
+    for n in range(1, 4):
+        times = start + (n - 1) * 0.003
+        frame[f"ratio{n}"] = 2 * times + n
+        frame[f"time{n}"] = times
+    return frame
+
+
+def test_chunked_alignment_matches_whole_run(scans: pd.DataFrame):
+    """Uniform grids interpolate ramps exactly, however the run is chunked."""
+    bounds = [0, 1, 2, 50, 51, 137, 200]
+    chunks = [scans.iloc[start:stop] for start, stop in pairwise(bounds)]
+    aligned = pd.concat(list(Aligner(0.005).stream(chunks)), ignore_index=True)
+    whole = Aligner(0.005).update(scans)
+    pd.testing.assert_frame_equal(aligned, whole)
+    assert aligned.time.iloc[0] == pytest.approx(0.01)
+    assert aligned.time.iloc[-1] == pytest.approx(1.99)
+    assert np.allclose(np.diff(aligned.time), 0.005)
+    for n in range(1, 4):
+        np.testing.assert_allclose(aligned[f"ratio{n}"], 2 * aligned.time + n)
+
+
+def test_reference_channel_grid_with_nearest_readings(scans: pd.DataFrame):
+    """Reference grids keep that channel's readings and take others' nearest."""
+    aligner = Aligner(reference=2, method="nearest")
+    aligned = pd.concat(list(aligner.stream([scans.iloc[:99], scans.iloc[99:]])))
+    assert len(aligned) == 198
+    np.testing.assert_allclose(aligned.ratio2, 2 * aligned.time + 2)
+    np.testing.assert_allclose(aligned.ratio1, 2 * (aligned.time - 0.003) + 1)
+    np.testing.assert_allclose(aligned.ratio3, 2 * (aligned.time + 0.003) + 3)
+
+
+def test_align_compact_recording(scans: pd.DataFrame, tmp_path: Path):
+    """Recordings with nanosecond timestamps align chunk by chunk into files."""
+    compact = scans.astype("float32")
+    for n in range(1, 4):
+        compact[f"time{n}"] = np.rint(scans[f"time{n}"] * 1e9).astype(np.int64)
+    run([compact], [open_sink(tmp_path / "run.daq", STORAGES["compact"])])
+    rows = align(tmp_path / "run.daq", tmp_path / "aligned.csv", Aligner(0.01), 64)
+    aligned = pd.read_csv(tmp_path / "aligned.csv", index_col=0)
+    assert rows == len(aligned) == 199
+    np.testing.assert_allclose(aligned.ratio3, 2 * aligned.time + 3, rtol=1e-6)
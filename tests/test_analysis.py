@@ -0,0 +1,66 @@
+"""Out-of-core analysis tests."""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq.analysis import read_chunks, resample, summarize, transform
+from keithley_daq.pipeline import open_sink, run
+from keithley_daq.storage import STORAGES
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    """Get a run with a gap in one column."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "time1": np.arange(1000) * 1e-3,
+        "Power 1 [W]": rng.normal(1, 0.1, 1000),
+        "Power 2 [W]": rng.normal(2, 0.5, 1000),
+    })
+    frame.loc[100:300, "Power 2 [W]"] = np.nan
+    return frame
+
+
+def low_power(frame: pd.DataFrame) -> pd.DataFrame:
+    """Keep rows of low power, adding their total power."""
+    return frame[frame["Power 1 [W]"] < 1].assign(
+        total=lambda df: df["Power 1 [W]"] + df["Power 2 [W]"]
+    )
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".h5", ".daq"])
+def test_chunked_summary_matches_whole_run(data: pd.DataFrame, tmp_path: Path, suffix):
+    """Merged chunk summaries match summarizing the whole run at once."""
+    path = tmp_path / f"Data{suffix}"
+    run([data.iloc[:400], data.iloc[400:]], [open_sink(path, STORAGES["double"])])
+    with ProcessPoolExecutor(2) as executor:
+        summary = summarize(path, rows=97, executor=executor)
+    expected = data.describe().T
+    assert summary["count"].tolist() == expected["count"].tolist()
+    for statistic in ["mean", "std", "min", "max"]:
+        np.testing.assert_allclose(summary[statistic], expected[statistic])
+
+
+def test_transform_writes_results_chunk_by_chunk(data: pd.DataFrame, tmp_path: Path):
+    """Filters and derived columns apply per chunk, in order, to every row."""
+    run([data], [open_sink(tmp_path / "Data.daq")])
+    assert transform(tmp_path / "Data.daq", tmp_path / "low.csv", low_power, rows=64)
+    low = pd.read_csv(tmp_path / "low.csv", index_col=0)
+    expected = low_power(data).reset_index(drop=True)
+    pd.testing.assert_frame_equal(low, expected)
+    chunks = list(read_chunks(tmp_path / "Data.daq", ["time1"], rows=300))
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    assert chunks[-1].index[0] == 900
+
+
+def test_resampling_carries_bins_across_chunks(data: pd.DataFrame):
+    """Bins split across chunks average the same as in the whole run."""
+    chunks = [data.iloc[start : start + 37] for start in range(0, len(data), 37)]
+    resampled = pd.concat(list(resample(chunks, "time1", 0.01)), ignore_index=True)
+    expected = pd.concat(list(resample([data], "time1", 0.01)), ignore_index=True)
+    assert len(resampled) == 100
+    pd.testing.assert_frame_equal(resampled, expected)
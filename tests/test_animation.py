@@ -0,0 +1,57 @@
+"""Animation rendering tests."""
+
+from pathlib import Path
+from struct import unpack
+from zlib import decompress
+
+import numpy as np
+import pytest
+
+from keithley_daq import animation
+from keithley_daq.animation import (
+    BACKGROUND,
+    PADDING,
+    SIZE,
+    SQUARE,
+    frames,
+    write_frames,
+)
+from keithley_daq.timing import Timings
+
+
+def test_frames_color_junction_squares():
+    """Squares are shaded by junction voltage over a plain background."""
+    volts = np.array([[12.0, 13.0, 38.0, 50.0]])
+    (frame,) = frames(volts)
+    assert tuple(frame[0, 0]) == BACKGROUND
+    corner = PADDING, SIZE - PADDING - 1
+    assert tuple(frame[corner[0], corner[0]]) == (255, 220, 220)
+    assert tuple(frame[corner[0], corner[1]]) == (255, 245, 245)
+    assert tuple(frame[corner[1], corner[0]]) == (255, 9, 9)
+    assert tuple(frame[corner[1], corner[1]]) == (255, 220, 220)
+    assert tuple(frame[PADDING + SQUARE, PADDING + SQUARE]) == BACKGROUND
+
+
+def test_batched_writes_match_frames(tmp_path: Path):
+    """Arrays and PNG sequences written in batches match frames rendered at once."""
+    volts = np.linspace(10, 40, 4 * 7).reshape(7, 4)
+    expected = frames(volts)
+    assert write_frames(volts, tmp_path / "frames.npy", batch=3) == 7
+    assert np.array_equal(np.load(tmp_path / "frames.npy"), expected)
+    timings = Timings()
+    with timings.record():
+        write_frames(volts, tmp_path / "frames.npy", batch=3)
+    assert timings.frame().query("name == 'render'")["items"].tolist() == [3, 3, 1]
+    write_frames(volts, tmp_path / "frames", batch=3)
+    png = (tmp_path / "frames" / "frame000006.png").read_bytes()
+    assert unpack(">II", png[16:24]) == (SIZE, SIZE)
+    (length,) = unpack(">I", png[33:37])
+    rows = np.frombuffer(decompress(png[41 : 41 + length]), dtype=np.uint8)
+    assert np.array_equal(rows.reshape(SIZE, -1)[:, 1:].ravel(), expected[6].ravel())
+
+
+def test_videos_need_ffmpeg(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Writing a video without FFmpeg fails clearly."""
+    monkeypatch.setattr(animation, "which", lambda _: None)
+    with pytest.raises(RuntimeError, match="FFmpeg"):
+        write_frames(np.zeros((2, 4)), tmp_path / "run.mp4")
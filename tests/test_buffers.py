@@ -0,0 +1,137 @@
+"""Reading buffer tests."""
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from keithley_daq.buffers import BufferCursor, DoubleBufferedCapture, ReadingBuffer
+from keithley_daq.simulator import Simulator
+
+
+def test_double_buffered_capture_is_gapless(sim: Simulator):
+    """Every block holds all of its scans with nothing dropped."""
+    capture = DoubleBufferedCapture(
+        sim, channels=[101, 102, 103], scans_per_block=50, wait=lambda _: None
+    )
+    capture.configure()
+    blocks = list(capture.blocks(4))
+    assert [len(block) for block in blocks] == [150] * 4
+    assert capture.stats.blocks == 4
+    assert capture.stats.readings == 600
+    assert capture.stats.dropped == capture.stats.overwritten == 0
+
+
+def test_double_buffered_capture_alternates_buffers(sim: Simulator):
+    """Blocks alternate between the two buffers."""
+    capture = DoubleBufferedCapture(
+        sim,
+        channels=[101, 102],
+        scans_per_block=10,
+        elements=("CHAN",),
+        wait=lambda _: None,
+    )
+    capture.configure()
+    for _ in capture.blocks(3):
+        pass
+    assert {name: buffer.written for name, buffer in sim.buffers.items()} == {
+        "defbuffer1": 0,
+        "defbuffer2": 0,
+        "ScanA": 20,
+        "ScanB": 20,
+    }
+
+
+def test_wrapped_buffer_is_drained_oldest_first(sim: Simulator):
+    """A wrapped buffer is drained in two parts, oldest first."""
+    capture = DoubleBufferedCapture(
+        sim, channels=[101], scans_per_block=10, wait=lambda _: None
+    )
+    capture.configure()
+    sim.write(":ROUT:SCAN:COUN:SCAN 15")
+    sim.write(":TRAC:FILL:MODE CONT, 'ScanA'")
+    block = next(capture.blocks(1))
+    assert len(block) == 10
+    assert np.all(np.diff(block[:, 2]) > 0)
+
+
+def test_idle_time_between_blocks_is_measured(sim: Simulator):
+    """Scans idle while the host switches buffers, measured from timestamps."""
+    capture = DoubleBufferedCapture(
+        sim,
+        channels=[101, 102],
+        scans_per_block=10,
+        elements=("READ", "SEC", "FRAC"),
+        wait=lambda _: None,
+    )
+    capture.configure()
+    blocks = list(capture.blocks(3))
+    times = [block[:, 1] + block[:, 2] for block in blocks]
+    gaps = [later[0] - earlier[-1] - 0.001 for earlier, later in pairwise(times)]
+    assert capture.stats.idle == pytest.approx(sum(gaps), abs=1e-6)
+    assert capture.stats.longest_idle == pytest.approx(max(gaps), abs=1e-6)
+    assert capture.stats.longest_idle > 0
+
+
+def test_empty_blocks_are_counted(sim: Simulator):
+    """Blocks that stored nothing count as blocks whose readings were all dropped."""
+    capture = DoubleBufferedCapture(
+        sim, channels=[101, 102], scans_per_block=10, wait=lambda _: None
+    )
+    assert capture.buffers is capture.buffers
+    capture.configure()
+    first, _ = capture.buffers
+    assert not len(capture.drain(first))
+    assert capture.stats.blocks == 1
+    assert capture.stats.dropped == 20
+
+
+def test_reading_buffer_extent(sim: Simulator):
+    """Extent follows the circular buffer as it wraps."""
+    buffer = ReadingBuffer("Voltage", 5, fill_mode="CONT")
+    buffer.make(sim)
+    assert buffer.extent(sim) == (0, 0)
+    sim.write(":ROUT:SCAN:CRE (@101:102)")
+    sim.write(":ROUT:SCAN:COUN:SCAN 4")
+    sim.write(":ROUT:SCAN:BUFF 'Voltage'")
+    sim.write("INIT")
+    while sim.running:
+        pass
+    assert buffer.extent(sim) == (4, 3)
+    assert buffer.fetch(sim, 4, 5, ("CHAN",)).ravel().tolist() == [102, 101]
+
+
+def test_cursor_reads_continuously_without_loss(sim: Simulator):
+    """Frequent reads return every reading exactly once."""
+    buffer = ReadingBuffer("Voltage", 100)
+    buffer.make(sim)
+    sim.write(":ROUT:SCAN:CRE (@101:103)")
+    sim.write(":ROUT:SCAN:COUN:SCAN 0")
+    sim.write(":ROUT:SCAN:BUFF 'Voltage'")
+    sim.write("INIT")
+    cursor = BufferCursor(sim, buffer, elements=("CHAN",))
+    channels = np.concatenate([cursor.read() for _ in range(200)]).ravel()
+    assert len(channels) == cursor.stats.readings > buffer.capacity
+    assert channels.tolist() == [101 + i % 3 for i in range(len(channels))]
+    assert cursor.stats.overruns == cursor.stats.dropped == 0
+    assert cursor.stats.effective_rate == pytest.approx(1000)
+
+
+def test_cursor_counts_readings_lost_to_overruns(sim: Simulator):
+    """A buffer lapping the cursor is detected and the loss estimated."""
+    buffer = ReadingBuffer("Voltage", 50)
+    buffer.make(sim)
+    sim.write(":ROUT:SCAN:CRE (@101)")
+    sim.write(":ROUT:SCAN:COUN:SCAN 0")
+    sim.write(":ROUT:SCAN:BUFF 'Voltage'")
+    sim.write("INIT")
+    cursor = BufferCursor(sim, buffer)
+    cursor.read()
+    for _ in range(200):
+        sim.clock()
+    assert len(cursor.read()) <= buffer.capacity
+    assert cursor.stats.overruns == 1
+    cursor.read()
+    assert cursor.stats.overruns == 1
+    generated = round(cursor.stats.duration * sim.reading_rate) + 1
+    assert cursor.stats.readings + cursor.stats.dropped == generated
@@ -0,0 +1,57 @@
+"""Run catalog tests."""
+
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.catalog import Catalog
+from keithley_daq.config import OutputConfig, RunConfig, ScanConfig
+from keithley_daq.pipeline import open_sink, run
+
+
+def recording(path: Path, peak: int) -> RunConfig:
+    """Record two channels of power, with a spike on the second at row `peak`."""
+    power = np.full((1000, 2), 0.5)
+    power[peak, 1] = 5.0
+    frame = pd.DataFrame({
+        "time1": np.arange(1000) * 1e-3,
+        "Power 1 [W]": power[:, 0],
+        "Power 2 [W]": power[:, 1],
+    })
+    run([frame], [open_sink(path)])
+    scan = ScanConfig("(@101:102)", labels={"101": "IPMC1", "102": "IPMC2"})
+    return RunConfig(scan=scan, output=OutputConfig(path))
+
+
+def test_queries_load_only_matching_chunks(tmp_path: Path):
+    """Queries answer from chunk statistics and load only the matching rows."""
+    with closing(Catalog(tmp_path / "runs.db", chunk_size=100)) as catalog:
+        for name, peak in [("a.csv", 250), ("b.daq", 720), ("c.h5", -1)]:
+            config = recording(tmp_path / name, peak)
+            catalog.add(config.output.path, config)
+        matches = catalog.find("power", label="IPMC2", above=1)
+        assert [Path(path).name for path in matches.path] == ["a.csv", "b.daq", "c.h5"]
+        assert matches.start.tolist() == [200, 700, 900]
+        assert matches.maximum.tolist() == [5, 5, 5]
+        assert catalog.find("power", label="IPMC1", above=1).empty
+        rows = catalog.load(matches, ["Power 2 [W]"])
+        assert len(rows) == 300
+        assert rows.loc[(1, 250), "Power 2 [W]"] == 5
+        assert (rows["Power 2 [W]"] > 1).sum() == 3
+
+
+def test_recataloging_a_path_replaces_it(tmp_path: Path):
+    """Runs overwriting a recording replace its catalog entry."""
+    with closing(Catalog(tmp_path / "runs.db")) as catalog:
+        config = recording(tmp_path / "Data.csv", 10)
+        first = catalog.add(config.output.path, config)
+        config = recording(tmp_path / "Data.csv", 20)
+        second = catalog.add(config.output.path, config)
+        runs = catalog.runs()
+        assert runs.index.tolist() == [second] != [first]
+        assert runs.labels.tolist() == ["IPMC1, IPMC2"]
+        assert runs.rows.tolist() == [1000]
+        chunks = catalog.connection.execute("SELECT count(*) FROM chunks").fetchone()
+        assert chunks == (3,)
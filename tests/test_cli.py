@@ -0,0 +1,155 @@
+"""Command line interface tests."""
+
+import sys
+from contextlib import closing
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq import cli
+from keithley_daq.animation import SIZE
+from keithley_daq.catalog import Catalog
+from keithley_daq.cli import main
+from keithley_daq.config import RunConfig
+from keithley_daq.live import live
+
+RUN = """\
+[instrument]
+simulate = true
+reading_rate = 3000
+
+[scan]
+channels = "(@101:103)"
+labels = {101 = "IPMC1", 102 = "IPMC2", 103 = "IPMC3"}
+duration = 0.2
+poll_interval = 0.02
+columns = ["ratio", "vsense", "time", "power"]
+
+[output]
+path = "Data.csv"
+timings = true
+metrics = "daq.prom"
+
+[render]
+columns = ["Power 1 [W]", "Power 2 [W]"]
+output = "frames.npy"
+"""
+
+
+@pytest.fixture
+def run(tmp_path: Path) -> Path:
+    """Get a run file acquiring from the simulator."""
+    path = tmp_path / "run.toml"
+    path.write_text(RUN, encoding="utf-8")
+    return path
+
+
+def test_run_file_paths_are_relative_to_it(run: Path):
+    """Paths in a run file resolve next to it, and unknown keys are rejected."""
+    config = RunConfig.load(run)
+    assert config.output.path == run.parent / "Data.csv"
+    assert config.scan.labels == {"101": "IPMC1", "102": "IPMC2", "103": "IPMC3"}
+    assert config.scan.shunt == pytest.approx(10.3)
+    run.write_text(f"{RUN}\n[scans]\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Unknown RunConfig keys"):
+        RunConfig.load(run)
+
+
+def test_headless_subcommands(
+    run: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    """Acquiring, rendering, and exporting run without importing pygame."""
+    assert main(["acquire", str(run)]) == 0
+    assert "derive" in capsys.readouterr().out
+    data = pd.read_csv(tmp_path / "Data.csv", index_col=0)
+    assert len(data) > 100
+    assert "Power 3 [W]" in data
+    assert np.all(np.diff(data.time1) > 0)
+    assert (tmp_path / "Data.timings.csv").exists()
+    assert "keithley_daq_readings_total" in (tmp_path / "daq.prom").read_text(
+        encoding="utf-8"
+    )
+    data.head(5).to_csv(tmp_path / "Data.csv")
+    assert main(["render", str(run)]) == 0
+    assert np.load(tmp_path / "frames.npy").shape == (5, SIZE, SIZE, 3)
+    assert main(["export", str(run), str(tmp_path / "Data.h5")]) == 0
+    assert len(pd.read_hdf(tmp_path / "Data.h5")) == 5  # type: ignore
+    assert "pygame" not in sys.modules
+
+
+def test_compact_columnar_recording(run: Path, tmp_path: Path):
+    """Run files can record compact columnar recordings, which export to CSV."""
+    text = RUN.replace('path = "Data.csv"', 'path = "Data.daq"\nprecision = "compact"')
+    run.write_text(text, encoding="utf-8")
+    assert main(["acquire", str(run)]) == 0
+    assert (tmp_path / "Data.daq" / "meta.json").exists()
+    assert main(["export", str(run), str(tmp_path / "Data.csv")]) == 0
+    data = pd.read_csv(tmp_path / "Data.csv", index_col=0)
+    assert len(data) > 100
+    assert np.all(np.diff(data.time1) > 0)
+    run.write_text(text.replace("Data.daq", "Data.csv"), encoding="utf-8")
+    with pytest.raises(ValueError, match="Compact precision needs"):
+        RunConfig.load(run)
+
+
+def test_replays_cannot_run_tsp_scripts(run: Path, tmp_path: Path):
+    """TSP captures only run against instruments that can run the script."""
+    pd.DataFrame({"ratio1": [1.0, 2.0], "time1": [0.0, 0.001]}).to_csv(
+        tmp_path / "Old.csv"
+    )
+    text = RUN.replace("simulate = true", 'replay = "Old.csv"').replace(
+        "[output]", 'capture = "tsp"\n\n[output]'
+    )
+    run.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError, match="Replay cannot run TSP"):
+        main(["acquire", str(run)])
+
+
+def test_watching_a_scan_records_it(
+    run: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Watching records the scan while showing filtered junction voltages."""
+    text = RUN.replace(
+        'columns = ["Power 1 [W]", "Power 2 [W]"]',
+        'columns = ["ratio1", "ratio2"]\ncutoff = 50.0\nmarker = true',
+    )
+    run.write_text(text, encoding="utf-8")
+    shown = []
+
+    def display(current, fps, caption, render, running, metrics):
+        while running():
+            shown.append(current())
+
+    monkeypatch.setattr(cli, "live", partial(live, display=display))
+    assert main(["watch", str(run)]) == 0
+    assert len(pd.read_csv(tmp_path / "Data.csv")) > 100
+    assert shown[-1] is not None
+
+
+def test_profiled_recording(run: Path, tmp_path: Path):
+    """Run files can profile bus traffic, summarized next to the recording."""
+    text = RUN.replace("simulate = true", "simulate = true\nprofile = true")
+    run.write_text(text, encoding="utf-8")
+    assert main(["acquire", str(run)]) == 0
+    bus = pd.read_csv(tmp_path / "Data.bus.csv", index_col=0)
+    assert bus.loc["TRAC:DATA?", "calls"] > 1
+
+
+def test_analysis_subcommands(
+    run: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    """Recordings are cataloged, summarized, and aligned from the command line."""
+    text = RUN.replace('metrics = "daq.prom"', 'catalog = "runs.db"')
+    run.write_text(text, encoding="utf-8")
+    assert main(["acquire", str(run)]) == 0
+    assert main(["summarize", str(run)]) == 0
+    assert "Power 3 [W]" in capsys.readouterr().out
+    destination = str(tmp_path / "aligned.csv")
+    assert main(["align", str(run), destination, "--period", "0.01"]) == 0
+    aligned = pd.read_csv(tmp_path / "aligned.csv", index_col=0)
+    assert np.allclose(np.diff(aligned.time), 0.01)
+    with closing(Catalog(tmp_path / "runs.db")) as catalog:
+        assert catalog.runs().labels.tolist() == ["IPMC1, IPMC2, IPMC3"]
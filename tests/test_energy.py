@@ -0,0 +1,51 @@
+"""Energy integration tests."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq.energy import EnergyIntegrator
+from keithley_daq.storage import NANOSECONDS, STORAGES
+
+
+def test_chunked_integration_matches_whole_run():
+    """Carried state makes chunked energy match the trapezoid rule over the run."""
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.uniform(0.001, 0.01, 500))
+    power = rng.uniform(0, 2, (500, 2))
+    frame = pd.DataFrame({
+        "time1": times,
+        "Power 1 [W]": power[:, 0],
+        "time2": times + 0.002,
+        "Power 2 [W]": power[:, 1],
+    })
+    integrator = EnergyIntegrator(window=0.1)
+    chunks = [frame.iloc[start:end] for start, end in [(0, 1), (1, 37), (37, 500)]]
+    energy = pd.concat(list(integrator.stream(chunks)))
+    whole = EnergyIntegrator(window=0.1).update(frame)
+    pd.testing.assert_frame_equal(energy, whole)
+    trapezoids = np.diff(times) * (power[1:, 0] + power[:-1, 0]) / 2
+    assert integrator.totals["Energy 1 [J]"] == pytest.approx(trapezoids.sum())
+    assert energy["Energy 2 [J]"].iloc[0] == 0
+
+
+def test_average_power_over_trailing_window():
+    """Average power covers the trailing window, starting with the first reading."""
+    times = np.arange(0, 3, 0.01)
+    frame = pd.DataFrame({"time1": times, "Power 1 [W]": np.where(times < 1, 1.0, 3.0)})
+    average = EnergyIntegrator(window=0.5).update(frame)["Average Power 1 [W]"]
+    assert average.iloc[0] == 1
+    assert average.iloc[50] == pytest.approx(1)
+    assert average.iloc[-1] == pytest.approx(3)
+
+
+def test_nanosecond_timestamps_and_missing_times():
+    """Compact nanosecond timestamps integrate in seconds, and times are required."""
+    frame = pd.DataFrame({
+        "time1": np.arange(3, dtype=np.int64) * NANOSECONDS,
+        "Power 1 [W]": np.float32(2),
+    })
+    integrator = EnergyIntegrator(storage=STORAGES["compact"])
+    assert integrator.update(frame)["Energy 1 [J]"].tolist() == [0, 2, 4]
+    with pytest.raises(ValueError, match="needs `time1`"):
+        integrator.update(frame.drop(columns="time1"))
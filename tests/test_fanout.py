@@ -0,0 +1,72 @@
+"""Fan-out tests."""
+
+from threading import Event
+
+import pandas as pd
+import pytest
+
+from keithley_daq.fanout import Branch, FanOut
+from keithley_daq.metrics import Metrics
+from keithley_daq.pipeline import FrameSink, run
+
+
+class GatedSink(FrameSink):
+    """Sink stalling on its first frame until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = Event()
+        self.release = Event()
+
+    def write(self, frame: pd.DataFrame):
+        """Collect a frame once released."""
+        self.entered.set()
+        self.release.wait(5)
+        super().write(frame)
+
+
+class FailingSink(FrameSink):
+    """Sink failing on every frame."""
+
+    def write(self, frame: pd.DataFrame):  # noqa: ARG002
+        """Fail."""
+        raise OSError("Disk full.")
+
+
+def frames(count: int) -> list[pd.DataFrame]:
+    """Get frames numbered by their single value."""
+    return [pd.DataFrame({"n": [n]}) for n in range(count)]
+
+
+@pytest.mark.parametrize(
+    ("policy", "kept"), [("keep-latest", [0, 9]), ("drop-oldest", [0, 7, 8, 9])]
+)
+def test_slow_view_loses_frames_while_recorder_does_not(policy, kept):
+    """A stalled lossy branch drops frames without holding up a blocking one."""
+    recorder, view = FrameSink(), GatedSink()
+    metrics = Metrics()
+    fanout = FanOut(
+        [Branch(recorder, "recorder", size=2), Branch(view, "view", policy, size=3)],
+        metrics,
+    )
+    fanout.write(frames(1)[0])
+    assert view.entered.wait(5)
+    for frame in frames(10)[1:]:
+        fanout.write(frame)
+    view.release.set()
+    fanout.close()
+    assert recorder.frame.n.tolist() == list(range(10))
+    assert view.frame.n.tolist() == kept
+    stats = fanout.stats
+    assert stats["view"].dropped == 10 - len(kept)
+    assert stats["recorder"].written == stats["recorder"].frames == 10
+    assert stats["recorder"].max_depth <= 2
+    assert set(metrics.snapshot().queues) == {"recorder", "view"}
+
+
+def test_sink_errors_reach_the_producer():
+    """A failing sink stops the run instead of blocking it forever."""
+    fanout = FanOut([Branch(FailingSink(), "disk", size=1)])
+    with pytest.raises(RuntimeError, match="disk") as info:
+        run(frames(50), [fanout])
+    assert isinstance(info.value.__cause__, OSError)
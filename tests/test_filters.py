@@ -0,0 +1,45 @@
+"""Streaming filter tests."""
+
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq.filters import Filter
+
+RATE = 1000.0
+
+
+def test_chunked_filtering_matches_whole_run():
+    """Carried state makes chunked filtering match filtering the whole run."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(20, 1, (500, 3)), columns=["a", "b", "time"])
+    design = {"rate": RATE, "cutoff": 20, "mains": 50, "average": 5, "columns": "ab"}
+    chunks = [frame.iloc[start:end] for start, end in [(0, 1), (1, 37), (37, 500)]]
+    filtered = pd.concat(list(Filter.design(**design).stream(chunks)))
+    pd.testing.assert_frame_equal(filtered, Filter.design(**design).update(frame))
+    pd.testing.assert_series_equal(filtered["time"], frame["time"])
+    assert filtered["a"].std() < frame["a"].std() / 3
+
+
+def test_filters_reject_mains_and_keep_level():
+    """Notches reject mains, and filters settle at the level of the first rows."""
+    times = np.arange(2000) / RATE
+    mains = 12 + np.sin(2 * np.pi * 50 * times)
+    filtered = Filter.design(RATE, cutoff=20, mains=50).apply(mains[:, None])
+    np.testing.assert_allclose(filtered[1000:], 12, atol=1e-3)
+    assert Filter.design(RATE, cutoff=5).apply(np.full((3, 2), 7.0)) == pytest.approx(7)
+    with pytest.raises(ValueError, match="Nyquist"):
+        Filter.design(RATE, cutoff=RATE)
+
+
+@pytest.mark.slow
+def test_filter_throughput():
+    """Filters handle a million readings a second on one core."""
+    values = np.random.default_rng(0).normal(20, 1, (250_000, 4))
+    filtering = Filter.design(RATE, cutoff=20, mains=50, average=5)
+    filtering.apply(values[:10])
+    start = perf_counter()
+    filtering.apply(values)
+    assert values.size / (perf_counter() - start) > 1e6
@@ -0,0 +1,44 @@
+"""Heatmap rendering tests."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from keithley_daq.animation import SIZE, intensity, write_frames
+from keithley_daq.heatmap import CENTERS, Heatmap
+
+
+def test_inverse_distance_field_matches_junctions():
+    """Pixels on junctions take their shade, and equal shades give a flat field."""
+    heatmap = Heatmap(size=200, centers=[(50.5, 50.5), (150.5, 50.5), (100.5, 150.5)])
+    assert np.allclose(heatmap.weights.sum(axis=1), 1)
+    volts = np.array([[13.0, 20.0, 38.0], [25.0, 25.0, 25.0]])
+    varied, flat = heatmap(volts)
+    shades = np.rint(intensity(volts[0]))
+    assert varied[50, 50, 1] == shades[0]
+    assert varied[150, 100, 1] == shades[2]
+    assert shades.min() <= varied[..., 1].min() <= varied[..., 1].max() <= shades.max()
+    assert np.all(flat == flat[0, 0])
+
+
+def test_bilinear_field_blends_grid_neighbors():
+    """Bilinear fields blend the four surrounding junctions and clamp outside."""
+    heatmap = Heatmap(weighting="bilinear")
+    (frame,) = heatmap(np.array([13.0, 20.0, 30.0, 38.0]))
+    shades = intensity(np.array([13.0, 20.0, 30.0, 38.0]))
+    (left, top), (right, bottom) = np.array(CENTERS[0]), np.array(CENTERS[3])
+    middle = int((left + right) / 2), int((top + bottom) / 2)
+    assert frame[middle[1], middle[0], 1] == pytest.approx(shades.mean(), abs=1)
+    assert frame[0, 0, 1] == np.rint(shades[0])
+    assert frame[SIZE - 1, SIZE - 1, 1] == np.rint(shades[3])
+    with pytest.raises(ValueError, match="rectangular grid"):
+        Heatmap(CENTERS[:3], "bilinear")
+
+
+def test_heatmaps_write_in_batches(tmp_path: Path):
+    """Heatmaps render through the same batched writers as squares."""
+    heatmap = Heatmap()
+    volts = np.linspace(10, 40, 4 * 5).reshape(5, 4)
+    write_frames(volts, tmp_path / "heat.npy", batch=2, render=heatmap)
+    assert np.array_equal(np.load(tmp_path / "heat.npy"), heatmap(volts))
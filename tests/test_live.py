@@ -0,0 +1,83 @@
+"""Live display tests."""
+
+from collections.abc import Callable
+from threading import Event
+
+import numpy as np
+import pandas as pd
+
+from keithley_daq.filters import Filter
+from keithley_daq.live import LatestSink, live
+from keithley_daq.metrics import Metrics
+from keithley_daq.pipeline import FrameSink, record
+from keithley_daq.schema import POWER_COLUMNS
+from keithley_daq.simulator import Simulator
+
+CHANNELS = (101, 102)
+COLUMNS = ("Voltage 1 [V]", "Voltage 2 [V]")
+
+
+def acquisition(sinks: list, duration: float) -> Callable[[Event], int]:
+    """Get an acquisition recording simulated voltages on a real clock."""
+    return lambda stop: record(
+        Simulator(reading_rate=2000.0),
+        CHANNELS,
+        POWER_COLUMNS,
+        sinks,
+        duration,
+        poll_interval=0.005,
+        stop=stop,
+    )
+
+
+def test_latest_sink_keeps_last_row_in_millivolts():
+    """Only the last row of the latest frame is kept, scaled to millivolts."""
+    sink = LatestSink(COLUMNS, scale=1000)
+    assert sink.current() is None
+    sink.write(pd.DataFrame({COLUMNS[0]: [0.01, 0.02], COLUMNS[1]: [0.03, 0.04]}))
+    sink.write(pd.DataFrame({COLUMNS[0]: [], COLUMNS[1]: []}))
+    np.testing.assert_allclose(sink.current(), [20, 40])
+    assert sink.rows == 2
+
+
+def test_latest_sink_filters_every_row():
+    """Filtered sinks keep the latest output of a filter fed every row."""
+    mains = np.sin(2 * np.pi * 60 * np.arange(1000) / 1000)
+    frame = pd.DataFrame({COLUMNS[0]: 1 + mains, COLUMNS[1]: 2 + mains})
+    sink = LatestSink(COLUMNS, filter=Filter.design(1000, cutoff=5, mains=60))
+    for start in range(0, len(frame), 100):
+        sink.write(frame.iloc[start : start + 100])
+    np.testing.assert_allclose(sink.current(), [1, 2], atol=0.02)
+
+
+def test_closing_the_display_stops_acquisition():
+    """Acquisition stops early once the display closes, keeping what it read."""
+    latest, frames = LatestSink(COLUMNS, scale=1000), FrameSink()
+    shown = []
+    metrics = Metrics()
+
+    def display(current, fps, caption, render, running, metrics):
+        while running() and (volts := current()) is None:
+            pass
+        shown.append(volts)
+        metrics.observe_frame(0.01)
+
+    rows = live(
+        acquisition([frames, latest], 60.0), latest, display=display, metrics=metrics
+    )
+    assert rows == latest.rows == len(frames.frame) > 0
+    assert shown[0] is not None
+    assert metrics.snapshot().frame_seconds > 0
+
+
+def test_display_closes_when_acquisition_ends():
+    """The display stops once acquisition finishes on its own."""
+    latest = LatestSink(COLUMNS)
+    checks = []
+
+    def display(current, fps, caption, render, running, metrics):
+        while running():
+            checks.append(current())
+
+    assert live(acquisition([latest], 0.05), latest, display=display) == latest.rows
+    assert checks
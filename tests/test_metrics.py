@@ -0,0 +1,62 @@
+"""Metrics tests."""
+
+from itertools import count
+from pathlib import Path
+
+import pytest
+
+from keithley_daq.buffers import BufferCursor, ReadingBuffer
+from keithley_daq.metrics import Metrics, TextfileExporter
+from keithley_daq.simulator import Simulator
+
+
+def test_snapshot_rates_follow_the_window():
+    """Rates are computed over recent reads."""
+    ticks = count()
+    metrics = Metrics("bench", window=2.0, clock=lambda: float(next(ticks)))
+    for _ in range(10):
+        metrics.observe_read(readings=100, bytes=3000, lag=5)
+    metrics.observe_queue("recorder", 2)
+    snapshot = metrics.snapshot()
+    assert snapshot.readings == 1000
+    assert snapshot.readings_per_second == pytest.approx(100)
+    assert snapshot.bytes_per_second == pytest.approx(3000)
+    assert snapshot.lag == 5
+    assert snapshot.queues == {"recorder": 2}
+
+
+def test_textfile_export_is_rate_limited(tmp_path: Path):
+    """Exports write Prometheus text format at most once per interval."""
+    now = [0.0]
+    metrics = Metrics("bench")
+    metrics.observe_read(readings=10, bytes=300, dropped=1)
+    metrics.observe_frame(0.016)
+    exporter = TextfileExporter(tmp_path / "daq.prom", [metrics], clock=lambda: now[0])
+    assert exporter.export()
+    assert not exporter.export()
+    text = (tmp_path / "daq.prom").read_text(encoding="utf-8")
+    assert "# TYPE keithley_daq_readings_total counter" in text
+    assert 'keithley_daq_dropped_readings_total{instrument="bench"} 1' in text
+    assert 'keithley_daq_frame_seconds{instrument="bench"} 0.016' in text
+    now[0] = 1.0
+    assert exporter.export()
+    assert [p.name for p in tmp_path.iterdir()] == ["daq.prom"]
+
+
+def test_cursor_feeds_metrics(sim: Simulator):
+    """Each cursor read updates the readings, bytes, and lag metrics."""
+    buffer = ReadingBuffer("Voltage", 100)
+    buffer.make(sim)
+    sim.write(":ROUT:SCAN:CRE (@101:103)")
+    sim.write(":ROUT:SCAN:COUN:SCAN 0")
+    sim.write(":ROUT:SCAN:BUFF 'Voltage'")
+    sim.write("INIT")
+    metrics = Metrics()
+    cursor = BufferCursor(sim, buffer, metrics=metrics)
+    for _ in range(20):
+        cursor.read()
+    snapshot = metrics.snapshot()
+    assert snapshot.readings == cursor.stats.readings
+    assert snapshot.bytes == cursor.stats.bytes == buffer.transferred > 0
+    assert 0 < snapshot.lag < buffer.capacity
+    assert snapshot.dropped == 0
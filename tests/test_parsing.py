@@ -0,0 +1,35 @@
+"""ASCII parsing tests."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from keithley_daq.parsing import parse_ascii, split_chunks
+
+
+def test_chunks_split_at_commas():
+    """Chunks never split a value."""
+    text = ",".join(str(i * 1.5) for i in range(1000))
+    chunks = split_chunks(text, 64)
+    assert len(chunks) > 1
+    assert ",".join(chunks) == text
+
+
+def test_parallel_parse_matches_serial():
+    """Parsing in a process pool gives the same contiguous array."""
+    values = np.random.default_rng(0).normal(size=20_000)
+    text = ",".join(f"{v:.9e}" for v in values)
+    with ProcessPoolExecutor(2) as executor:
+        parsed = parse_ascii(text, executor, chunk_size=10_000)
+    assert parsed.flags.c_contiguous
+    assert parsed == pytest.approx(values)
+    assert parse_ascii(text.encode()) == pytest.approx(values)
+
+
+def test_malformed_values_raise():
+    """Malformed or empty values are not silently truncated."""
+    for text in ("1.0,oops,3.0", "1.0,,3.0"):
+        with pytest.raises(ValueError, match="Malformed"):
+            parse_ascii(text)
+    assert parse_ascii("").size == 0
@@ -0,0 +1,137 @@
+"""Streaming pipeline tests."""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq import scpi
+from keithley_daq.buffers import ReadingBuffer
+from keithley_daq.parsing import parse_ascii
+from keithley_daq.pipeline import (
+    CsvSink,
+    FrameSink,
+    RingSink,
+    alternate,
+    derive,
+    open_sink,
+    poll,
+    record,
+    run,
+    scans,
+)
+from keithley_daq.schema import POWER_COLUMNS, ReadingSchema
+from keithley_daq.simulator import Simulator
+from keithley_daq.storage import STORAGES
+
+
+def test_scans_carry_partial_scans_across_chunks():
+    """Readings split mid-scan are regrouped into whole scans."""
+    readings = np.arange(10.0).reshape(-1, 1)
+    chunks = [readings[:2], readings[2:3], readings[3:8], readings[8:]]
+    regrouped = list(scans(chunks, channels=3))
+    assert [len(chunk) for chunk in regrouped] == [3, 3, 3]
+    assert np.concatenate(regrouped).ravel().tolist() == list(range(9))
+
+
+def test_pipeline_streams_to_sinks(sim: Simulator, tmp_path: Path):
+    """Readings flow lazily from the buffer to every sink, aborting at the end."""
+    channels = (101, 102, 103)
+    schema = ReadingSchema.for_columns(channels, POWER_COLUMNS)
+    buffer = ReadingBuffer("Power", 300)
+    source = poll(
+        sim,
+        buffer,
+        channels,
+        schema.elements,
+        duration=1.0,
+        clock=sim.clock,
+        wait=lambda _: None,
+    )
+    csv, frames = CsvSink(tmp_path / "Data.csv"), FrameSink()
+    rows = run(
+        derive(scans(source, len(channels)), schema, POWER_COLUMNS, 10.3), [csv, frames]
+    )
+    assert not sim.running
+    recorded = pd.read_csv(tmp_path / "Data.csv", index_col=0)
+    assert len(recorded) == rows == len(frames.frame) == csv.rows > buffer.capacity
+    assert recorded.index.tolist() == list(range(rows))
+    assert np.all(np.diff(recorded.time1) > 0)
+    assert np.allclose(recorded["Power 2 [W]"], frames.frame["Power 2 [W]"])
+
+
+def test_ring_keeps_latest_rows_in_stored_types():
+    """The ring keeps the latest rows, oldest first, in the frames' data types."""
+    ring = RingSink(5)
+    for start in range(0, 12, 3):
+        ring.write(pd.DataFrame({"x": np.arange(start, start + 3, dtype=np.float32)}))
+    assert ring.frame["x"].tolist() == [7, 8, 9, 10, 11]
+    assert ring.columns["x"].dtype == np.float32
+    ring.write(pd.DataFrame({"x": np.arange(20.0, 27.0, dtype=np.float32)}))
+    assert ring.frame["x"].tolist() == [22, 23, 24, 25, 26]
+
+
+def test_double_buffered_recording_keeps_time_across_blocks():
+    """Alternating buffers record every scan on one continuous timeline."""
+    frames = FrameSink()
+    rows = record(
+        Simulator(reading_rate=3000.0),
+        (101, 102),
+        ("ratio", "time"),
+        [frames],
+        duration=0.2,
+        poll_interval=0.02,
+        capture="double",
+    )
+    assert rows == len(frames.frame) > 30
+    assert np.all(np.diff(frames.frame.time1) > 0)
+    assert np.all(frames.frame.time2 > frames.frame.time1)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool counting the chunked parses it runs."""
+
+    maps = 0
+
+    def map(self, *args, **kwargs):
+        """Count a parse."""
+        self.maps += 1
+        return super().map(*args, **kwargs)
+
+
+def test_recording_parses_large_dumps_in_parallel(monkeypatch: pytest.MonkeyPatch):
+    """Buffer dumps larger than two chunks are split across the executor."""
+    monkeypatch.setattr(scpi, "parse_ascii", partial(parse_ascii, chunk_size=256))
+    frames = FrameSink()
+    with CountingExecutor() as executor:
+        record(
+            Simulator(reading_rate=3000.0),
+            (101, 102),
+            ("ratio", "time"),
+            [frames],
+            duration=0.1,
+            poll_interval=0.05,
+            executor=executor,
+        )
+    assert executor.maps
+    assert len(frames.frame)
+    assert frames.frame.notna().all(axis=None)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".h5"])
+def test_tables_refuse_nanosecond_timestamps(tmp_path: Path, suffix: str):
+    """Only columnar recordings store compact nanosecond timestamps."""
+    with pytest.raises(ValueError, match="Nanosecond timestamps"):
+        open_sink(tmp_path / f"Data{suffix}", STORAGES["compact"])
+
+
+def test_double_buffered_source_keeps_the_aborted_block(sim: Simulator):
+    """Like polling, alternating buffers yields what the aborted block stored."""
+    chunks = list(alternate(sim, (101, 102), ("READ", "REL"), 0.0, 10, clock=sim.clock))
+    assert len(chunks) == 2
+    assert len(chunks[0]) == 20
+    assert 0 < len(chunks[1]) < 20
+    assert np.all(np.diff(np.concatenate(chunks)[:, 1]) > 0)
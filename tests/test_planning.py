@@ -0,0 +1,33 @@
+"""Buffer planning tests."""
+
+import pytest
+
+from keithley_daq.planning import MEMORY, choose_style, plan_buffer
+
+
+def test_style_follows_elements():
+    """Extra values need a full buffer, otherwise compact suffices."""
+    assert choose_style(["READ", "REL"]) == "COMP"
+    assert choose_style(["READ", "REL"], precise=True) == "STAN"
+    assert choose_style(["READ", "EXTR", "REL"]) == "FULL"
+    with pytest.raises(ValueError, match="No buffer style"):
+        choose_style(["READ", "BOGUS"])  # type: ignore
+
+
+def test_short_run_fits_in_one_fill():
+    """A short run gets a buffer sized for the whole run, in whole scans."""
+    plan = plan_buffer([101, 102, 103], 1000, 18, ["READ", "EXTR", "REL"])
+    assert plan.fits_run
+    assert plan.style == "FULL"
+    assert plan.capacity % 3 == 0
+    assert plan.capacity >= 18_000
+    assert plan.drain_rate == 1000 * 45
+
+
+def test_long_run_streams_through_a_ring():
+    """A run too long for memory fills continuously and reports its slack."""
+    plan = plan_buffer([101, 102], 50_000, 3600, ["READ", "REL"], buffers=2)
+    assert not plan.fits_run
+    assert plan.fill_mode == "CONT"
+    assert 2 * plan.storage_bytes <= MEMORY
+    assert plan.slack == plan.capacity / 50_000
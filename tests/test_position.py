@@ -0,0 +1,72 @@
+"""Contact position estimation tests."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq.animation import MAXIMUM, MINIMUM, frames
+from keithley_daq.heatmap import CENTERS
+from keithley_daq.position import (
+    MARKER,
+    LeastSquares,
+    PositionEstimator,
+    PositionSink,
+    activation,
+    marked,
+    published,
+)
+
+
+def test_centroid_follows_activated_junctions():
+    """Centroids weight junction centers by activation, with no contact as NaN."""
+    volts = np.array([[MAXIMUM - 1, 0, 0, 0], [25.0, 25.0, 0, 0], [0, 0, 0, 0]])
+    estimates = PositionEstimator().estimate(volts)
+    assert estimates[0, :2].tolist() == list(CENTERS[0])
+    assert estimates[1, :2].tolist() == [(CENTERS[0][0] + CENTERS[1][0]) / 2, 150]
+    assert estimates[1, 2] == min(2 * activation(np.array(25.0)), 1)
+    assert np.isnan(estimates[2, :2]).all()
+    assert estimates[2, 2] == 0
+
+
+def test_least_squares_model_recovers_calibrated_positions():
+    """A model fit to calibration touches maps activations back to positions."""
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(100, 375, (20, 2))
+    mixing = rng.uniform(-1, 1, (2, 4)) / 1000
+    activations = 0.5 + (positions - 237.5) @ mixing
+    volts = MINIMUM + activations * (MAXIMUM - MINIMUM)
+    model = LeastSquares.fit(volts, positions)
+    assert model.error == pytest.approx(0, abs=1e-6)
+    estimates = PositionEstimator(model=model).estimate(volts[:3])
+    np.testing.assert_allclose(estimates[:, :2], positions[:3])
+    with pytest.raises(ValueError, match="calibration touches"):
+        LeastSquares.fit(volts[:4], positions[:4])
+
+
+def test_published_estimates_expire_and_mark_frames():
+    """Estimates older than the budget are withheld, and markers are drawn."""
+    now = [0.0]
+    sink = PositionSink(
+        PositionEstimator(
+            columns=["Voltage 1 [V]", "Voltage 2 [V]"], centers=CENTERS[:2]
+        ),
+        budget=0.05,
+        clock=lambda: now[0],
+    )
+    sink.write(
+        pd.DataFrame({"Voltage 1 [V]": [0.0, 0.03], "Voltage 2 [V]": [0.0, 0.0]})
+    )
+    estimate = sink.current()
+    assert estimate is not None
+    assert estimate.tolist()[:2] == list(CENTERS[0])
+    now[0] = 0.1
+    assert sink.current() is None
+    assert sink.stats.stale == sink.stats.published == 1
+    (frame,) = marked(frames, sink.estimator)(np.array([[30.0, 0.0]]))
+    x, y = map(int, CENTERS[0])
+    assert tuple(frame[y, x]) == MARKER
+    (frame,) = published(frames, sink)(np.array([[30.0, 0.0]]))
+    assert tuple(frame[y, x]) != MARKER
+    now[0] = 0.0
+    (frame,) = published(frames, sink)(np.array([[0.0, 0.0]]))
+    assert tuple(frame[y, x]) == MARKER
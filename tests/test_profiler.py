@@ -0,0 +1,40 @@
+"""Bus profiler tests."""
+
+from itertools import count
+
+import pytest
+
+from keithley_daq.buffers import BufferCursor, ReadingBuffer
+from keithley_daq.profiler import BusProfiler, mnemonic
+from keithley_daq.simulator import Simulator
+
+
+def test_mnemonics_use_short_forms():
+    """Commands are grouped by the short form of their header."""
+    assert mnemonic(':TRACe:ACTual:END? "Voltage"') == "TRAC:ACT:END?"
+    assert mnemonic("*RST;*CLS") == "*RST"
+
+
+def test_round_trips_per_cursor_read(sim: Simulator):
+    """Each incremental read costs a fixed number of round trips."""
+    ticks = count()
+    profiler = BusProfiler(sim, clock=lambda: float(next(ticks)))
+    buffer = ReadingBuffer("Voltage", 100)
+    buffer.make(profiler)
+    profiler.write(":ROUT:SCAN:CRE (@101:103)")
+    profiler.write(":ROUT:SCAN:COUN:SCAN 0")
+    profiler.write(":ROUT:SCAN:BUFF 'Voltage'")
+    profiler.write("INIT")
+    profiler.timeout = 5000
+    assert sim.timeout == 5000
+    profiler.reset()
+    cursor = BufferCursor(profiler, buffer)
+    for _ in range(10):
+        cursor.read()
+    assert profiler.round_trips == 10 * 3
+    summary = profiler.summary()
+    assert summary.loc["TRAC:DATA?", "calls"] == 10
+    assert summary.loc["TRAC:DATA?", "received"] == buffer.transferred + 10
+    assert summary.share.sum() == pytest.approx(1)
+    histograms = profiler.histograms()
+    assert histograms.sum(axis=1).to_dict() == summary.calls.to_dict()
@@ -0,0 +1,45 @@
+"""Speed profile tests."""
+
+from itertools import count
+
+import numpy as np
+import pytest
+
+from keithley_daq.config import ScanConfig
+from keithley_daq.profiles import PROFILES, calibrate
+from keithley_daq.simulator import Simulator
+
+
+def test_profile_commands_set_each_channel():
+    """Profiles set integration, autozero, range, and delay on the scan list."""
+    commands = PROFILES["fast"].commands([101, 102, 103], "VOLT:DC:RAT")
+    assert commands == [
+        "SENS:VOLT:DC:RAT:NPLC 0.0005, (@101:103)",
+        "SENS:VOLT:DC:RAT:AZER OFF, (@101:103)",
+        "SENS:VOLT:DC:RAT:RANG 10, (@101:103)",
+        "ROUT:CHAN:DEL 0, (@101:103)",
+    ]
+    assert "SENS:VOLT:DC:RANG:AUTO ON, (@101)" in PROFILES["precise"].commands([101])
+
+
+def test_calibration_measures_rate_noise_tradeoff():
+    """Faster profiles read faster and noisier on a steady simulated input."""
+    ticks = count()
+    sim = Simulator(
+        clock=lambda: next(ticks) / 1000,
+        signal=lambda channels, times: (0.025 + 0 * times, 1 + 0 * times),
+    )
+    results = calibrate(
+        sim, [101, 102], duration=0.5, clock=sim.clock, wait=lambda _: None
+    )
+    assert results.index.tolist() == ["fast", "balanced", "precise"]
+    assert np.all(np.diff(results.rate) < 0)
+    assert np.all(np.diff(results.noise) < 0)
+    assert results.rate["precise"] == pytest.approx(sim.reading_rate, rel=0.01)
+
+
+def test_scan_config_rejects_unknown_profile():
+    """Run files can only name defined speed profiles."""
+    assert ScanConfig(profile="precise").profile == "precise"
+    with pytest.raises(ValueError, match="Unknown speed profile"):
+        ScanConfig(profile="fastest")  # type: ignore
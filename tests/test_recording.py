@@ -0,0 +1,53 @@
+"""Columnar recording tests."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from keithley_daq.recording import RecordingSink, load_columns, load_recording
+from keithley_daq.schema import POWER_COLUMNS, ReadingSchema
+from keithley_daq.storage import RELATIVE_ERROR, STORAGES
+
+
+def test_compact_recording_round_trips_within_error_bound(tmp_path: Path):
+    """Compact recordings take half the bytes and stay within the error bound."""
+    schema = ReadingSchema.for_columns([101, 102], POWER_COLUMNS)
+    rng = np.random.default_rng(0)
+    values = np.column_stack([
+        rng.uniform(0.5, 2, 1000),
+        rng.uniform(0.01, 0.05, 1000),
+        np.arange(1000) * 1e-3 + 3600,
+    ]).ravel()
+    sizes = {}
+    for precision, storage in STORAGES.items():
+        sink = RecordingSink(tmp_path / f"{precision}.daq", storage)
+        for chunk in np.split(values, 4):
+            sink.write(schema.frame(chunk, POWER_COLUMNS, 10.3, storage))
+        sink.close()
+        sizes[precision] = sum(file.stat().st_size for file in sink.path.glob("*.bin"))
+    double = load_recording(tmp_path / "double.daq")
+    compact = load_recording(tmp_path / "compact.daq")
+    assert sizes["compact"] < 0.6 * sizes["double"]
+    assert compact.columns.tolist() == double.columns.tolist()
+    assert compact["Power 2 [W]"].dtype == np.float32
+    np.testing.assert_allclose(
+        compact["Power 2 [W]"], double["Power 2 [W]"], rtol=RELATIVE_ERROR
+    )
+    np.testing.assert_allclose(compact["time1"], double["time1"], rtol=0, atol=1e-9)
+
+
+def test_columns_load_as_stored_and_tolerate_truncation(tmp_path: Path):
+    """Columns map as stored, and a partly written last row is ignored."""
+    columns = ["reading", "time", "channel"]
+    schema = ReadingSchema.for_columns([101], columns)
+    storage = STORAGES["compact"]
+    sink = RecordingSink(tmp_path / "run.daq", storage)
+    sink.write(schema.frame(np.array([1.5, 0.25, 101] * 3), columns, 1, storage))
+    with (sink.path / "col0000.bin").open("ab") as file:
+        file.write(b"\0\0")
+    loaded = load_columns(sink.path, ["time1", "channel1"])
+    assert loaded["time1"].tolist() == [250_000_000] * 3
+    assert loaded["channel1"].dtype == np.uint16
+    with pytest.raises(ValueError, match="no columns"):
+        load_columns(sink.path, ["time2"])
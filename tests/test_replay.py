@@ -0,0 +1,108 @@
+"""Recorded run replay tests."""
+
+from itertools import count
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keithley_daq.buffers import ReadingBuffer
+from keithley_daq.pipeline import FrameSink, derive, open_sink, poll, run, scans
+from keithley_daq.replay import Replay, load_run
+from keithley_daq.schema import ReadingSchema
+from keithley_daq.storage import STORAGES
+
+CHANNELS = (101, 102)
+COLUMNS = ("ratio", "vsense", "time")
+
+
+@pytest.fixture
+def recording(tmp_path: Path) -> pd.DataFrame:
+    """Record two channels of readings to `Data.csv`."""
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.uniform(0.001, 0.002, (3000, 2)).ravel()).reshape(-1, 2)
+    frame = pd.DataFrame({
+        "ratio1": rng.normal(size=3000),
+        "vsense1": rng.normal(size=3000),
+        "time1": times[:, 0],
+        "ratio2": rng.normal(size=3000),
+        "vsense2": rng.normal(size=3000),
+        "time2": times[:, 1],
+    })
+    frame.to_csv(tmp_path / "Data.csv")
+    return frame
+
+
+def test_fast_replay_delivers_every_reading(recording: pd.DataFrame, tmp_path: Path):
+    """At infinite speed, readings arrive as fast as read, none lost to overruns."""
+    replay = Replay(
+        load_run(tmp_path / "Data.csv"), speed=np.inf, clock=count(0, 0.001).__next__
+    )
+    schema = ReadingSchema.for_columns(CHANNELS, COLUMNS)
+    source = poll(
+        replay,
+        ReadingBuffer("Power", 300),
+        CHANNELS,
+        schema.elements,
+        duration=1.0,
+        clock=replay.clock,
+        wait=lambda _: None,
+    )
+    frames = FrameSink()
+    rows = run(derive(scans(source, len(CHANNELS)), schema, COLUMNS), [frames])
+    assert rows == len(recording)
+    replayed = frames.frame
+    start = recording["time1"].iloc[0]
+    np.testing.assert_allclose(replayed["ratio2"], recording["ratio2"])
+    np.testing.assert_allclose(replayed["time2"], recording["time2"] - start)
+
+
+def test_replay_follows_recorded_times(recording: pd.DataFrame, tmp_path: Path):
+    """Readings are released at their recorded times, sped up."""
+    now = [0.0]
+    replay = Replay(load_run(tmp_path / "Data.csv"), speed=2, clock=lambda: now[0])
+    replay.write(":ROUT:SCAN:CRE (@101)")
+    with pytest.raises(ValueError, match="scanned 2 channels"):
+        replay.write("INIT")
+    replay.write(":ROUT:SCAN:CRE (@101:102)")
+    replay.write(":ROUT:SCAN:COUN:SCAN 0")
+    replay.write("INIT")
+    now[0] = 0.5
+    times = recording[["time1", "time2"]].to_numpy().ravel()
+    due = np.sum(times - times[0] <= 1.0)
+    assert int(replay.query(":TRAC:ACTual:END? 'defbuffer1'")) == due
+    now[0] = 1e3
+    assert int(replay.query(":TRAC:ACTual? 'defbuffer1'")) == len(times)
+    assert not replay.running
+
+
+def test_compact_recordings_replay_in_seconds(recording: pd.DataFrame, tmp_path: Path):
+    """Nanosecond timestamps of compact recordings are replayed as seconds."""
+    compact = recording.astype("float32")
+    for n in (1, 2):
+        compact[f"time{n}"] = np.rint(recording[f"time{n}"] * 1e9).astype(np.int64)
+    run([compact], [open_sink(tmp_path / "Data.daq", STORAGES["compact"])])
+    recorded = load_run(tmp_path / "Data.daq")
+    times = recording[["time1", "time2"]].to_numpy().ravel()
+    np.testing.assert_allclose(recorded.times, times - times[0], atol=1e-9)
+    np.testing.assert_allclose(
+        recorded.readings, recording[["ratio1", "ratio2"]].to_numpy().ravel(), 1e-6
+    )
+
+
+def test_keithley_exports_are_retimed(tmp_path: Path):
+    """Exports without timestamps are replayed at the configured reading rate."""
+    path = tmp_path / "export.csv"
+    preamble = "Keithley Instruments\nScan export\n"
+    table = pd.DataFrame({
+        "Scan": [1, 2, 3],
+        "CH111": [1.0, 2, 3],
+        "CH112": [4.0, 5, 6],
+    })
+    path.write_text(preamble + table.to_csv(index=False), encoding="utf-8")
+    recorded = load_run(path, reading_rate=100.0, header=2)
+    assert recorded.channels == 2
+    assert recorded.readings.tolist() == [1, 4, 2, 5, 3, 6]
+    np.testing.assert_allclose(recorded.times, np.arange(6) / 100)
+    assert recorded.extra.tolist() == [1] * 6
@@ -0,0 +1,55 @@
+"""Reading schema tests."""
+
+import numpy as np
+import pytest
+
+from keithley_daq.schema import POWER_COLUMNS, ReadingSchema, project
+
+
+def test_projection_queries_only_needed_elements():
+    """Only the elements the requested columns need are queried."""
+    assert project(["voltage", "power"]) == ("READ", "EXTR")
+    assert project(["reading", "time"]) == ("READ", "REL")
+    assert project(POWER_COLUMNS) == ("READ", "EXTR", "REL")
+
+
+def test_demux_follows_queried_elements():
+    """Columns line up with the elements actually queried."""
+    schema = ReadingSchema.for_columns([101, 102], ["reading", "time"])
+    values = np.arange(12.0)
+    frame = schema.frame(values, ["reading", "time"])
+    assert frame.columns.tolist() == ["reading1", "time1", "reading2", "time2"]
+    assert frame["reading2"].tolist() == [2.0, 6.0, 10.0]
+    assert frame["time1"].tolist() == [1.0, 5.0, 9.0]
+
+
+def test_power_columns_match_script_derivation():
+    """Derived power columns match those computed by `measure_power.py`."""
+    schema = ReadingSchema.for_columns([101], POWER_COLUMNS)
+    frame = schema.frame(np.array([2.0, 0.5, 0.1, 4.0, 1.0, 0.2]), POWER_COLUMNS, 10.3)
+    assert frame["Current 1 [A]"].tolist() == pytest.approx([0.5 / 10.3, 1 / 10.3])
+    assert frame["Power 1 [W]"].tolist() == pytest.approx([
+        0.5 / 10.3 * 2 * 0.5,
+        1 / 10.3 * 4 * 1,
+    ])
+
+
+def test_partial_scans_and_missing_elements_are_rejected():
+    """Partial scans and columns needing unqueried elements raise."""
+    schema = ReadingSchema.for_columns([101, 102], ["reading"])
+    with pytest.raises(ValueError, match="whole scans"):
+        schema.demux(np.arange(3.0))
+    with pytest.raises(ValueError, match="not queried"):
+        schema.derive(np.arange(4.0), ["power"])
+
+
+def test_records_are_zero_copy_columnar_views():
+    """Records view the values in place, one field per channel and element."""
+    schema = ReadingSchema((101, 102, 103), ("READ", "EXTR", "REL"))
+    values = np.arange(18.0)
+    records = schema.records(values)
+    assert records.shape == (2,)
+    assert records.dtype.names == ("ch101", "ch102", "ch103")
+    current = schema.column(records, 103, "EXTR")
+    assert current.tolist() == [7.0, 16.0]
+    assert np.shares_memory(current, values)
@@ -0,0 +1,96 @@
+"""Stage timing tests."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from keithley_daq.buffers import DoubleBufferedCapture
+from keithley_daq.live import LatestSink, live
+from keithley_daq.pipeline import FrameSink, record
+from keithley_daq.schema import ReadingSchema
+from keithley_daq.simulator import Simulator
+from keithley_daq.timing import Timings, stage
+from keithley_daq.tsp import ScriptStandIn
+from keithley_daq.types import Capture
+
+
+def test_stages_are_recorded_per_chunk(sim: Simulator):
+    """Capture stages are timed per chunk with bytes and items."""
+    capture = DoubleBufferedCapture(
+        sim, channels=[101, 102], scans_per_block=20, wait=lambda _: None
+    )
+    schema = ReadingSchema((101, 102), tuple(capture.elements))
+    timings = Timings()
+    with timings.record():
+        capture.configure()
+        for block in capture.blocks(2):
+            schema.derive(block, ["voltage"])
+    frame = timings.frame()
+    assert {"setup", "wait", "transfer", "parse", "derive"} <= set(frame.name)
+    assert frame[frame.name == "setup"].chunk.isna().all()
+    parse = frame[frame.name == "parse"]
+    assert parse["items"].tolist() == [120, 120]
+    assert parse.chunk.tolist() == [0, 1]
+    assert (parse.bytes > 0).all()
+    summary = timings.summary()
+    assert summary.loc["parse", "calls"] == 2
+    assert summary.share.sum() == pytest.approx(1)
+
+
+def test_stages_outside_recording_are_not_kept(tmp_path: Path):
+    """Timing is a no-op unless recording, and is written next to recordings."""
+    timings = Timings()
+    with stage("ignored"):
+        pass
+    with timings.record(), stage("write", items=3):
+        pass
+    path = timings.write(tmp_path / "Data.csv")
+    assert path == tmp_path / "Data.timings.csv"
+    assert pd.read_csv(path).name.tolist() == ["write"]
+
+
+@pytest.mark.parametrize(
+    ("capture", "stages"),
+    [
+        ("cursor", {"setup", "wait", "transfer", "parse", "derive"}),
+        ("double", {"setup", "wait", "transfer", "parse", "derive"}),
+        ("tsp", {"wait", "transfer", "decode", "derive"}),
+    ],
+)
+def test_recordings_are_timed_per_chunk(capture: Capture, stages: set[str]):
+    """Every capture times its stages, each block or read in a chunk of its own."""
+    inst = ScriptStandIn(3000.0) if capture == "tsp" else Simulator(3000.0)
+    timings = Timings()
+    with timings.record():
+        record(
+            inst,
+            (101, 102),
+            ("ratio", "time"),
+            [FrameSink()],
+            duration=0.05,
+            poll_interval=0.01,
+            capture=capture,
+            function="VOLT:DC:RAT",
+        )
+    frame = timings.frame()
+    assert stages <= set(frame.name)
+    assert frame[frame.name == "transfer"].chunk.nunique() > 1
+    assert frame[frame.name == "derive"].chunk.nunique() > 1
+
+
+def test_live_acquisition_is_timed():
+    """Acquisition on the worker thread is timed into the display's timings."""
+    latest = LatestSink(("ratio1",))
+    timings = Timings()
+
+    def display(current, fps, caption, render, running, metrics):
+        while running():
+            pass
+
+    def acquire(stop):
+        return record(Simulator(3000.0), (101,), ("ratio",), [latest], 0.02, stop=stop)
+
+    with timings.record():
+        live(acquire, latest, display=display)
+    assert {"transfer", "parse", "derive"} <= set(timings.frame().name)
@@ -0,0 +1,92 @@
+"""TSP acquisition tests."""
+
+import numpy as np
+import pytest
+
+from keithley_daq.pipeline import FrameSink, record
+from keithley_daq.schema import ReadingSchema
+from keithley_daq.simulator import Simulator, default_signal
+from keithley_daq.tsp import ScriptStandIn, TspAcquisition, acquisition_script
+
+
+@pytest.mark.parametrize("data_format", ["REAL32", "REAL64"])
+def test_stream_decodes_packed_blocks(data_format):
+    """Blocks decode into the readings the script packed."""
+    schema = ReadingSchema((101, 102, 103), ("READ", "REL"))
+    acquisition = TspAcquisition(
+        ScriptStandIn(), schema, scans_per_block=100, blocks=3, data_format=data_format
+    )
+    acquisition.upload()
+    blocks = list(acquisition.stream())
+    assert [block.size for block in blocks] == [600] * 3
+    values = np.concatenate(blocks)
+    channels = np.tile([101, 102, 103], 300)
+    expected, _ = default_signal(channels, np.arange(900) / 1000)
+    assert schema.demux(values)[:, :, 0].ravel() == pytest.approx(expected, rel=1e-6)
+    assert acquisition.stats.readings == 900
+    assert acquisition.stats.dropped == 0
+    # ? A header and a payload per block, then the end line, and no polling at all
+    assert acquisition.stats.reads == 7
+
+
+def test_script_packs_only_queried_elements():
+    """The script prints exactly the schema's elements, in order."""
+    schema = ReadingSchema((101,), ("READ", "EXTR"))
+    script = acquisition_script(schema, 10, function="VOLT:DC:RAT")
+    assert "printbuffer(1, filled.n, filled.readings, filled.extravalues)" in script
+    with pytest.raises(ValueError, match="cannot be packed"):
+        acquisition_script(ReadingSchema((101,), ("CHAN",)), 10)
+    with pytest.raises(ValueError, match="Extra values need"):
+        acquisition_script(schema, 10)
+
+
+def test_script_configures_channels():
+    """Channels measure the configured function with their labels after the reset."""
+    script = acquisition_script(
+        ReadingSchema((101, 102), ("READ",)),
+        10,
+        function="VOLT:DC:RAT",
+        labels={101: 'Gel "A"'},
+    )
+    reset, setdmm, label = script.splitlines()[4:7]
+    assert reset == "reset()"
+    assert setdmm == (
+        "channel.setdmm(CHANNELS, dmm.ATTR_MEAS_FUNCTION, dmm.FUNC_DCV_RATIO)"
+    )
+    assert label == 'channel.setlabel("101", "Gel \\"A\\"")'
+
+
+def test_recording_from_the_script_rejects_scpi_settings():
+    """TSP recordings cannot apply SCPI commands, nor scan ratios by default."""
+    arguments = ((101, 102), ("ratio", "time"), [FrameSink()], 0.05)
+    with pytest.raises(ValueError, match="SCPI setup"):
+        record(
+            ScriptStandIn(),
+            *arguments,
+            setup=["SENS:VOLT:NPLC 1"],
+            function="VOLT:DC:RAT",
+            capture="tsp",
+        )
+    with pytest.raises(ValueError, match="Ratio columns need"):
+        record(ScriptStandIn(), *arguments, capture="tsp")
+    with pytest.raises(ValueError, match="Simulator cannot run TSP"):
+        record(Simulator(), *arguments, function="VOLT:DC:RAT", capture="tsp")
+
+
+def test_recording_from_the_script_aborts_it_at_the_end():
+    """Blocks share one timeline, and the endless script is aborted after the run."""
+    inst = ScriptStandIn(reading_rate=3000.0)
+    frames = FrameSink()
+    rows = record(
+        inst,
+        (101, 102),
+        ("ratio", "time"),
+        [frames],
+        duration=0.05,
+        poll_interval=0.01,
+        capture="tsp",
+        function="VOLT:DC:RAT",
+    )
+    assert rows == len(frames.frame) > 15
+    assert np.all(np.diff(frames.frame.time1) > 0)
+    assert inst.blocks is None